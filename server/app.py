@@ -6,17 +6,37 @@ from flask_cors import CORS
 
 from extensions import db
 from models import *   
+from commands import register_commands
+from uploads import register_uploads
 from routes.owner import (
     OwnerLoginResource,
     OwnerSignUp,
     OwnerDetails,
-    OwnerOutletResource
+    OwnerOutletResource,
+    OwnerAnalyticsResource
+)
+from routes.order import (
+    OrderListResource,
+    OrderResource,
+    CustomerOrderResource,
+    OwnerOrderResource,
+    CheckoutResource,
+    BulkOrderStatusResource,
+    OrderExportResource,
+    OwnerOrderEventsResource,
+    OutletOrderEventsResource
 )
-from routes.order import OrderListResource, OrderResource, CustomerOrderResource, OwnerOrderResource
 from routes.item import ItemListResource, ItemResource
-from routes.menu import MenuListResource, MenuResource
+from routes.menu import (
+    MenuListResource,
+    MenuResource,
+    MenuSearchResource,
+    MenuChangesResource,
+    MenuImportResource,
+    MenuExportResource
+)
 from routes.customer import CustomerLoginResource, CustomerDetails, CustomerSignUp
-from routes.outlet import ListOutlets, OutletResource, OutletMenu, OwnerOutletsResource
+from routes.outlet import ListOutlets, OutletResource, OutletMenu, OutletStorefront, OwnerOutletsResource
 from routes.testimonial import TestimonialListResource, TestimonialResource
 from routes.table_booking import (
     TableBookingListResource,
@@ -25,9 +45,12 @@ from routes.table_booking import (
     CustomerTableBookingsResource
 )
 from routes.favourite import CustomerFavourites, FavouriteButton, TopFavourites
+from routes.image import ImageJobResource
+from image_jobs import image_jobs
 
-def create_app():
-    app = Flask(__name__, static_url_path='/uploads', static_folder=os.path.abspath('../photos'))
+def create_app(config=None):
+    # Photos are served by register_uploads with immutable caching
+    app = Flask(__name__, static_folder=None)
 
     # CONFIG
     app.config["SECRET_KEY"] = "super-secret-key-change-me"
@@ -35,13 +58,23 @@ def create_app():
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = "12345"
     app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024 
+    app.config["ORDER_ARCHIVE_AFTER_DAYS"] = 30
+    # Clients further behind than this reload the whole menu instead of syncing changes
+    app.config["MENU_CHANGE_RETENTION_DAYS"] = 30
+    # Internal nginx location for X-Accel-Redirect, e.g. "/protected-uploads"
+    app.config["UPLOADS_ACCEL_REDIRECT"] = os.environ.get("UPLOADS_ACCEL_REDIRECT")
+    # Overrides, e.g. a temporary database for tests
+    app.config.update(config or {})
 
     CORS(app, supports_credentials=True,
     origins=["http://localhost:3000"],
-    allow_headers=["Content-Type", "Authorization"])
+    allow_headers=["Content-Type", "Authorization", "Idempotency-Key"])
     # INIT EXTENSIONS
     db.init_app(app)
     Migrate(app, db)
+    register_commands(app)
+    image_jobs.init_app(app)
+    register_uploads(app)
 
     api = Api(app)
 
@@ -50,13 +83,21 @@ def create_app():
     api.add_resource(OwnerLoginResource, '/api/owner/login')
     api.add_resource(OwnerDetails, '/api/owner/details')
     api.add_resource(OwnerOutletResource, '/api/owner/<int:owner_id>/outlets')
+    api.add_resource(OwnerAnalyticsResource, '/api/owner/analytics')
     api.add_resource(OrderListResource, "/api/orders")
+    api.add_resource(CheckoutResource, "/api/orders/checkout")
+    api.add_resource(BulkOrderStatusResource, "/api/orders/bulk-status")
+    api.add_resource(OrderExportResource, "/api/orders/export")
     api.add_resource(OrderResource, "/api/orders/<int:order_id>")
     api.add_resource(CustomerOrderResource, "/api/orders/customer/<int:customer_id>")
     api.add_resource(OwnerOrderResource, "/api/orders/owner/<int:owner_id>")
+    api.add_resource(OwnerOrderEventsResource, "/api/orders/owner/<int:owner_id>/events")
+    api.add_resource(OutletOrderEventsResource, "/api/orders/outlet/<int:outlet_id>/events")
     api.add_resource(ItemListResource, "/items")
     api.add_resource(ItemResource, "/items/<int:item_id>")
     api.add_resource(MenuListResource, "/api/menu")
+    api.add_resource(MenuSearchResource, "/api/menu/search")
+    api.add_resource(MenuChangesResource, "/api/menu/changes")
     api.add_resource(MenuResource, "/api/menu/<int:menu_id>")
     api.add_resource(CustomerLoginResource, "/api/customer/login")
     api.add_resource(CustomerDetails, "/api/customer/details")
@@ -65,11 +106,15 @@ def create_app():
     api.add_resource(OwnerOutletsResource, "/api/owner/outlets")
     api.add_resource(OutletResource, "/api/outlets/<int:outlet_id>")
     api.add_resource(OutletMenu, "/api/outlet/<int:outlet_id>/menu")
+    api.add_resource(OutletStorefront, "/api/outlets/<int:outlet_id>/storefront")
+    api.add_resource(MenuImportResource, "/api/outlets/<int:outlet_id>/menu/import")
+    api.add_resource(MenuExportResource, "/api/outlets/<int:outlet_id>/menu/export")
     api.add_resource(TestimonialListResource, '/api/testimonials')
     api.add_resource(TestimonialResource, '/api/testimonials/<string:testimonial_id>')
     api.add_resource(CustomerFavourites, "/api/customer/favourites")
     api.add_resource(FavouriteButton, "/api/items/<int:item_id>/favourite")
     api.add_resource(TopFavourites, "/api/items/top_favourites")
+    api.add_resource(ImageJobResource, "/api/images/jobs/<string:job_id>")
 
     api.add_resource(TableBookingListResource, "/api/table-bookings")
     api.add_resource(TableBookingResource, "/api/table-bookings/<int:booking_id>")
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete, literal
+
+from extensions import db
+from models import (
+    Order,
+    OrderLine,
+    OrderStatus,
+    TableBooking,
+    ArchivedOrder,
+    ArchivedOrderLine,
+    ArchivedTableBooking
+)
+
+
+# Orders in these states never change again and can leave the hot tables
+TERMINAL_STATUSES = (OrderStatus.completed, OrderStatus.cancelled)
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 30
+DEFAULT_BATCH_SIZE = 500
+
+# (live table, archive table) in the order rows must be copied
+ARCHIVED_TABLES = (
+    (Order.__table__, ArchivedOrder.__table__),
+    (OrderLine.__table__, ArchivedOrderLine.__table__),
+    (TableBooking.__table__, ArchivedTableBooking.__table__),
+)
+
+
+def _copy(source, target, order_ids, now):
+    """INSERT INTO target SELECT ... FROM source for the given orders"""
+    columns = [c.name for c in source.columns]
+    key = source.c.id if source is Order.__table__ else source.c.order_id
+    selected = [source.c[name] for name in columns]
+
+    if "archived_at" in target.c:
+        columns.append("archived_at")
+        selected.append(literal(now, type_=target.c.archived_at.type))
+
+    db.session.execute(
+        insert(target).from_select(columns, select(*selected).where(key.in_(order_ids)))
+    )
+
+
+def archive_orders(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move completed/cancelled orders created more than older_than_days ago,
+    with their lines and table bookings, into the archive tables.
+    Each batch is its own short transaction so writers are never blocked
+    for long.
+    Returns: number of orders archived
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+
+    while True:
+        order_ids = db.session.scalars(
+            select(Order.id)
+            .where(Order.status.in_(TERMINAL_STATUSES), Order.created_at < cutoff)
+            .order_by(Order.id)
+            .limit(batch_size)
+        ).all()
+
+        if not order_ids:
+            break
+
+        now = datetime.utcnow()
+        for source, target in ARCHIVED_TABLES:
+            _copy(source, target, order_ids, now)
+
+        # Children first so foreign keys stay valid throughout
+        for source, _ in reversed(ARCHIVED_TABLES):
+            key = source.c.id if source is Order.__table__ else source.c.order_id
+            db.session.execute(delete(source).where(key.in_(order_ids)))
+
+        db.session.commit()
+        archived += len(order_ids)
+
+    return archived
@@ -22,10 +22,11 @@ def generate_token(user_id, role):
     return token
 
 
-def decode_token (token) :
+def decode_payload (token) :
+    """The token's claims, or None if it is invalid or expired"""
     try:
 
-        payload = jwt.decode ( 
+        return jwt.decode ( 
             token,
             current_app.config["SECRET_KEY"],
             algorithms = [ "HS256" ]
@@ -36,7 +37,14 @@ def decode_token (token) :
     
     except jwt.InvalidTokenError :
         return None
-    
+
+
+def decode_token (token) :
+
+    payload = decode_payload ( token )
+
+    if not payload :
+        return None
 
     if payload ["role"] == "owner" :
         return Owner.query.get ( payload ["id"] )
@@ -1,23 +1,47 @@
 
 from flask import request
-from auth.jwt import decode_token
+from auth.jwt import decode_token, decode_payload
 from models import Owner, Customer
 
-def get_current_user () :
+def get_current_user ( allow_query_token = False ) :
+    """
+    allow_query_token also accepts ?token=, for clients such as EventSource
+    that cannot set an Authorization header
+    """
 
     bearer = request.headers.get ( "Authorization" )
 
-    if not bearer or not bearer.startswith ( "Bearer " ) :
+    if bearer and bearer.startswith ( "Bearer " ) :
+        token = bearer.split ( " " )[ 1 ]
+    elif allow_query_token and request.args.get ( "token" ) :
+        token = request.args [ "token" ]
+    else :
         return None
-    
-    token = bearer.split ( " " )[ 1 ]
 
     return decode_token ( token )
 
 
-def require_owner () :
+def current_customer_id () :
+    """
+    Customer id from the bearer token without loading the customer, for
+    reads that only need the id; None for owners and anonymous requests
+    """
+    bearer = request.headers.get ( "Authorization" )
 
-    user = get_current_user ()
+    if not bearer or not bearer.startswith ( "Bearer " ) :
+        return None
+
+    payload = decode_payload ( bearer.split ( " " )[ 1 ] )
+
+    if not payload or payload.get ( "role" ) != "customer" :
+        return None
+
+    return payload ["id"]
+
+
+def require_owner ( allow_query_token = False ) :
+
+    user = get_current_user ( allow_query_token )
 
     if not isinstance ( user, Owner ) :
         return None
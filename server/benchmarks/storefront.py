@@ -0,0 +1,91 @@
+# Compare loading an outlet page with the three separate calls against
+# GET /api/outlets/<id>/storefront. Run from the server directory against
+# a seeded database:
+#
+#     python benchmarks/storefront.py --iterations 200
+#
+# "cold" clears the menu cache before every page load, "warm" does not.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import app
+from extensions import db
+from menu_cache import get_menu_cache
+from models import Outlet
+
+
+def separate_calls(client, outlet_id):
+    """What the outlet page does today, including the client-side average"""
+    client.get(f"/api/outlets/{outlet_id}")
+    client.get(f"/api/outlet/{outlet_id}/menu")
+    testimonials = client.get(f"/api/testimonials?outletId={outlet_id}").get_json()["testimonials"]
+    ratings = [t["rating"] for t in testimonials]
+    sum(ratings) / len(ratings) if ratings else None
+    return 3
+
+
+def storefront(client, outlet_id):
+    client.get(f"/api/outlets/{outlet_id}/storefront")
+    return 1
+
+
+def run(load_page, outlet_ids, iterations, cold):
+    client = app.test_client()
+    queries = [0]
+
+    def count(*args, **kwargs):
+        queries[0] += 1
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        round_trips = 0
+        elapsed = 0.0
+        for i in range(iterations):
+            if cold:
+                get_menu_cache().clear()
+            started = time.perf_counter()
+            round_trips += load_page(client, outlet_ids[i % len(outlet_ids)])
+            elapsed += time.perf_counter() - started
+    finally:
+        with app.app_context():
+            event.remove(db.engine, "before_cursor_execute", count)
+
+    return {
+        "round_trips": round_trips / iterations,
+        "queries": queries[0] / iterations,
+        "ms": elapsed * 1000 / iterations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the outlet storefront endpoint")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with app.app_context():
+        outlet_ids = [outlet.id for outlet in Outlet.query.all()]
+    if not outlet_ids:
+        sys.exit("No outlets; run seed.py first")
+
+    # One pass each so imports and connections are not measured
+    run(separate_calls, outlet_ids, len(outlet_ids), cold=True)
+    run(storefront, outlet_ids, len(outlet_ids), cold=True)
+
+    print(f"{'per page load':<24}{'round trips':>12}{'queries':>10}{'server ms':>11}")
+    for name, load_page in (("separate calls", separate_calls), ("storefront", storefront)):
+        for cold in (True, False):
+            result = run(load_page, outlet_ids, args.iterations, cold)
+            label = f"{name} ({'cold' if cold else 'warm'})"
+            print(f"{label:<24}{result['round_trips']:>12.0f}{result['queries']:>10.1f}{result['ms']:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+
+@click.command("archive-orders")
+@click.option("--days", type=int, default=None, help="Archive terminal orders older than this many days")
+@click.option("--batch-size", type=int, default=None, help="Orders moved per transaction")
+@with_appcontext
+def archive_orders_command(days, batch_size):
+    """Move old completed/cancelled orders into the archive tables"""
+    from archive import archive_orders, DEFAULT_BATCH_SIZE
+
+    if days is None:
+        days = current_app.config["ORDER_ARCHIVE_AFTER_DAYS"]
+
+    count = archive_orders(days, batch_size or DEFAULT_BATCH_SIZE)
+    click.echo(f"Archived {count} orders older than {days} days")
+
+
+@click.command("rebuild-sales-rollups")
+@with_appcontext
+def rebuild_sales_rollups_command():
+    """Recompute the daily sales rollups from all live and archived orders"""
+    from rollups import rebuild_daily_sales
+
+    rows = rebuild_daily_sales()
+    click.echo(f"Rebuilt {rows} daily item sales rows")
+
+
+@click.command("rebuild-ratings")
+@with_appcontext
+def rebuild_ratings_command():
+    """Recompute every outlet's rating totals from its testimonials"""
+    from ratings import rebuild_outlet_ratings
+
+    rows = rebuild_outlet_ratings()
+    click.echo(f"Rebuilt ratings for {rows} outlets")
+
+
+@click.command("rebuild-search-index")
+@with_appcontext
+def rebuild_search_index_command():
+    """Recreate the menu full-text search index"""
+    from search import rebuild_menu_search
+
+    rows = rebuild_menu_search()
+    click.echo(f"Indexed {rows} menu entries")
+
+
+@click.command("purge-menu-changes")
+@click.option("--days", type=int, default=None, help="Keep menu changes and tombstones this many days")
+@with_appcontext
+def purge_menu_changes_command(days):
+    """Delete menu changes older than the delta sync retention window"""
+    from menu_changes import purge_menu_changes
+
+    if days is None:
+        days = current_app.config["MENU_CHANGE_RETENTION_DAYS"]
+
+    count = purge_menu_changes(days)
+    click.echo(f"Deleted {count} menu changes older than {days} days")
+
+
+@click.command("process-images")
+@with_appcontext
+def process_images_command():
+    """Convert existing item and outlet photos into resized variants"""
+    from images import convert_legacy_images
+
+    rows = convert_legacy_images()
+    click.echo(f"Converted images for {rows} items and outlets")
+
+
+@click.command("import-menu")
+@click.argument("outlet_id", type=int)
+@click.argument("menu_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--images", type=click.Path(exists=True, dir_okay=False), default=None, help="Zip of images named in the image column")
+@with_appcontext
+def import_menu_command(outlet_id, menu_file, images):
+    """Bulk-add dishes from a CSV or JSON file to an outlet's menu"""
+    from menu_transfer import MenuImportError, parse_menu, import_menu, open_images_zip
+    from models import Outlet
+
+    if not Outlet.query.get(outlet_id):
+        raise click.ClickException("Outlet not found")
+
+    try:
+        with open(menu_file, "rb") as f:
+            rows = parse_menu(f.read(), menu_file.rsplit(".", 1)[-1].lower())
+        images_zip = open_images_zip(images) if images else None
+    except MenuImportError as e:
+        raise click.ClickException(str(e))
+
+    imported, errors = import_menu(outlet_id, rows, images_zip)
+    for error in errors:
+        click.echo(f"Row {error['row']}: {'; '.join(error['errors'])}", err=True)
+    if errors:
+        raise click.ClickException("Some rows are invalid; nothing was imported")
+
+    click.echo(f"Imported {len(imported)} items")
+
+
+@click.command("export-menu")
+@click.argument("outlet_id", type=int)
+@click.option("--format", "fmt", type=click.Choice(["csv", "json"]), default="csv")
+@click.option("--output", type=click.File("w"), default="-", help="Target file, stdout by default")
+@with_appcontext
+def export_menu_command(outlet_id, fmt, output):
+    """Stream an outlet's menu in the import format"""
+    from menu_transfer import export_menu
+
+    for chunk in export_menu(outlet_id, fmt):
+        output.write(chunk)
+
+
+@click.command("export-orders")
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default="csv")
+@click.option("--from", "date_from", type=click.DateTime(), default=None, help="Orders created on or after this date")
+@click.option("--to", "date_to", type=click.DateTime(), default=None, help="Orders created before this date")
+@click.option("--owner-id", type=int, default=None, help="Only this owner's outlets")
+@click.option("--outlet-id", type=int, default=None, help="Only this outlet")
+@click.option("--output", type=click.File("wb"), default="-", help="Target file, stdout by default")
+@with_appcontext
+def export_orders_command(fmt, date_from, date_to, owner_id, outlet_id, output):
+    """Stream order lines as gzipped CSV or NDJSON"""
+    from export import export_orders
+
+    chunks = export_orders(
+        fmt,
+        date_from=date_from,
+        date_to=date_to,
+        owner_id=owner_id,
+        outlet_id=outlet_id
+    )
+    for chunk in chunks:
+        output.write(chunk)
+
+
+def register_commands(app):
+    app.cli.add_command(archive_orders_command)
+    app.cli.add_command(rebuild_sales_rollups_command)
+    app.cli.add_command(rebuild_ratings_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(purge_menu_changes_command)
+    app.cli.add_command(export_orders_command)
+    app.cli.add_command(process_images_command)
+    app.cli.add_command(import_menu_command)
+    app.cli.add_command(export_menu_command)
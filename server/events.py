@@ -0,0 +1,98 @@
+import itertools
+import queue
+import threading
+from collections import deque
+
+
+# Events kept per channel so reconnecting clients can resume from Last-Event-ID
+REPLAY_BUFFER_SIZE = 500
+
+
+class Broker:
+    """
+    Pub/sub interface used for order events.
+    A cross-worker backend (e.g. Redis pub/sub with a stream for replay)
+    implements the same two methods and is installed with set_broker().
+    """
+
+    def publish(self, channel, event_type, data):
+        raise NotImplementedError
+
+    def subscribe(self, channel, last_event_id=None):
+        """
+        Returns: (backlog, subscription) where backlog holds buffered events
+        newer than last_event_id and subscription.get(timeout) yields new ones
+        """
+        raise NotImplementedError
+
+
+class Subscription:
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.queue = queue.Queue()
+
+    def get(self, timeout=None):
+        """Next event, or None if nothing arrived within timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(Broker):
+    """Broker for a single process; events do not cross worker boundaries"""
+
+    def __init__(self, buffer_size=REPLAY_BUFFER_SIZE):
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.buffer_size = buffer_size
+        self.buffers = {}
+        self.subscribers = {}
+
+    def publish(self, channel, event_type, data):
+        with self.lock:
+            event = {"id": next(self.ids), "type": event_type, "data": data}
+            self.buffers.setdefault(channel, deque(maxlen=self.buffer_size)).append(event)
+            subscribers = list(self.subscribers.get(channel, ()))
+
+        for subscription in subscribers:
+            subscription.queue.put(event)
+
+        return event
+
+    def subscribe(self, channel, last_event_id=None):
+        subscription = Subscription(self, channel)
+
+        with self.lock:
+            backlog = []
+            if last_event_id is not None:
+                backlog = [e for e in self.buffers.get(channel, ()) if e["id"] > last_event_id]
+            self.subscribers.setdefault(channel, set()).add(subscription)
+
+        return backlog, subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.channel]
+
+
+broker = InProcessBroker()
+
+
+def get_broker():
+    return broker
+
+
+def set_broker(new_broker):
+    """Swap the pub/sub backend, e.g. for one shared across workers"""
+    global broker
+    broker = new_broker
@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+import zlib
+
+from sqlalchemy import select, union_all
+
+from extensions import db
+from models import (
+    Order,
+    OrderLine,
+    Customer,
+    MenuOutletItem,
+    Item,
+    Outlet,
+    ArchivedOrder,
+    ArchivedOrderLine
+)
+
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# One exported row per order line
+EXPORT_COLUMNS = (
+    "order_id",
+    "created_at",
+    "status",
+    "customer_id",
+    "customer_name",
+    "outlet_id",
+    "outlet_name",
+    "item_id",
+    "item_name",
+    "category_name",
+    "quantity",
+    "unit_price",
+    "line_total",
+    "order_total",
+)
+
+
+def export_statement(date_from=None, date_to=None, owner_id=None, outlet_id=None):
+    """
+    Core SELECT of order lines with their order, customer, outlet and item
+    columns, over live and archived orders, oldest first
+    """
+    def lines(order_model, line_model):
+        statement = (
+            select(
+                order_model.id.label("order_id"),
+                order_model.created_at,
+                order_model.status,
+                order_model.customer_id,
+                Customer.name.label("customer_name"),
+                Outlet.id.label("outlet_id"),
+                Outlet.name.label("outlet_name"),
+                Item.id.label("item_id"),
+                Item.name.label("item_name"),
+                Item.category_name,
+                line_model.quantity,
+                line_model.unit_price,
+                line_model.line_total,
+                order_model.total.label("order_total"),
+                line_model.id.label("line_id")
+            )
+            .join(order_model, order_model.id == line_model.order_id)
+            .join(MenuOutletItem, MenuOutletItem.id == line_model.menu_outlet_item_id)
+            .join(Item, Item.id == MenuOutletItem.item_id)
+            .join(Outlet, Outlet.id == MenuOutletItem.outlet_id)
+            .outerjoin(Customer, Customer.id == order_model.customer_id)
+        )
+        if date_from:
+            statement = statement.where(order_model.created_at >= date_from)
+        if date_to:
+            statement = statement.where(order_model.created_at < date_to)
+        if owner_id is not None:
+            statement = statement.where(Outlet.owner_id == owner_id)
+        if outlet_id is not None:
+            statement = statement.where(Outlet.id == outlet_id)
+        return statement
+
+    sold = union_all(lines(Order, OrderLine), lines(ArchivedOrder, ArchivedOrderLine)).subquery()
+    return (
+        select(*[sold.c[name] for name in EXPORT_COLUMNS])
+        .order_by(sold.c.created_at, sold.c.order_id, sold.c.line_id)
+    )
+
+
+def export_rows(statement, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield result rows as dicts from a server-side cursor, batch_size at a
+    time, so memory does not grow with the size of the export
+    """
+    connection = db.session.connection()
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+    try:
+        for row in result.mappings():
+            yield {
+                **row,
+                "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                "status": row["status"].value if row["status"] else None,
+            }
+    finally:
+        result.close()
+
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def gzip_chunks(chunks, flush_bytes=64 * 1024):
+    """
+    Gzip text chunks on the fly. Output is emitted whenever roughly
+    flush_bytes of input has been compressed, not at every row.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        pending += len(data)
+        compressed = compressor.compress(data)
+        if pending >= flush_bytes:
+            compressed += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_orders(fmt="csv", batch_size=EXPORT_BATCH_SIZE, **filters):
+    """
+    Gzipped CSV or NDJSON export of order lines as a generator of bytes
+    filters: date_from, date_to, owner_id, outlet_id
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format, use one of: {', '.join(EXPORT_FORMATS)}")
+
+    rows = export_rows(export_statement(**filters), batch_size)
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    return gzip_chunks(encode(rows))
@@ -0,0 +1,113 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from extensions import db
+from models import CustomerFavourite
+from auth.permissions import current_customer_id
+
+
+# Customers whose favourite sets are kept before the least recent is dropped
+MAX_CACHED_CUSTOMERS = 10000
+
+
+class FavouriteCache:
+    """
+    Each customer's favourite item ids as a frozenset, so listings mark
+    favourites by membership instead of a query per item.
+    FavouriteButton invalidates a customer's set after each toggle. A
+    generation counter per customer stops a set loaded during a toggle
+    from being stored afterwards. The cache is per process.
+    """
+
+    def __init__(self, max_customers=MAX_CACHED_CUSTOMERS):
+        self.max_customers = max_customers
+        self.lock = threading.Lock()
+        self.sets = OrderedDict()
+        self.generations = {}
+
+    def generation(self, customer_id):
+        with self.lock:
+            return self.generations.get(customer_id, 0)
+
+    def get(self, customer_id):
+        with self.lock:
+            favourite_ids = self.sets.get(customer_id)
+            if favourite_ids is not None:
+                self.sets.move_to_end(customer_id)
+            return favourite_ids
+
+    def put(self, customer_id, generation, favourite_ids):
+        with self.lock:
+            if self.generations.get(customer_id, 0) != generation:
+                return
+            self.sets[customer_id] = favourite_ids
+            self.sets.move_to_end(customer_id)
+            while len(self.sets) > self.max_customers:
+                self.sets.popitem(last=False)
+
+    def invalidate(self, customer_id):
+        with self.lock:
+            self.sets.pop(customer_id, None)
+            self.generations[customer_id] = self.generations.get(customer_id, 0) + 1
+
+
+favourite_cache = FavouriteCache()
+
+
+def get_favourite_cache():
+    return favourite_cache
+
+
+def set_favourite_cache(new_cache):
+    """Swap the cache, e.g. for one shared across workers"""
+    global favourite_cache
+    favourite_cache = new_cache
+
+
+def favourite_item_ids(customer_id):
+    """Item ids the customer has favourited, loaded in one query on a miss"""
+    cache = get_favourite_cache()
+    favourite_ids = cache.get(customer_id)
+    if favourite_ids is None:
+        generation = cache.generation(customer_id)
+        favourite_ids = frozenset(db.session.scalars(
+            select(CustomerFavourite.item_id).where(CustomerFavourite.customer_id == customer_id)
+        ))
+        cache.put(customer_id, generation, favourite_ids)
+    return favourite_ids
+
+
+def current_favourite_ids():
+    """Favourite item ids of the customer making the request, or None if not a customer"""
+    customer_id = current_customer_id()
+    if customer_id is None:
+        return None
+    return favourite_item_ids(customer_id)
+
+
+def invalidate_favourites(customer_id):
+    """Call after commit so the next listing reloads the customer's favourites"""
+    get_favourite_cache().invalidate(customer_id)
+
+
+def favourites_marker(key=None):
+    """
+    personalise hook for cached_json that adds isFavourite to each entry
+    of a listing, the entries being the body (a list) or body[key].
+    Returns: None when no customer is logged in
+    """
+    favourite_ids = current_favourite_ids()
+    if favourite_ids is None:
+        return None
+
+    suffix = hashlib.sha256(",".join(map(str, sorted(favourite_ids))).encode()).hexdigest()
+
+    def mark(body):
+        entries = body[key] if key else body
+        marked = [{**entry, "isFavourite": entry["item_id"] in favourite_ids} for entry in entries]
+        return ({**body, key: marked} if key else marked), suffix
+
+    return mark
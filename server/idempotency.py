@@ -0,0 +1,135 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request
+
+
+# How long a stored response can be replayed for the same Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+
+# How long a duplicate waits for the original request to finish
+IN_FLIGHT_WAIT_SECONDS = 30
+
+
+class Entry:
+
+    def __init__(self, fingerprint, expires_at):
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.response = None
+        self.done = threading.Event()
+
+
+class IdempotencyStore:
+    """
+    In-memory store of responses keyed by Idempotency-Key.
+    Entries expire after ttl seconds; since every entry gets the same ttl,
+    insertion order is expiry order and eviction only looks at the oldest.
+    """
+
+    def __init__(self, ttl=IDEMPOTENCY_TTL_SECONDS):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def _evict(self, now):
+        while self.entries:
+            key, entry = next(iter(self.entries.items()))
+            if entry.expires_at > now:
+                break
+            self.entries.popitem(last=False)
+
+    def begin(self, key, fingerprint):
+        """
+        Claim key for a new request
+        Returns: (entry, True) if the caller must run the request,
+                 (entry, False) if another request already owns the key
+        """
+        now = time.monotonic()
+        with self.lock:
+            self._evict(now)
+            entry = self.entries.get(key)
+            if entry:
+                return entry, False
+            entry = Entry(fingerprint, now + self.ttl)
+            self.entries[key] = entry
+            return entry, True
+
+    def complete(self, key, entry, response):
+        entry.response = response
+        entry.done.set()
+
+    def abandon(self, key, entry):
+        """Forget a request that failed so the client can retry it"""
+        with self.lock:
+            if self.entries.get(key) is entry:
+                del self.entries[key]
+        entry.done.set()
+
+
+store = IdempotencyStore()
+
+
+def get_store():
+    return store
+
+
+def set_store(new_store):
+    """Swap the backing store, e.g. for one shared across workers"""
+    global store
+    store = new_store
+
+
+def idempotent(method):
+    """
+    Make a Resource method replay its first response for a repeated
+    Idempotency-Key header instead of running again.
+    Concurrent duplicates wait for the original and get its response.
+    Server errors are not stored, so those requests can be retried.
+    """
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get("Idempotency-Key")
+        if not header:
+            return method(*args, **kwargs)
+
+        key = f"{request.method} {request.path} {header}"
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        deadline = time.monotonic() + IN_FLIGHT_WAIT_SECONDS
+
+        while True:
+            entry, owner = get_store().begin(key, fingerprint)
+            if owner:
+                break
+
+            if entry.fingerprint != fingerprint:
+                return {"error": "Idempotency-Key was already used with a different request body"}, 422
+
+            if not entry.done.wait(max(0, deadline - time.monotonic())):
+                return {"error": "A request with this Idempotency-Key is still in progress"}, 409
+
+            # The original failed and released the key; try to claim it again
+            if entry.response is None:
+                continue
+
+            body, status = entry.response
+            return body, status, {"Idempotent-Replayed": "true"}
+
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            get_store().abandon(key, entry)
+            raise
+
+        if isinstance(result, tuple) and len(result) >= 2 and result[1] < 500:
+            get_store().complete(key, entry, (result[0], result[1]))
+        else:
+            get_store().abandon(key, entry)
+
+        return result
+
+    return wrapper
@@ -0,0 +1,153 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from extensions import db
+from models import Item, Outlet, MenuChangeKind
+from images import process_image
+from menu_cache import invalidate_menus, item_outlet_ids
+from menu_changes import record_menu_changes
+from search import menu_ids_for
+
+
+# Threads decoding and resizing uploads; Pillow releases the GIL while it works
+IMAGE_WORKERS = 2
+
+# Finished jobs remembered for status queries before the oldest are dropped
+MAX_FINISHED_JOBS = 1000
+
+# Raw uploads wait here until a worker has processed them; kept outside
+# the photos folder so unprocessed files are never served
+INCOMING_FOLDER = '../photos-incoming'
+
+# Rows an image can be attached to: kind -> (model, image column)
+IMAGE_TARGETS = {
+    "item": (Item, "image"),
+    "outlet": (Outlet, "image_path"),
+}
+
+
+class ImageJob:
+
+    def __init__(self, kind, target_id, path):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.target_id = target_id
+        self.path = path
+        self.status = "pending"
+        self.image = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "target": {"type": self.kind, "id": self.target_id},
+            "image": self.image,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class ImageJobQueue:
+    """
+    Processes uploaded images on a thread pool so requests only wait for
+    the upload to reach disk. When a job finishes, the processed image is
+    attached to its item/outlet, unless a newer upload for the same row
+    has been queued since. Job state is per process.
+    """
+
+    def __init__(self, workers=IMAGE_WORKERS, max_finished=MAX_FINISHED_JOBS):
+        self.workers = workers
+        self.max_finished = max_finished
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.latest = {}
+        self.executor = None
+        self.app = None
+
+    def init_app(self, app):
+        self.app = app
+
+    def submit(self, file, kind, target_id):
+        """
+        Stream an upload to disk and queue it for processing
+        Returns: the queued ImageJob
+        """
+        os.makedirs(INCOMING_FOLDER, exist_ok=True)
+        job = ImageJob(kind, target_id, os.path.join(INCOMING_FOLDER, f"{uuid.uuid4().hex}.upload"))
+        file.save(job.path)
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="image-jobs")
+            self.jobs[job.id] = job
+            self.latest[(kind, target_id)] = job.id
+            self._evict()
+
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _evict(self):
+        finished = [j for j in self.jobs.values() if j.status in ("done", "failed")]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.id]
+
+    def _run(self, job):
+        job.status = "processing"
+        try:
+            with open(job.path, "rb") as f:
+                name = process_image(f.read())
+
+            if not name:
+                job.error = "Not a valid image"
+                job.status = "failed"
+                return
+
+            with self.app.app_context():
+                self._attach(job, name)
+
+            job.image = name
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+            if os.path.exists(job.path):
+                os.remove(job.path)
+            with self.lock:
+                if self.latest.get((job.kind, job.target_id)) == job.id:
+                    del self.latest[(job.kind, job.target_id)]
+
+    def _attach(self, job, name):
+        with self.lock:
+            if self.latest.get((job.kind, job.target_id)) != job.id:
+                return
+
+        model, column = IMAGE_TARGETS[job.kind]
+        row = db.session.get(model, job.target_id)
+        if row is None:
+            return
+
+        setattr(row, column, name)
+        if job.kind == "item":
+            record_menu_changes(menu_ids_for(item_id=job.target_id), MenuChangeKind.updated)
+        db.session.commit()
+        if job.kind == "item":
+            invalidate_menus(item_outlet_ids(job.target_id))
+        else:
+            invalidate_menus([job.target_id])
+
+
+image_jobs = ImageJobQueue()
@@ -0,0 +1,169 @@
+import hashlib
+import io
+import os
+import re
+import tempfile
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from extensions import db
+from models import Item, Outlet
+
+
+# Where uploads are stored, relative to the server directory; served
+# under /uploads by uploads.serve_upload
+PHOTOS_FOLDER = '../photos'
+UPLOADS_URL = "/uploads"
+
+# Longest side in pixels for each stored variant
+IMAGE_VARIANTS = {
+    "thumbnail": 160,
+    "card": 480,
+    "full": 1280,
+}
+
+# Encoder settings per output format: (extension, Pillow format, save options)
+IMAGE_FORMATS = {
+    "webp": ("webp", "WEBP", {"quality": 80, "method": 6}),
+    "jpeg": ("jpg", "JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# Refuse uploads that would decode to more pixels than this
+MAX_IMAGE_PIXELS = 40_000_000
+
+# Names written by store_image: <content hash>-<variant>.<ext>
+STORED_NAME = re.compile(r"^(?P<key>[0-9a-f]{20})-(?P<variant>[a-z]+)\.(?P<ext>[a-z]+)$")
+
+
+def content_key(data):
+    """Name shared by every variant of an upload, derived from its bytes"""
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+def variant_name(key, variant, fmt):
+    extension = IMAGE_FORMATS[fmt][0]
+    return f"{key}-{variant}.{extension}"
+
+
+def stored_name(key):
+    """Value kept in Item.image / Outlet.image_path: the full JPEG, which any client can show"""
+    return variant_name(key, "full", "jpeg")
+
+
+def is_stored_image(name):
+    return bool(name and STORED_NAME.match(name))
+
+
+def image_variants(name):
+    """
+    URLs of every variant of a stored image, e.g. images["card"]["webp"]
+    Returns None for images saved before variants existed
+    """
+    match = STORED_NAME.match(name or "")
+    if not match:
+        return None
+
+    key = match.group("key")
+    return {
+        variant: {fmt: f"{UPLOADS_URL}/{variant_name(key, variant, fmt)}" for fmt in IMAGE_FORMATS}
+        for variant in IMAGE_VARIANTS
+    }
+
+
+def _normalise(image):
+    """Upright RGB copy with no EXIF, ICC or other metadata"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    else:
+        image = image.convert("RGB")
+    image.info = {}
+    return image
+
+
+def process_image(data, folder=PHOTOS_FOLDER):
+    """
+    Decode an upload and write every variant in every format.
+    Identical uploads map to the same key, so they are stored once.
+    Returns: stored name, or None if data is not a usable image
+    """
+    key = content_key(data)
+    name = stored_name(key)
+    if os.path.exists(os.path.join(folder, name)):
+        return name
+
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            if original.width * original.height > MAX_IMAGE_PIXELS:
+                return None
+            image = _normalise(original)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None
+
+    os.makedirs(folder, exist_ok=True)
+
+    outputs = []
+    for variant, size in IMAGE_VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        for fmt in IMAGE_FORMATS:
+            outputs.append((variant_name(key, variant, fmt), resized, fmt))
+
+    # The full JPEG goes last since its presence marks the set as complete
+    outputs.sort(key=lambda output: output[0] == name)
+    for target, resized, fmt in outputs:
+        _, pil_format, options = IMAGE_FORMATS[fmt]
+        _write(resized, os.path.join(folder, target), pil_format, options)
+
+    return name
+
+
+def _write(image, path, pil_format, options):
+    """
+    Write through a temporary file so readers never see a partial image.
+    The temporary name is unique, so concurrent writes of the same path
+    cannot interleave in one file.
+    """
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            image.save(f, pil_format, **options)
+        # mkstemp files are private to the owner; uploads are public
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def convert_legacy_images(folder=PHOTOS_FOLDER):
+    """
+    Replace item and outlet images saved before variants existed with
+    processed, content-hashed ones. Original files are left in place.
+    Returns: number of rows updated
+    """
+    converted = {}
+    updated = 0
+
+    for model, column in ((Item, "image"), (Outlet, "image_path")):
+        for row in model.query.all():
+            name = getattr(row, column)
+            if not name or is_stored_image(name):
+                continue
+
+            if name not in converted:
+                path = os.path.join(folder, name)
+                if not os.path.isfile(path):
+                    continue
+                with open(path, "rb") as f:
+                    converted[name] = process_image(f.read(), folder)
+
+            if converted[name]:
+                setattr(row, column, converted[name])
+                updated += 1
+
+    db.session.commit()
+    return updated
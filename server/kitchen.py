@@ -0,0 +1,121 @@
+import math
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from extensions import db
+from models import Order, OrderLine, OrderStatus, MenuOutletItem, Item
+
+
+# Dishes an outlet kitchen can prepare at the same time
+KITCHEN_STATIONS = 2
+
+# Prep time used for items that have none recorded
+DEFAULT_PREP_MINUTES = 10
+
+# Orders that still occupy the kitchen
+ACTIVE_STATUSES = (OrderStatus.pending, OrderStatus.confirmed)
+
+
+def item_prep_minutes(item):
+    return item.prep_minutes if item.prep_minutes is not None else DEFAULT_PREP_MINUTES
+
+
+def order_work(order):
+    """
+    Kitchen minutes an order needs: prep time x quantity summed over lines
+    Returns: (outlet_id, work_minutes, longest_single_prep)
+    """
+    work = 0
+    longest = 0
+    for line in order.lines:
+        prep = item_prep_minutes(line.menu_outlet_item.item)
+        work += prep * line.quantity
+        longest = max(longest, prep)
+    return order.menu_outlet_item.outlet_id, work, longest
+
+
+class KitchenQueue:
+    """
+    Per-outlet backlog of kitchen minutes for pending/confirmed orders.
+    Kept incrementally as orders are placed and change status, so the wait
+    at an outlet is a dict lookup rather than a scan of the orders table.
+    The state is per process and is rebuilt from the database on first use.
+    """
+
+    def __init__(self, stations=KITCHEN_STATIONS):
+        self.stations = stations
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.backlog = {}
+        self.active = {}
+
+    def load(self):
+        """Rebuild the queues from active orders in the database"""
+        work = func.sum(OrderLine.quantity * func.coalesce(Item.prep_minutes, DEFAULT_PREP_MINUTES))
+        rows = (
+            db.session.query(Order.id, MenuOutletItem.outlet_id, work)
+            .join(Order.lines)
+            .join(OrderLine.menu_outlet_item)
+            .join(MenuOutletItem.item)
+            .filter(Order.status.in_(ACTIVE_STATUSES))
+            .group_by(Order.id, MenuOutletItem.outlet_id)
+            .all()
+        )
+
+        with self.lock:
+            self.backlog = {}
+            self.active = {}
+            for order_id, outlet_id, minutes in rows:
+                self.active[order_id] = (outlet_id, minutes)
+                self.backlog[outlet_id] = self.backlog.get(outlet_id, 0) + minutes
+            self.loaded = True
+
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    def wait_minutes(self, outlet_id):
+        """Minutes until the outlet's kitchen clears its current queue"""
+        self.ensure_loaded()
+        return math.ceil(self.backlog.get(outlet_id, 0) / self.stations)
+
+    def estimate(self, order, now=None):
+        """
+        Estimated ready time for a new order placed behind the current queue.
+        Call ensure_loaded() before the order is added to the session, as a
+        first load would otherwise count it in the queue as well.
+        """
+        self.ensure_loaded()
+        outlet_id, work, longest = order_work(order)
+        queued = self.backlog.get(outlet_id, 0)
+        minutes = max(longest, math.ceil((queued + work) / self.stations))
+        return (now or datetime.utcnow()) + timedelta(minutes=minutes)
+
+    def sync(self, order):
+        """Add, update or remove a committed order depending on its status and quantities"""
+        self.ensure_loaded()
+
+        if order.status in ACTIVE_STATUSES:
+            outlet_id, work, _ = order_work(order)
+            with self.lock:
+                # An edited order replaces the work it was queued with
+                old = self.active.get(order.id)
+                if old:
+                    old_outlet_id, old_work = old
+                    self.backlog[old_outlet_id] = max(0, self.backlog.get(old_outlet_id, 0) - old_work)
+                self.active[order.id] = (outlet_id, work)
+                self.backlog[outlet_id] = self.backlog.get(outlet_id, 0) + work
+        else:
+            self.remove(order.id)
+
+    def remove(self, order_id):
+        with self.lock:
+            entry = self.active.pop(order_id, None)
+            if entry:
+                outlet_id, work = entry
+                self.backlog[outlet_id] = max(0, self.backlog.get(outlet_id, 0) - work)
+
+
+kitchen = KitchenQueue()
@@ -0,0 +1,203 @@
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from extensions import db
+from models import CustomerFavourite, Item, MenuOutletItem
+
+
+# A favourite counts half as much towards trending after this long, so
+# the trending ranking reflects roughly the last week
+TRENDING_HALF_LIFE = timedelta(days=2)
+
+# Half-lives after which trending weights are rescaled to stay within float range
+MAX_WEIGHT_HALF_LIVES = 64
+
+
+class Ranking:
+    """Item scores kept sorted, highest first with ties by item id"""
+
+    def __init__(self):
+        self.scores = {}
+        self.order = []
+
+    def set(self, item_id, score):
+        old = self.scores.pop(item_id, None)
+        if old is not None:
+            del self.order[bisect_left(self.order, (-old, item_id))]
+        if score > 0:
+            self.scores[item_id] = score
+            insort(self.order, (-score, item_id))
+
+    def top(self, limit):
+        """Returns: [(item_id, score)] for the best `limit` items"""
+        return [(item_id, -score) for score, item_id in self.order[:limit]]
+
+
+class FavouritesLeaderboard:
+    """
+    Most favourited items overall, per outlet and per category, plus a
+    trending ranking where each favourite's weight halves every
+    TRENDING_HALF_LIFE. Kept incrementally as favourites are toggled, so a
+    top-N read is a slice of an already sorted list.
+    Trending weights are stored as 2 ** (age relative to an epoch), which
+    keeps their order without decaying every item on each read.
+    Which outlets and category an item belongs to is reloaded after menu
+    writes. The state is per process and is rebuilt from the database on
+    first use.
+    """
+
+    def __init__(self, half_life=TRENDING_HALF_LIFE):
+        self.half_life = half_life.total_seconds()
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.groups_stale = False
+        self.epoch = None
+        self.counts = {}
+        self.item_outlets = {}
+        self.item_category = {}
+        self.overall = Ranking()
+        self.trending = Ranking()
+        self.by_outlet = {}
+        self.by_category = {}
+
+    def _half_lives(self, at):
+        return (at - self.epoch).total_seconds() / self.half_life
+
+    def _weight(self, at):
+        return 2 ** self._half_lives(at)
+
+    def _load_groups(self):
+        self.item_category = dict(db.session.execute(select(Item.id, Item.category_name)).all())
+        self.item_outlets = {}
+        for item_id, outlet_id in db.session.execute(select(MenuOutletItem.item_id, MenuOutletItem.outlet_id)):
+            self.item_outlets.setdefault(item_id, set()).add(outlet_id)
+
+        # Favourites of deleted items went with them
+        for item_id in [i for i in self.counts if i not in self.item_category]:
+            del self.counts[item_id]
+            self.overall.set(item_id, 0)
+            self.trending.set(item_id, 0)
+
+        self.by_outlet = {}
+        self.by_category = {}
+        for item_id, count in self.counts.items():
+            self._group(item_id, count)
+        self.groups_stale = False
+
+    def _group(self, item_id, count):
+        for outlet_id in self.item_outlets.get(item_id, ()):
+            self.by_outlet.setdefault(outlet_id, Ranking()).set(item_id, count)
+        category = self.item_category.get(item_id)
+        if category:
+            self.by_category.setdefault(category, Ranking()).set(item_id, count)
+
+    def load(self):
+        """Rebuild every ranking from the favourites in the database"""
+        favourites = db.session.execute(select(CustomerFavourite.item_id, CustomerFavourite.created_at)).all()
+
+        with self.lock:
+            self.epoch = datetime.utcnow()
+            self.counts = {}
+            weights = {}
+            for item_id, created_at in favourites:
+                self.counts[item_id] = self.counts.get(item_id, 0) + 1
+                if created_at is not None:
+                    weights[item_id] = weights.get(item_id, 0) + self._weight(created_at)
+
+            self.overall = Ranking()
+            self.trending = Ranking()
+            for item_id, count in self.counts.items():
+                self.overall.set(item_id, count)
+            for item_id, weight in weights.items():
+                self.trending.set(item_id, weight)
+
+            self._load_groups()
+            self.loaded = True
+
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+        elif self.groups_stale:
+            with self.lock:
+                if self.groups_stale:
+                    self._load_groups()
+
+    def regroup(self):
+        """Reload item outlets and categories before the next use, e.g. after a menu write"""
+        self.groups_stale = True
+
+    def _rebase(self, now):
+        """Move the epoch to now so new weights start from 1 again"""
+        factor = self._weight(now)
+        rescaled = {item_id: weight / factor for item_id, weight in self.trending.scores.items()}
+        self.epoch = now
+        self.trending = Ranking()
+        for item_id, weight in rescaled.items():
+            self.trending.set(item_id, weight)
+
+    def _change(self, item_id, delta, created_at):
+        count = self.counts.get(item_id, 0) + delta
+        if count > 0:
+            self.counts[item_id] = count
+        else:
+            self.counts.pop(item_id, None)
+        self.overall.set(item_id, count)
+
+        if item_id not in self.item_category:
+            self.groups_stale = True
+        else:
+            self._group(item_id, count)
+
+        if count <= 0:
+            # Float error could otherwise leave a tiny remainder
+            self.trending.set(item_id, 0)
+        elif created_at is not None:
+            now = datetime.utcnow()
+            if self._half_lives(now) > MAX_WEIGHT_HALF_LIVES:
+                self._rebase(now)
+            weight = self.trending.scores.get(item_id, 0) + delta * self._weight(created_at)
+            self.trending.set(item_id, weight)
+
+    def favourited(self, item_id, created_at):
+        """Count a committed favourite; call ensure_loaded before committing it"""
+        self.ensure_loaded()
+        with self.lock:
+            self._change(item_id, 1, created_at)
+
+    def unfavourited(self, item_id, created_at):
+        """
+        Remove a deleted favourite, with the created_at it was counted with;
+        call ensure_loaded before committing the delete
+        """
+        self.ensure_loaded()
+        with self.lock:
+            self._change(item_id, -1, created_at)
+
+    def top(self, limit, outlet_id=None, category=None):
+        """Returns: [(item_id, favourite count)], most favourited first"""
+        self.ensure_loaded()
+        with self.lock:
+            if outlet_id is not None:
+                ranking = self.by_outlet.get(outlet_id)
+            elif category is not None:
+                ranking = self.by_category.get(category)
+            else:
+                ranking = self.overall
+            return ranking.top(limit) if ranking else []
+
+    def count(self, item_id):
+        self.ensure_loaded()
+        return self.counts.get(item_id, 0)
+
+    def top_trending(self, limit, now=None):
+        """Returns: [(item_id, decayed favourite count as of now)]"""
+        self.ensure_loaded()
+        with self.lock:
+            decay = 1 / self._weight(now or datetime.utcnow())
+            return [(item_id, weight * decay) for item_id, weight in self.trending.top(limit)]
+
+
+leaderboard = FavouritesLeaderboard()
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import request, Response
+from sqlalchemy import select
+
+from extensions import db
+from models import MenuOutletItem
+
+
+# Query-string variants kept per cached menu before the oldest is dropped
+MAX_VARIANTS_PER_MENU = 64
+
+# Scope of GET /api/menu; outlet menus use ("outlet", outlet_id) and
+# storefronts ("storefront", outlet_id)
+ALL_MENUS = "menu"
+
+
+class MenuCache:
+    """
+    Serialized menu responses keyed by scope (the full menu or one outlet's
+    menu) and by query-string variant within that scope.
+    Writes invalidate whole scopes. Each scope has a generation counter so a
+    response built while an invalidation ran is not stored afterwards.
+    The cache is per process, like the kitchen queue.
+    """
+
+    def __init__(self, max_variants=MAX_VARIANTS_PER_MENU):
+        self.max_variants = max_variants
+        self.lock = threading.Lock()
+        self.scopes = {}
+        self.generations = {}
+
+    def generation(self, scope):
+        with self.lock:
+            return self.generations.get(scope, 0)
+
+    def get(self, scope, variant):
+        """Returns: (etag, body) or None"""
+        with self.lock:
+            variants = self.scopes.get(scope)
+            return variants.get(variant) if variants else None
+
+    def put(self, scope, variant, generation, etag, body):
+        with self.lock:
+            if self.generations.get(scope, 0) != generation:
+                return
+            variants = self.scopes.setdefault(scope, OrderedDict())
+            variants[variant] = (etag, body)
+            while len(variants) > self.max_variants:
+                variants.popitem(last=False)
+
+    def invalidate(self, *scopes):
+        with self.lock:
+            for scope in scopes:
+                self.scopes.pop(scope, None)
+                self.generations[scope] = self.generations.get(scope, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            for scope in list(self.scopes):
+                self.generations[scope] = self.generations.get(scope, 0) + 1
+            self.scopes.clear()
+
+
+menu_cache = MenuCache()
+
+
+def get_menu_cache():
+    return menu_cache
+
+
+def set_menu_cache(new_cache):
+    """Swap the cache, e.g. for one shared across workers"""
+    global menu_cache
+    menu_cache = new_cache
+
+
+def outlet_scope(outlet_id):
+    return ("outlet", outlet_id)
+
+
+def storefront_scope(outlet_id):
+    return ("storefront", outlet_id)
+
+
+def item_outlet_ids(item_id):
+    """Outlets whose menus list the item"""
+    return db.session.scalars(
+        select(MenuOutletItem.outlet_id).where(MenuOutletItem.item_id == item_id).distinct()
+    ).all()
+
+
+def invalidate_menus(outlet_ids=()):
+    """
+    Drop the full menu and the given outlets' menus and storefronts.
+    Call after commit so the next request rebuilds from committed rows.
+    """
+    get_menu_cache().invalidate(
+        ALL_MENUS,
+        *(outlet_scope(i) for i in outlet_ids),
+        *(storefront_scope(i) for i in outlet_ids)
+    )
+
+
+def invalidate_storefronts(outlet_ids):
+    """Drop the given outlets' storefronts, e.g. after a testimonial changes"""
+    get_menu_cache().invalidate(*(storefront_scope(i) for i in outlet_ids))
+
+
+def cached_json(scope, build, personalise=None):
+    """
+    Serve a JSON response from the menu cache with a strong ETag, answering
+    If-None-Match with 304. build() returns (body, status) and only 200
+    responses are cached.
+    personalise(body), if given, returns (body, ETag suffix) adjusting the
+    shared response for the requesting user.
+    """
+    cache = get_menu_cache()
+    variant = tuple(sorted(request.args.items(multi=True)))
+
+    entry = cache.get(scope, variant)
+    if entry is None:
+        generation = cache.generation(scope)
+        body, status = build()
+        if status != 200:
+            return body, status
+
+        payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        entry = (hashlib.sha256(payload).hexdigest(), payload)
+        cache.put(scope, variant, generation, *entry)
+
+    etag, payload = entry
+    if personalise:
+        body, suffix = personalise(json.loads(payload))
+        payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        etag = hashlib.sha256(f"{etag}:{suffix}".encode()).hexdigest()
+
+    response = Response(payload, mimetype="application/json")
+    response.set_etag(etag)
+    # Listings may be personalised, so shared caches must key on the user
+    response.vary.add("Authorization")
+    # Clients may keep the body but must revalidate it on every use
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.orm import joinedload
+
+from extensions import db
+from models import MenuChange, MenuChangeKind, MenuOutletItem, Outlet
+
+
+# Changes returned per /api/menu/changes response; clients page on with
+# the returned version while has_more is set
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 2000
+
+
+def record_menu_changes(menu_ids, kind):
+    """
+    Log a change to each menu entry inside the caller's transaction and
+    move the outlets' menu versions on. Removed entries must be recorded
+    before they are deleted, as their outlet and item are read from them.
+    """
+    menu_ids = list(menu_ids)
+    if not menu_ids:
+        return
+
+    db.session.flush()
+    last = db.session.scalar(select(func.max(MenuChange.id))) or 0
+    db.session.execute(
+        insert(MenuChange).from_select(
+            ["menu_outlet_item_id", "outlet_id", "item_id", "kind", "created_at"],
+            select(
+                MenuOutletItem.id,
+                MenuOutletItem.outlet_id,
+                MenuOutletItem.item_id,
+                literal(kind, MenuChange.kind.type),
+                literal(datetime.utcnow(), MenuChange.created_at.type)
+            )
+            .where(MenuOutletItem.id.in_(menu_ids))
+            .order_by(MenuOutletItem.id)
+        )
+    )
+
+    changed = select(MenuChange.outlet_id).where(MenuChange.id > last)
+    db.session.execute(
+        update(Outlet)
+        .where(Outlet.id.in_(changed))
+        .values(menu_version=(
+            select(func.max(MenuChange.id))
+            .where(MenuChange.outlet_id == Outlet.id)
+            .scalar_subquery()
+        ))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def current_menu_version(outlet_id=None):
+    query = select(func.max(MenuChange.id))
+    if outlet_id is not None:
+        query = query.where(MenuChange.outlet_id == outlet_id)
+    return db.session.scalar(query) or 0
+
+
+def menu_changes_since(since, outlet_id=None, limit=DEFAULT_CHANGES_LIMIT):
+    """
+    Net changes to menu entries after version `since`, oldest first,
+    collapsed to one per entry.
+    reset is set when changes after `since` have been purged (or `since`
+    was never issued); the client must then reload the whole menu.
+    Returns: dict with version, has_more, reset, and entry lists
+    added/updated/unavailable (MenuOutletItem rows) and removed (MenuChange rows)
+    """
+    latest = current_menu_version()
+    oldest = db.session.scalar(select(func.min(MenuChange.id)))
+    result = {
+        "version": latest,
+        "has_more": False,
+        "reset": False,
+        "added": [],
+        "updated": [],
+        "unavailable": [],
+        "removed": [],
+    }
+    if since > latest or (oldest is not None and since < oldest - 1):
+        result["reset"] = True
+        return result
+
+    query = select(MenuChange).where(MenuChange.id > since)
+    if outlet_id is not None:
+        query = query.where(MenuChange.outlet_id == outlet_id)
+    changes = db.session.scalars(query.order_by(MenuChange.id).limit(limit + 1)).all()
+
+    if len(changes) > limit:
+        changes = changes[:limit]
+        result["has_more"] = True
+        result["version"] = changes[-1].id
+
+    # First and last change per entry inside this page
+    first = {}
+    last = {}
+    for change in changes:
+        first.setdefault(change.menu_outlet_item_id, change)
+        last[change.menu_outlet_item_id] = change
+
+    live_ids = [
+        menu_id for menu_id, change in last.items()
+        if change.kind != MenuChangeKind.removed
+    ]
+    entries = {
+        entry.id: entry
+        for entry in (
+            MenuOutletItem.query
+            .options(joinedload(MenuOutletItem.item), joinedload(MenuOutletItem.outlet))
+            .filter(MenuOutletItem.id.in_(live_ids))
+        )
+    } if live_ids else {}
+
+    for menu_id, change in last.items():
+        added = first[menu_id].kind == MenuChangeKind.added
+        if change.kind == MenuChangeKind.removed:
+            # Added and removed since the client last synced: it never saw it
+            if not added:
+                result["removed"].append(change)
+            continue
+
+        entry = entries.get(menu_id)
+        if entry is None:
+            # Removed after this page; a later page carries the tombstone
+            continue
+        if added:
+            result["added"].append(entry)
+        elif entry.item.is_available is False:
+            result["unavailable"].append(entry)
+        else:
+            result["updated"].append(entry)
+
+    return result
+
+
+def purge_menu_changes(retention_days):
+    """
+    Delete changes, including tombstones, older than the retention window.
+    The newest change is always kept so the current version survives.
+    Returns: number of rows deleted
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    latest = current_menu_version()
+    result = db.session.execute(
+        delete(MenuChange)
+        .where(MenuChange.created_at < cutoff, MenuChange.id < latest)
+    )
+    db.session.commit()
+    return result.rowcount
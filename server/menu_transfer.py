@@ -0,0 +1,298 @@
+import csv
+import io
+import json
+import os
+import zipfile
+
+from sqlalchemy import insert, select, func
+from werkzeug.datastructures import FileStorage
+
+from extensions import db
+from models import Item, MenuOutletItem, MenuChangeKind
+from images import PHOTOS_FOLDER, is_stored_image
+from image_jobs import image_jobs
+from kitchen import DEFAULT_PREP_MINUTES
+from menu_cache import invalidate_menus
+from leaderboard import leaderboard
+from search import sync_menu_search
+from menu_changes import record_menu_changes
+
+
+MENU_FORMATS = ("csv", "json")
+
+# Columns read on import and written on export, in order
+MENU_COLUMNS = ("name", "price", "description", "category", "is_available", "prep_minutes", "image")
+
+MAX_IMPORT_ROWS = 5000
+
+# Largest image accepted from an import zip, same as a single upload
+MAX_IMPORT_IMAGE_SIZE = 5 * 1024 * 1024
+
+IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+
+# Rows fetched per round trip when exporting
+EXPORT_BATCH_SIZE = 500
+
+# Shown for imported items until their zipped image has been processed
+PLACEHOLDER_IMAGE = "default-food.jpg"
+
+
+class MenuImportError(ValueError):
+    """The import as a whole is unusable; per-row problems are reported separately"""
+
+
+def parse_menu(data, fmt):
+    """
+    Rows of a CSV (header row with MENU_COLUMNS) or JSON (list of objects,
+    or {"items": [...]}) menu file
+    Raises MenuImportError if the file cannot be read
+    """
+    if fmt not in MENU_FORMATS:
+        raise MenuImportError(f"Invalid format, use one of: {', '.join(MENU_FORMATS)}")
+
+    if isinstance(data, bytes):
+        try:
+            data = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise MenuImportError("Menu file must be UTF-8")
+
+    if fmt == "csv":
+        rows = list(csv.DictReader(io.StringIO(data)))
+    else:
+        try:
+            rows = json.loads(data) if isinstance(data, str) else data
+        except ValueError:
+            raise MenuImportError("Invalid JSON")
+        if isinstance(rows, dict):
+            rows = rows.get("items")
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise MenuImportError("JSON menu must be a list of objects")
+
+    if not rows:
+        raise MenuImportError("Menu file has no rows")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise MenuImportError(f"At most {MAX_IMPORT_ROWS} rows per import")
+    return rows
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes"):
+        return True
+    if text in ("false", "0", "no"):
+        return False
+    raise ValueError
+
+
+def _validate_row(row, zipped_images):
+    """Returns: (values, image source, errors) for one input row"""
+    errors = []
+    values = {}
+
+    def text(key):
+        value = row.get(key)
+        return str(value).strip() if value is not None else ""
+
+    values["name"] = text("name")
+    if not values["name"]:
+        errors.append("name is required")
+    elif len(values["name"]) > 120:
+        errors.append("name must be at most 120 characters")
+
+    try:
+        values["price"] = float(text("price"))
+        if values["price"] < 0:
+            errors.append("price must not be negative")
+    except ValueError:
+        errors.append("price must be a number")
+
+    values["description"] = text("description") or None
+    values["category_name"] = text("category") or text("category_name") or None
+
+    values["is_available"] = True
+    if text("is_available"):
+        try:
+            values["is_available"] = _parse_bool(row["is_available"])
+        except ValueError:
+            errors.append("is_available must be true or false")
+
+    # Every row carries every column so the insert is a single executemany
+    values["prep_minutes"] = DEFAULT_PREP_MINUTES
+    if text("prep_minutes"):
+        try:
+            values["prep_minutes"] = int(text("prep_minutes"))
+            if values["prep_minutes"] <= 0:
+                errors.append("prep_minutes must be positive")
+        except ValueError:
+            errors.append("prep_minutes must be a whole number")
+
+    # An image is either a file in the uploaded zip, or an already
+    # processed image (e.g. from an export of another outlet)
+    image = text("image")
+    source = None
+    values["image"] = PLACEHOLDER_IMAGE
+    if image:
+        if image in zipped_images:
+            info = zipped_images[image]
+            if image.rsplit(".", 1)[-1].lower() not in IMAGE_EXTENSIONS:
+                errors.append("image must be png, jpg, jpeg, gif or webp")
+            elif info.file_size > MAX_IMPORT_IMAGE_SIZE:
+                errors.append("image is larger than 5MB")
+            else:
+                source = info
+        elif is_stored_image(image) and os.path.isfile(os.path.join(PHOTOS_FOLDER, image)):
+            values["image"] = image
+        else:
+            errors.append(f"image {image} not found in the images zip")
+
+    return values, source, errors
+
+
+def validate_menu(rows, outlet_id, images_zip=None):
+    """
+    Check every row before anything is written. Names must be unique in
+    the file and not already on the outlet's menu.
+    Returns: (valid rows as (values, image source), errors per row number)
+    """
+    zipped_images = {}
+    if images_zip is not None:
+        zipped_images = {
+            os.path.basename(info.filename): info
+            for info in images_zip.infolist() if not info.is_dir()
+        }
+
+    existing = set(db.session.scalars(
+        select(func.lower(Item.name))
+        .join(MenuOutletItem, MenuOutletItem.item_id == Item.id)
+        .where(MenuOutletItem.outlet_id == outlet_id)
+    ))
+
+    valid = []
+    errors = []
+    seen = set()
+    for number, row in enumerate(rows, start=1):
+        values, source, row_errors = _validate_row(row, zipped_images)
+
+        key = values["name"].lower()
+        if key and key in existing:
+            row_errors.append("an item with this name is already on the menu")
+        elif key and key in seen:
+            row_errors.append("duplicate name in this import")
+        seen.add(key)
+
+        if row_errors:
+            errors.append({"row": number, "name": values["name"] or None, "errors": row_errors})
+        else:
+            valid.append((values, source))
+
+    return valid, errors
+
+
+def _insert_many(model, rows):
+    """
+    Insert rows with a single executemany
+    Returns: the new ids, in row order
+    """
+    db.session.execute(insert(model), rows)
+    # SQLite holds the write lock from the first insert until commit and
+    # assigns max(id) + 1 to each row, so the new ids are one contiguous block
+    last = db.session.scalar(select(func.max(model.id)))
+    return list(range(last - len(rows) + 1, last + 1))
+
+
+def import_menu(outlet_id, rows, images_zip=None):
+    """
+    Validate rows and, only if all are valid, insert the items and their
+    menu links with executemany in one transaction.
+    Zipped images are queued for background processing after commit.
+    Returns: (imported rows, errors); nothing is written when errors is non-empty
+    """
+    valid, errors = validate_menu(rows, outlet_id, images_zip)
+    if errors:
+        return [], errors
+
+    item_ids = _insert_many(Item, [values for values, _ in valid])
+    menu_ids = _insert_many(
+        MenuOutletItem,
+        [{"outlet_id": outlet_id, "item_id": item_id} for item_id in item_ids]
+    )
+
+    sync_menu_search(menu_ids)
+    record_menu_changes(menu_ids, MenuChangeKind.added)
+    db.session.commit()
+    invalidate_menus([outlet_id])
+    leaderboard.regroup()
+
+    imported = []
+    for (values, source), item_id, menu_id in zip(valid, item_ids, menu_ids):
+        job = None
+        if source is not None:
+            data = images_zip.read(source)
+            job = image_jobs.submit(FileStorage(io.BytesIO(data), source.filename), "item", item_id)
+        imported.append({
+            "name": values["name"],
+            "item_id": item_id,
+            "menu_id": menu_id,
+            "image_job": job.id if job else None
+        })
+
+    return imported, []
+
+
+def open_images_zip(stream):
+    """Raises MenuImportError if stream is not a zip file"""
+    try:
+        return zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise MenuImportError("images must be a zip file")
+
+
+def export_menu(outlet_id, fmt="csv"):
+    """
+    Stream an outlet's menu in the import format, so it can be imported
+    into another outlet. Image names refer to processed images, which an
+    import reuses without a zip.
+    Returns: generator of text chunks
+    """
+    if fmt not in MENU_FORMATS:
+        raise MenuImportError(f"Invalid format, use one of: {', '.join(MENU_FORMATS)}")
+
+    items = (
+        Item.query
+        .join(MenuOutletItem, MenuOutletItem.item_id == Item.id)
+        .filter(MenuOutletItem.outlet_id == outlet_id)
+        .order_by(MenuOutletItem.id)
+        .execution_options(stream_results=True)
+        .yield_per(EXPORT_BATCH_SIZE)
+    )
+
+    def row(item):
+        return {
+            "name": item.name,
+            "price": item.price,
+            "description": item.description or "",
+            "category": item.category_name or "",
+            "is_available": item.is_available if item.is_available is not None else True,
+            "prep_minutes": item.prep_minutes,
+            "image": item.image if is_stored_image(item.image) else "",
+        }
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=MENU_COLUMNS)
+        writer.writeheader()
+        for item in items:
+            writer.writerow(row(item))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def generate_json():
+        yield "["
+        for index, item in enumerate(items):
+            yield ("," if index else "") + "\n" + json.dumps(row(item))
+        yield "\n]\n"
+
+    return generate_csv() if fmt == "csv" else generate_json()
@@ -0,0 +1,42 @@
+"""add menu search index
+
+Revision ID: 73cf9d06363d
+Revises: a27901186672
+Create Date: 2026-10-18 02:05:11.204918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '73cf9d06363d'
+down_revision = 'a27901186672'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 index over dish and outlet text, one row per menu_outlet_items row
+    op.execute("""
+        CREATE VIRTUAL TABLE menu_search USING fts5(
+            name,
+            description,
+            category_name,
+            outlet_name,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    """)
+    op.execute("""
+        INSERT INTO menu_search (rowid, name, description, category_name, outlet_name)
+        SELECT menu_outlet_items.id, items.name, coalesce(items.description, ''),
+               coalesce(items.category_name, ''), outlets.name
+        FROM menu_outlet_items
+        JOIN items ON items.id = menu_outlet_items.item_id
+        JOIN outlets ON outlets.id = menu_outlet_items.outlet_id
+    """)
+
+
+def downgrade():
+    op.execute("DROP TABLE menu_search")
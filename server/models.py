@@ -2,7 +2,7 @@ from datetime import datetime
 import enum
 import uuid
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Enum, UniqueConstraint
+from sqlalchemy import Enum, UniqueConstraint, Index
 
 # db = SQLAlchemy()
 from extensions import db
@@ -13,6 +13,11 @@ class OrderStatus(enum.Enum):
     completed = "completed"
     cancelled = "cancelled"
 
+class MenuChangeKind(enum.Enum):
+    added = "added"
+    updated = "updated"
+    removed = "removed"
+
 class BookingStatus(enum.Enum):
     pending = "pending"
     confirmed = "confirmed"
@@ -35,6 +40,12 @@ class Testimonial(db.Model):
     
     # Relationship
     outlet = db.relationship("Outlet", back_populates="testimonials")
+
+    # Newest-first pages per outlet and across all outlets
+    __table_args__ = (
+        Index("ix_testimonials_outlet_created", "outlet_id", "created_at", "id"),
+        Index("ix_testimonials_created", "created_at", "id"),
+    )
     
     def __repr__(self):
         return f"<Testimonial {self.customer_name} - {self.rating}★>"
@@ -87,8 +98,10 @@ class Outlet(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
     category_name = db.Column(db.String(120))
-    owner_id = db.Column(db.Integer, db.ForeignKey("owner.id"), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey("owner.id"), nullable=False, index=True)
     image_path = db.Column(db.String(255), nullable=True)
+    # Id of the latest MenuChange for this outlet's menu
+    menu_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)
     
     owner = db.relationship(
         "Owner",
@@ -107,6 +120,12 @@ class Outlet(db.Model):
         cascade="all, delete-orphan",
         lazy=True
     )
+    rating = db.relationship(
+        "OutletRating",
+        uselist=False,
+        cascade="all, delete-orphan",
+        lazy=True
+    )
 
     def __repr__(self):
         return f"<Outlet {self.name}>"
@@ -122,6 +141,7 @@ class Item(db.Model):
     category_name = db.Column ( db.String ( 120 ) )
     is_available = db.Column(db.Boolean, default=True)
     favourites = db.Column (db.Integer, default=0, nullable=False)
+    prep_minutes = db.Column(db.Integer, default=10, server_default="10", nullable=False)
 
     menu_links = db.relationship(
         "MenuOutletItem",
@@ -137,6 +157,12 @@ class Item(db.Model):
         lazy= True
     )
 
+    __table_args__ = (
+        # Menu filters: category with a price range or price sort
+        Index("ix_items_category_price", "category_name", "price"),
+        Index("ix_items_is_available", "is_available"),
+    )
+
     def __repr__(self):
         return f"<Item {self.name}>"
 
@@ -173,6 +199,9 @@ class MenuOutletItem(db.Model):
 class Order(db.Model):
     __tablename__ = "orders"
 
+    # Order header. Every order belongs to a single outlet and holds its dishes
+    # in `lines`; menu_outlet_item_id points at the first line (and so routes
+    # the order to its outlet) and quantity is the total number of dishes.
     id = db.Column(db.Integer, primary_key=True)
     menu_outlet_item_id = db.Column(
         db.Integer,
@@ -188,6 +217,8 @@ class Order(db.Model):
     status = db.Column(Enum(OrderStatus), default=OrderStatus.pending)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     estimated = db.Column(db.DateTime)
+    # Sum of line totals at the prices charged when the order was placed
+    total = db.Column(db.Integer, default=0, server_default="0", nullable=False)
 
     customer = db.relationship(
         "Customer",
@@ -206,9 +237,63 @@ class Order(db.Model):
         cascade="all, delete-orphan"
     )
 
+    lines = db.relationship(
+        "OrderLine",
+        back_populates="order",
+        cascade="all, delete-orphan",
+        order_by="OrderLine.id",
+        lazy=True
+    )
+
+    __table_args__ = (
+        # Owner dashboards: orders for a menu item, filtered by status and date
+        Index("ix_orders_menu_outlet_item_status_created", "menu_outlet_item_id", "status", "created_at"),
+        # Customer order history
+        Index("ix_orders_customer_created", "customer_id", "created_at"),
+        # Live orders by status
+        Index("ix_orders_status_created", "status", "created_at"),
+        # Keyset pagination on (created_at, id)
+        Index("ix_orders_created_id", "created_at", "id"),
+        # Never reuse ids of rows moved to the archive tables
+        {"sqlite_autoincrement": True},
+    )
+
     def __repr__(self):
         return f"<Order {self.id}>"
 
+class OrderLine(db.Model):
+    __tablename__ = "order_lines"
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(
+        db.Integer,
+        db.ForeignKey("orders.id"),
+        nullable=False,
+        index=True
+    )
+    menu_outlet_item_id = db.Column(
+        db.Integer,
+        db.ForeignKey("menu_outlet_items.id"),
+        nullable=False,
+        index=True
+    )
+    quantity = db.Column(db.Integer, nullable=False)
+    # Item price snapshot, so later menu price edits don't rewrite history
+    unit_price = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    line_total = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+
+    order = db.relationship(
+        "Order",
+        back_populates="lines"
+    )
+
+    menu_outlet_item = db.relationship("MenuOutletItem")
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    def __repr__(self):
+        return f"<OrderLine order={self.order_id} item={self.menu_outlet_item_id}>"
+
 class TableBooking(db.Model):
     __tablename__ = "table_bookings"
 
@@ -232,9 +317,115 @@ class TableBooking(db.Model):
         back_populates="table_booking"
     )
 
+    __table_args__ = {"sqlite_autoincrement": True}
+
     def __repr__(self):
         return f"<TableBooking table={self.table_number}>"
 
+# Cold storage for orders in a terminal state, moved out of the hot tables by
+# archive.archive_orders. Same columns and ids as the live tables, so
+# serialize_order works on either.
+class ArchivedOrder(db.Model):
+    __tablename__ = "archived_orders"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    menu_outlet_item_id = db.Column(
+        db.Integer,
+        db.ForeignKey("menu_outlet_items.id"),
+        nullable=False
+    )
+    customer_id = db.Column(
+        db.Integer,
+        db.ForeignKey("customer.id"),
+        nullable=False
+    )
+    quantity = db.Column(db.Integer, nullable=False)
+    status = db.Column(Enum(OrderStatus))
+    created_at = db.Column(db.DateTime)
+    estimated = db.Column(db.DateTime)
+    total = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    customer = db.relationship("Customer")
+
+    menu_outlet_item = db.relationship("MenuOutletItem")
+
+    table_booking = db.relationship(
+        "ArchivedTableBooking",
+        back_populates="order",
+        uselist=False
+    )
+
+    lines = db.relationship(
+        "ArchivedOrderLine",
+        back_populates="order",
+        order_by="ArchivedOrderLine.id",
+        lazy=True
+    )
+
+    __table_args__ = (
+        Index("ix_archived_orders_menu_outlet_item_created", "menu_outlet_item_id", "created_at"),
+        Index("ix_archived_orders_customer_created", "customer_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedOrder {self.id}>"
+
+class ArchivedOrderLine(db.Model):
+    __tablename__ = "archived_order_lines"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(
+        db.Integer,
+        db.ForeignKey("archived_orders.id"),
+        nullable=False,
+        index=True
+    )
+    menu_outlet_item_id = db.Column(
+        db.Integer,
+        db.ForeignKey("menu_outlet_items.id"),
+        nullable=False
+    )
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    line_total = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+
+    order = db.relationship(
+        "ArchivedOrder",
+        back_populates="lines"
+    )
+
+    menu_outlet_item = db.relationship("MenuOutletItem")
+
+    def __repr__(self):
+        return f"<ArchivedOrderLine order={self.order_id} item={self.menu_outlet_item_id}>"
+
+class ArchivedTableBooking(db.Model):
+    __tablename__ = "archived_table_bookings"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    order_id = db.Column(
+        db.Integer,
+        db.ForeignKey("archived_orders.id"),
+        unique=True,
+        nullable=False
+    )
+    table_number = db.Column(db.Integer, nullable=False)
+    capacity = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime)
+    duration = db.Column(db.Interval)
+    status = db.Column(Enum(BookingStatus))
+    booking_date = db.Column(db.DateTime)
+    special_requests = db.Column(db.Text, nullable=True)
+
+    order = db.relationship(
+        "ArchivedOrder",
+        back_populates="table_booking"
+    )
+
+    def __repr__(self):
+        return f"<ArchivedTableBooking table={self.table_number}>"
+
 class CustomerFavourite(db.Model):
 
     __tablename__ = "customer_favourites"
@@ -242,6 +433,8 @@ class CustomerFavourite(db.Model):
     id = db.Column ( db.Integer, primary_key=True )
     customer_id = db.Column ( db.Integer, db.ForeignKey("customer.id"), nullable=False )
     item_id = db.Column ( db.Integer, db.ForeignKey("items.id"), nullable=False )
+    # When the item was favourited; NULL for favourites made before this was recorded
+    created_at = db.Column ( db.DateTime, default=datetime.utcnow )
 
     __table_args__ = (
         UniqueConstraint("customer_id", "item_id", name="unique_customer_item_favourite"),
@@ -258,4 +451,77 @@ class CustomerFavourite(db.Model):
     )
 
     def __repr__(self):
-        return f"<CustomerFavourite customer={self.customer_id} item={self.item_id}>"
\ No newline at end of file
+        return f"<CustomerFavourite customer={self.customer_id} item={self.item_id}>"
+
+# Daily sales rollups, kept up to date as orders are written (see rollups.py).
+# Cancelled orders are not counted.
+class DailyItemSales(db.Model):
+    __tablename__ = "daily_item_sales"
+
+    day = db.Column(db.Date, primary_key=True)
+    outlet_id = db.Column(db.Integer, db.ForeignKey("outlets.id"), primary_key=True)
+    item_id = db.Column(db.Integer, db.ForeignKey("items.id"), primary_key=True)
+    order_count = db.Column(db.Integer, default=0, nullable=False)
+    quantity = db.Column(db.Integer, default=0, nullable=False)
+    revenue = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_daily_item_sales_outlet_day", "outlet_id", "day"),
+    )
+
+    def __repr__(self):
+        return f"<DailyItemSales {self.day} outlet={self.outlet_id} item={self.item_id}>"
+
+class DailyOutletSales(db.Model):
+    __tablename__ = "daily_outlet_sales"
+
+    day = db.Column(db.Date, primary_key=True)
+    outlet_id = db.Column(db.Integer, db.ForeignKey("outlets.id"), primary_key=True)
+    order_count = db.Column(db.Integer, default=0, nullable=False)
+    revenue = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_daily_outlet_sales_outlet_day", "outlet_id", "day"),
+    )
+
+    def __repr__(self):
+        return f"<DailyOutletSales {self.day} outlet={self.outlet_id}>"
+
+# Testimonial rating totals per outlet, kept up to date as testimonials
+# are written (see ratings.py). No row means no ratings yet.
+class OutletRating(db.Model):
+    __tablename__ = "outlet_ratings"
+
+    outlet_id = db.Column(db.Integer, db.ForeignKey("outlets.id"), primary_key=True)
+    rating_count = db.Column(db.Integer, default=0, nullable=False)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)
+    stars_1 = db.Column(db.Integer, default=0, nullable=False)
+    stars_2 = db.Column(db.Integer, default=0, nullable=False)
+    stars_3 = db.Column(db.Integer, default=0, nullable=False)
+    stars_4 = db.Column(db.Integer, default=0, nullable=False)
+    stars_5 = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<OutletRating outlet={self.outlet_id} {self.rating_sum}/{self.rating_count}>"
+
+# Log of menu entry changes for delta sync; each id is a menu version (see
+# menu_changes.py). Rows outlive the entries they describe, so removed rows
+# act as tombstones and there are no foreign keys.
+class MenuChange(db.Model):
+    __tablename__ = "menu_changes"
+
+    id = db.Column(db.Integer, primary_key=True)
+    outlet_id = db.Column(db.Integer, nullable=False)
+    menu_outlet_item_id = db.Column(db.Integer, nullable=False)
+    item_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(Enum(MenuChangeKind), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_menu_changes_outlet_id", "outlet_id", "id"),
+        # Ids are never reused, even after the newest rows are deleted
+        {"sqlite_autoincrement": True},
+    )
+
+    def __repr__(self):
+        return f"<MenuChange {self.id} {self.kind.value} menu={self.menu_outlet_item_id}>"
@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import tuple_
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at, row_id):
+    """Opaque cursor pointing at the last row of a page"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor made by encode_cursor
+    Returns: (created_at, row_id), raises ValueError if the cursor is malformed
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), row_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def page_size():
+    """Read ?limit= from the request, clamped to MAX_PAGE_SIZE"""
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or limit <= 0:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_page(query, created_col, id_col, cursor, limit, descending=False):
+    """
+    Apply keyset pagination on (created_at, id) to query
+    Returns: (rows, next_cursor); next_cursor is None on the last page
+    """
+    key = tuple_(created_col, id_col)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.filter(key < position if descending else key > position)
+
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col, id_col)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+    return rows, next_cursor
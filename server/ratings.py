@@ -0,0 +1,75 @@
+from sqlalchemy import select, delete, func, case
+from sqlalchemy.dialects.sqlite import insert
+
+from extensions import db
+from models import OutletRating, Testimonial
+
+
+STARS = range(1, 6)
+
+# Average rating as SQL, NULL for outlets without ratings; for sorting
+average_rating = OutletRating.rating_sum * 1.0 / func.nullif(OutletRating.rating_count, 0)
+
+
+def _stars_column(stars):
+    return f"stars_{stars}"
+
+
+def record_rating(outlet_id, old=None, new=None):
+    """
+    Move a testimonial's rating in the outlet's totals: new only when it
+    is created, old and new when it changes, old only when it is deleted.
+    Runs in the caller's transaction as a single upsert of deltas, so
+    concurrent writes cannot lose counts.
+    """
+    if old == new:
+        return
+
+    deltas = {
+        "rating_count": (new is not None) - (old is not None),
+        "rating_sum": (new or 0) - (old or 0),
+    }
+    for stars in STARS:
+        deltas[_stars_column(stars)] = (stars == new) - (stars == old)
+
+    table = OutletRating.__table__
+    statement = insert(table).values(outlet_id=outlet_id, **deltas)
+    statement = statement.on_conflict_do_update(
+        index_elements=["outlet_id"],
+        set_={name: table.c[name] + statement.excluded[name] for name in deltas}
+    )
+    db.session.execute(statement)
+
+
+def rating_summary(rating):
+    """Returns: {"count", "average", "histogram"} for an OutletRating or None"""
+    count = rating.rating_count if rating else 0
+    return {
+        "count": count,
+        "average": round(rating.rating_sum / count, 2) if count else None,
+        "histogram": {
+            str(stars): getattr(rating, _stars_column(stars)) if rating else 0
+            for stars in STARS
+        }
+    }
+
+
+def rebuild_outlet_ratings():
+    """
+    Recompute every outlet's rating totals from its testimonials
+    Returns: number of outlets with ratings
+    """
+    db.session.execute(delete(OutletRating))
+    result = db.session.execute(
+        insert(OutletRating).from_select(
+            ["outlet_id", "rating_count", "rating_sum", *(_stars_column(s) for s in STARS)],
+            select(
+                Testimonial.outlet_id,
+                func.count(),
+                func.sum(Testimonial.rating),
+                *(func.sum(case((Testimonial.rating == s, 1), else_=0)) for s in STARS)
+            ).group_by(Testimonial.outlet_id)
+        )
+    )
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,174 @@
+from datetime import date
+
+from sqlalchemy import select, delete, func, union_all
+from sqlalchemy.dialects.sqlite import insert
+
+from extensions import db
+from models import (
+    Order,
+    OrderLine,
+    OrderStatus,
+    MenuOutletItem,
+    ArchivedOrder,
+    ArchivedOrderLine,
+    DailyItemSales,
+    DailyOutletSales
+)
+
+
+def counts_towards_sales(order):
+    return order.status != OrderStatus.cancelled
+
+
+def _upsert(model, keys, values):
+    """Add values onto the rollup row for keys, creating it if needed"""
+    table = model.__table__
+    statement = insert(table).values(**keys, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + statement.excluded[name] for name in values}
+    )
+    db.session.execute(statement)
+
+
+def record_order(order, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) an order's lines from the daily rollups.
+    Runs in the caller's transaction so rollups commit with the order.
+    """
+    if not counts_towards_sales(order):
+        return
+
+    # Make sure created_at and the line rows exist
+    db.session.flush()
+
+    day = order.created_at.date()
+    outlet_id = order.menu_outlet_item.outlet_id
+
+    for line in order.lines:
+        _upsert(
+            DailyItemSales,
+            {"day": day, "outlet_id": outlet_id, "item_id": line.menu_outlet_item.item_id},
+            {"order_count": sign, "quantity": sign * line.quantity, "revenue": sign * line.line_total}
+        )
+
+    _upsert(
+        DailyOutletSales,
+        {"day": day, "outlet_id": outlet_id},
+        {"order_count": sign, "revenue": sign * order.total}
+    )
+
+    if sign < 0:
+        _prune(day, outlet_id)
+
+
+def _prune(day, outlet_id):
+    """Drop rows emptied by a cancellation so rollups match a rebuild"""
+    for model in (DailyItemSales, DailyOutletSales):
+        db.session.execute(
+            delete(model).where(
+                model.day == day,
+                model.outlet_id == outlet_id,
+                model.order_count <= 0
+            )
+        )
+
+
+def remove_orders(order_ids):
+    """
+    Take many orders out of the rollups at once, e.g. after a bulk
+    cancellation. Deltas are grouped per rollup row, so the statement count
+    depends on the days/items touched, not on the number of orders.
+    Only pass orders that are still counted in the rollups.
+    """
+    day = func.date(Order.created_at).label("day")
+    orders = func.count(func.distinct(Order.id)).label("orders")
+    revenue = func.sum(OrderLine.line_total).label("revenue")
+    sold = (
+        db.session.query(day, MenuOutletItem.outlet_id)
+        .select_from(Order)
+        .join(Order.lines)
+        .join(OrderLine.menu_outlet_item)
+        .filter(Order.id.in_(order_ids))
+    )
+
+    items = (
+        sold.add_columns(MenuOutletItem.item_id, orders, func.sum(OrderLine.quantity).label("quantity"), revenue)
+        .group_by(day, MenuOutletItem.outlet_id, MenuOutletItem.item_id)
+        .all()
+    )
+    outlets = (
+        sold.add_columns(orders, revenue)
+        .group_by(day, MenuOutletItem.outlet_id)
+        .all()
+    )
+
+    for row in items:
+        _upsert(
+            DailyItemSales,
+            {"day": date.fromisoformat(row.day), "outlet_id": row.outlet_id, "item_id": row.item_id},
+            {"order_count": -row.orders, "quantity": -row.quantity, "revenue": -row.revenue}
+        )
+
+    for row in outlets:
+        _upsert(
+            DailyOutletSales,
+            {"day": date.fromisoformat(row.day), "outlet_id": row.outlet_id},
+            {"order_count": -row.orders, "revenue": -row.revenue}
+        )
+        _prune(date.fromisoformat(row.day), row.outlet_id)
+
+
+def rebuild_daily_sales():
+    """
+    Recompute both rollup tables from live and archived orders
+    Returns: number of item rollup rows written
+    """
+    def lines(order_model, line_model):
+        return (
+            select(
+                func.date(order_model.created_at).label("day"),
+                MenuOutletItem.outlet_id,
+                MenuOutletItem.item_id,
+                line_model.order_id,
+                line_model.quantity,
+                line_model.line_total
+            )
+            .join(order_model, order_model.id == line_model.order_id)
+            .join(MenuOutletItem, MenuOutletItem.id == line_model.menu_outlet_item_id)
+            .where(order_model.status != OrderStatus.cancelled)
+        )
+
+    sold = union_all(lines(Order, OrderLine), lines(ArchivedOrder, ArchivedOrderLine)).subquery()
+
+    db.session.execute(delete(DailyItemSales))
+    db.session.execute(delete(DailyOutletSales))
+
+    result = db.session.execute(
+        insert(DailyItemSales).from_select(
+            ["day", "outlet_id", "item_id", "order_count", "quantity", "revenue"],
+            select(
+                sold.c.day,
+                sold.c.outlet_id,
+                sold.c.item_id,
+                func.count(func.distinct(sold.c.order_id)),
+                func.sum(sold.c.quantity),
+                func.sum(sold.c.line_total)
+            ).group_by(sold.c.day, sold.c.outlet_id, sold.c.item_id)
+        )
+    )
+
+    db.session.execute(
+        insert(DailyOutletSales).from_select(
+            ["day", "outlet_id", "order_count", "revenue"],
+            select(
+                sold.c.day,
+                sold.c.outlet_id,
+                func.count(func.distinct(sold.c.order_id)),
+                func.sum(sold.c.line_total)
+            ).group_by(sold.c.day, sold.c.outlet_id)
+        )
+    )
+
+    db.session.commit()
+    return result.rowcount
@@ -1,9 +1,19 @@
 
 from flask import request
 from flask_restful import Resource
-from models import db, Item, CustomerFavourite
+from models import db, Item, CustomerFavourite, MenuOutletItem
 from auth.permissions import require_customer
-from sqlalchemy import func # SQLAlchemy function imports - to be removed later
+from images import image_variants
+from favourites import invalidate_favourites
+from leaderboard import leaderboard
+from sqlalchemy.orm import joinedload
+
+
+# Items shown on the homepage unless ?limit= asks for more
+DEFAULT_TOP_FAVOURITES = 4
+MAX_TOP_FAVOURITES = 50
+
+RANKINGS = ("overall", "trending")
 
 
 
@@ -25,6 +35,7 @@ class CustomerFavourites ( Resource ) :
                 "name" : fav.item.name,
                 "description" : fav.item.description,
                 "image" : fav.item.image,
+                "images" : image_variants ( fav.item.image ),
                 "price" : fav.item.price,
                 "is_available" : fav.item.is_available,
                 "favourites_count" : fav.item.favourites
@@ -49,6 +60,9 @@ class FavouriteButton ( Resource ) :
         if not item :
             return { "message" : "Item not found" }, 404
         
+        # Load the leaderboard before the toggle is committed, or the load would count it
+        leaderboard.ensure_loaded()
+
         current_fav = CustomerFavourite.query.filter_by ( customer_id = customer.id, item_id = item_id ).first()
 
         # Removing a favourite
@@ -57,6 +71,8 @@ class FavouriteButton ( Resource ) :
             db.session.delete ( current_fav )
             item.favourites = Item.favourites - 1 if item.favourites > 0 else 0
             db.session.commit()
+            invalidate_favourites(customer.id)
+            leaderboard.unfavourited(item.id, current_fav.created_at)
 
             return { 
                 "message": f"Removed {item.name} from favourites",
@@ -69,6 +85,8 @@ class FavouriteButton ( Resource ) :
         db.session.add ( new_fav )
         item.favourites = item.favourites + 1
         db.session.commit()
+        invalidate_favourites(customer.id)
+        leaderboard.favourited(item.id, new_fav.created_at)
 
         return { 
             "message": f"Added {item.name} to favourites",
@@ -78,42 +96,69 @@ class FavouriteButton ( Resource ) :
 
 
 
-# Get the top 4 favourited items by customers
+# Most favourited items for the homepage, overall, per outlet or per category,
+# or trending this week; served from the in-memory leaderboard
 class TopFavourites(Resource):
 
     def get(self):
-        top_items = (
-            db.session.query(
-                Item,
-                func.count(CustomerFavourite.id).label("favourite_count")
+        """
+        Query: ?limit= (default 4), ?outlet_id= or ?category=, and
+        ?ranking=trending for recent favourites weighted by age
+        """
+        limit = request.args.get("limit", DEFAULT_TOP_FAVOURITES, type=int)
+        limit = max(1, min(limit, MAX_TOP_FAVOURITES))
+        outlet_id = request.args.get("outlet_id", type=int)
+        category = request.args.get("category")
+
+        ranking = request.args.get("ranking", "overall")
+        if ranking not in RANKINGS:
+            return {"error": f"Invalid ranking, use one of: {', '.join(RANKINGS)}"}, 400
+
+        if ranking == "trending":
+            if outlet_id is not None or category:
+                return {"error": "Trending is only ranked across all outlets"}, 400
+            top_items = leaderboard.top_trending(limit)
+        else:
+            top_items = leaderboard.top(limit, outlet_id=outlet_id, category=category)
+
+        # Details for the ranked items, with their outlets, in one query
+        items = {
+            item.id: item
+            for item in (
+                Item.query
+                .options(joinedload(Item.menu_links).joinedload(MenuOutletItem.outlet))
+                .filter(Item.id.in_([item_id for item_id, _ in top_items]))
             )
-            .join(CustomerFavourite)
-            .group_by(Item.id)
-            .order_by(func.count(CustomerFavourite.id).desc())
-            .limit(4) # Only four top items to show in homepage
-            .all()
-        )
+        } if top_items else {}
 
         results = []
 
-        for item, favourite_count in top_items :
-            outlet = None
+        for item_id, score in top_items :
+            item = items.get(item_id)
+            if not item:
+                continue
 
-            if item.menu_links :
-                outlet =  item.menu_links[0].outlet # To return the linked outlet for each item, if it is found.
+            outlet = None
+            for link in item.menu_links:
+                # The requested outlet, otherwise the first one listing the item
+                if outlet_id is None or link.outlet_id == outlet_id:
+                    outlet = link.outlet
+                    break
             
-            results.extend ([
-                {
-                    "id" : item.id,
-                    "name" : item.name,
-                    "price" : item.price,
-                    "image" : item.image,
-                    "outlet_id" : outlet.id if outlet else None,
-                    "outlet_name" : outlet.name if outlet else None,
-                    "description" : item.description,
-                    "category_name" : item.category_name,
-                    "favourite_count" : favourite_count
-                }
-            ])
+            result = {
+                "id" : item.id,
+                "name" : item.name,
+                "price" : item.price,
+                "image" : item.image,
+                "images" : image_variants ( item.image ),
+                "outlet_id" : outlet.id if outlet else None,
+                "outlet_name" : outlet.name if outlet else None,
+                "description" : item.description,
+                "category_name" : item.category_name,
+                "favourite_count" : leaderboard.count ( item.id ) if ranking == "trending" else score
+            }
+            if ranking == "trending":
+                result["trending_score"] = round(score, 2)
+            results.append(result)
         
         return results, 200
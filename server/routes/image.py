@@ -0,0 +1,17 @@
+from flask_restful import Resource
+
+from images import image_variants
+from image_jobs import image_jobs
+
+
+class ImageJobResource(Resource):
+    def get(self, job_id):
+        """
+        Status of a background image job: pending, processing, done or failed
+        Once done, image and images hold the processed name and variant URLs
+        """
+        job = image_jobs.get(job_id)
+        if not job:
+            return {"error": "Image job not found"}, 404
+
+        return {**job.to_dict(), "images": image_variants(job.image)}, 200
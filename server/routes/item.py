@@ -1,23 +1,25 @@
 from flask_restful import Resource
 from flask import request
-from models import db, Item, CustomerFavourite
-from auth.permissions import require_owner, get_current_user
+from models import db, Item, MenuChangeKind
+from auth.permissions import require_owner
+from favourites import current_favourite_ids
+from menu_cache import invalidate_menus, item_outlet_ids
+from leaderboard import leaderboard
+from search import sync_menu_search, menu_ids_for
+from menu_changes import record_menu_changes
+from routes.order import ordered_menu_ids
 
 
 class ItemListResource(Resource):
 
     def get(self):
-        user = get_current_user()
+        # Empty for owners and anonymous requests
+        favourite_ids = current_favourite_ids() or frozenset()
         items = Item.query.all()
         response = []
         
         for item in items:
-            is_favourite = False
-            if user and user.role == 'customer':
-                is_favourite = CustomerFavourite.query.filter_by(
-                    customer_id=user.id,
-                    item_id=item.id
-                ).first() is not None
+            is_favourite = item.id in favourite_ids
 
             response.append({
                 "id": item.id,
@@ -84,7 +86,11 @@ class ItemResource(Resource):
         if "price" in data:
             item.price = data["price"]
 
+        menu_ids = menu_ids_for(item_id=item.id)
+        sync_menu_search(menu_ids)
+        record_menu_changes(menu_ids, MenuChangeKind.updated)
         db.session.commit()
+        invalidate_menus(item_outlet_ids(item.id))
         return {"message": "Item updated"}, 200
 
     def delete(self, item_id):
@@ -92,6 +98,14 @@ class ItemResource(Resource):
         if not owner:
             return {"error": "Owner access required"}, 403
         item = Item.query.get_or_404(item_id)
+        outlet_ids = item_outlet_ids(item.id)
+        menu_ids = menu_ids_for(item_id=item.id)
+        if ordered_menu_ids(menu_ids):
+            return {"error": "Item has orders and cannot be deleted"}, 409
+        record_menu_changes(menu_ids, MenuChangeKind.removed)
         db.session.delete(item)
+        sync_menu_search(menu_ids)
         db.session.commit()
+        invalidate_menus(outlet_ids)
+        leaderboard.regroup()
         return {"message": "Item deleted"}, 204
@@ -1,15 +1,41 @@
-import os
-import uuid
-from werkzeug.utils import secure_filename
 from flask_restful import Resource
-from flask import request
+from flask import request, Response, stream_with_context
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload, contains_eager
 
 from extensions import db
-from models import MenuOutletItem, Outlet, Item
+from models import MenuOutletItem, MenuChangeKind, Outlet, Item
+from menu_cache import ALL_MENUS, cached_json, invalidate_menus, item_outlet_ids
+from leaderboard import leaderboard
+from images import image_variants
+from image_jobs import image_jobs
+from favourites import favourites_marker
+from auth.permissions import require_owner
+from menu_transfer import MenuImportError, parse_menu, import_menu, open_images_zip, export_menu
+from search import search_menu, sync_menu_search, menu_ids_for, DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from routes.order import ordered_menu_ids
+from menu_changes import (
+    record_menu_changes,
+    current_menu_version,
+    menu_changes_since,
+    DEFAULT_CHANGES_LIMIT,
+    MAX_CHANGES_LIMIT
+)
 
 
+# Query parameters that switch menu listings to the filtered response
+MENU_FILTER_PARAMS = ("category", "min_price", "max_price", "is_available", "outlet_id", "sort")
+
+MENU_SORTS = {
+    "price": (Item.price, MenuOutletItem.id),
+    "-price": (Item.price.desc(), MenuOutletItem.id),
+    "name": (Item.name, MenuOutletItem.id),
+    "-name": (Item.name.desc(), MenuOutletItem.id),
+}
+
+UNCATEGORIZED = "Uncategorized"
+
 # Configuration for file uploads
-UPLOAD_FOLDER = '../photos' 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
@@ -18,49 +44,187 @@ def allowed_file(filename):
     """Check if file has an allowed extension"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def save_item_image(file, item_name):
+# Shown for an item until its uploaded image has been processed
+PLACEHOLDER_IMAGE = "default-food.jpg"
+
+
+def valid_image_upload(file):
+    """Check extension and size before anything is written"""
+    if not allowed_file(file.filename):
+        return False
+
+    # Check file size
+    file.seek(0, 2)  # Seek to end
+    file_size = file.tell()
+    file.seek(0)  # Reset to beginning
+
+    return file_size <= MAX_FILE_SIZE
+
+
+def save_item_image(file, item_id):
     """
-    Save item image with unique filename
-    Returns: filename if successful, None if failed
+    Write the upload to disk and queue resizing/variants in the background.
+    Call after commit so the worker can find the item.
+    Returns: the ImageJob
     """
-    if file and allowed_file(file.filename):
-        # Check file size
-        file.seek(0, 2)  # Seek to end
-        file_size = file.tell()
-        file.seek(0)  # Reset to beginning
-        
-        if file_size > MAX_FILE_SIZE:
-            return None
-        
-        # Generate unique filename to avoid collisions
-        original_name = secure_filename(file.filename)
-        extension = original_name.rsplit('.', 1)[1].lower() if '.' in original_name else 'jpg'
-        
-        # Create safe item name for filename
-        safe_item_name = "".join(c if c.isalnum() else "_" for c in item_name.lower())
-        unique_id = str(uuid.uuid4())[:8]  # Short unique ID
-        filename = f"item_{safe_item_name}_{unique_id}.{extension}"
-        
-        # Ensure upload folder exists
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        
-        # Save file
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        
-        print(f"Saved item image: {filename} to {filepath}")
-        return filename
-    return None
+    return image_jobs.submit(file, "item", item_id)
+
+
+def serialize_menu_item(menu):
+    return {
+        "id": menu.id,
+        "outlet_id": menu.outlet_id,
+        "outlet_name": menu.outlet.name,
+        "item_id": menu.item_id,
+        "item_name": menu.item.name,
+        "image": menu.item.image if menu.item.image and menu.item.image.strip() else "default-food.jpg",  
+        "description": menu.item.description or "", 
+        "image_path": menu.item.image if menu.item.image and menu.item.image.strip() else "default-food.jpg",
+        "price": float(menu.item.price) if menu.item.price else 0.0,
+        "category": menu.item.category_name or "Uncategorized",
+        "is_available": menu.item.is_available if menu.item.is_available is not None else True,
+        "images": image_variants(menu.item.image),
+    }
+
+
+def wants_filtered_menu():
+    return any(name in request.args for name in MENU_FILTER_PARAMS)
+
+
+def menu_filters():
+    """
+    SQL conditions for ?category=a,b, ?min_price=, ?max_price=,
+    ?is_available=true|false and ?outlet_id=1,2, keyed by facet name
+    Raises ValueError on invalid values
+    """
+    conditions = {}
+
+    category = request.args.get("category")
+    if category:
+        names = [c.strip() for c in category.split(",") if c.strip()]
+        condition = Item.category_name.in_(names)
+        if UNCATEGORIZED in names:
+            condition = or_(condition, Item.category_name.is_(None))
+        conditions["category"] = condition
 
+    try:
+        prices = []
+        if request.args.get("min_price"):
+            prices.append(Item.price >= float(request.args["min_price"]))
+        if request.args.get("max_price"):
+            prices.append(Item.price <= float(request.args["max_price"]))
+    except ValueError:
+        raise ValueError("Invalid price")
+    if prices:
+        conditions["price"] = prices[0] if len(prices) == 1 else prices[0] & prices[1]
+
+    available = request.args.get("is_available")
+    if available:
+        if available.lower() not in ("true", "false"):
+            raise ValueError("is_available must be true or false")
+        # Items without a value are listed as available
+        conditions["is_available"] = func.coalesce(Item.is_available, True) == (available.lower() == "true")
+
+    outlet = request.args.get("outlet_id")
+    if outlet:
+        try:
+            outlet_ids = [int(o) for o in outlet.split(",")]
+        except ValueError:
+            raise ValueError("Invalid outlet_id")
+        conditions["outlet"] = MenuOutletItem.outlet_id.in_(outlet_ids)
+
+    return conditions
+
+
+def facet_counts(columns, conditions):
+    """Menu entries per value of columns under the given conditions"""
+    return (
+        db.session.query(*columns, func.count(MenuOutletItem.id))
+        .select_from(MenuOutletItem)
+        .join(MenuOutletItem.item)
+        .join(MenuOutletItem.outlet)
+        .filter(*conditions)
+        .group_by(*columns)
+        .order_by(func.count(MenuOutletItem.id).desc())
+        .all()
+    )
+
+
+def filtered_menu(*scope, facets=("category", "outlet")):
+    """
+    Menu entries matching the request's filters and ?sort=, with facet
+    counts. Each facet is counted with every filter except its own, so
+    the counts show what choosing another value would return.
+    scope: conditions that always apply, e.g. a single outlet
+    Returns: (menu_items, facets)
+    Raises ValueError on invalid parameters
+    """
+    conditions = menu_filters()
+
+    sort = request.args.get("sort")
+    if sort and sort not in MENU_SORTS:
+        raise ValueError(f"Invalid sort, use one of: {', '.join(MENU_SORTS)}")
+
+    menu_items = (
+        MenuOutletItem.query
+        .join(MenuOutletItem.item)
+        .join(MenuOutletItem.outlet)
+        .options(contains_eager(MenuOutletItem.item), contains_eager(MenuOutletItem.outlet))
+        .filter(*scope, *conditions.values())
+        .order_by(*MENU_SORTS.get(sort, (MenuOutletItem.id,)))
+        .all()
+    )
+
+    def others(name):
+        return [*scope, *(c for key, c in conditions.items() if key != name)]
+
+    counts = {}
+    if "category" in facets:
+        category = func.coalesce(Item.category_name, UNCATEGORIZED)
+        counts["category"] = [
+            {"value": value, "count": count}
+            for value, count in facet_counts([category], others("category"))
+        ]
+    if "outlet" in facets:
+        counts["outlet"] = [
+            {"id": outlet_id, "name": name, "count": count}
+            for outlet_id, name, count in facet_counts([Outlet.id, Outlet.name], others("outlet"))
+        ]
+
+    return menu_items, counts
 
 
 class MenuListResource(Resource):
     def get(self):
         """
         Get all menu items (outlet ↔ item) with full item details
+        Filters (?category, ?min_price, ?max_price, ?is_available,
+        ?outlet_id, ?sort) return {"items", "count", "facets"} instead
+        Served from the menu cache with an ETag; writes invalidate it.
+        Logged-in customers also get isFavourite on each entry
         """
+        key = "items" if wants_filtered_menu() else None
+        return cached_json(ALL_MENUS, self.build, favourites_marker(key))
+
+    def build(self):
+        if wants_filtered_menu():
+            try:
+                menu_items, facets = filtered_menu()
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            return {
+                "items": [serialize_menu_item(menu) for menu in menu_items],
+                "count": len(menu_items),
+                "facets": facets
+            }, 200
+
         try:
-            menu_items = MenuOutletItem.query.all()
+            menu_items = (
+                MenuOutletItem.query
+                .options(joinedload(MenuOutletItem.outlet), joinedload(MenuOutletItem.item))
+                .all()
+            )
             if not menu_items:
                 return {"message": "No menu items found"}, 404
 
@@ -69,19 +233,7 @@ class MenuListResource(Resource):
                 if not menu.outlet or not menu.item:
                     continue  # Skip incomplete menu items
                 
-                result.append({
-                    "id": menu.id,
-                    "outlet_id": menu.outlet_id,
-                    "outlet_name": menu.outlet.name,
-                    "item_id": menu.item_id,
-                    "item_name": menu.item.name,
-                    "image": menu.item.image if menu.item.image and menu.item.image.strip() else "default-food.jpg",  
-                    "description": menu.item.description or "", 
-                    "image_path": menu.item.image if menu.item.image and menu.item.image.strip() else "default-food.jpg",
-                    "price": float(menu.item.price) if menu.item.price else 0.0,
-                    "category": menu.item.category_name or "Uncategorized",
-                    "is_available": menu.item.is_available if menu.item.is_available is not None else True,
-                })
+                result.append(serialize_menu_item(menu))
             
             return result, 200
         except Exception as e:
@@ -99,6 +251,7 @@ class MenuListResource(Resource):
         category = request.form.get('category')
         is_available_str = request.form.get('is_available')
         outlet_id_str = request.form.get('outlet_id')
+        prep_minutes_str = request.form.get('prep_minutes')
         image_file = request.files.get('image')
 
         if not name or not price_str or not outlet_id_str:
@@ -108,21 +261,19 @@ class MenuListResource(Resource):
             price = float(price_str)
             outlet_id = int(outlet_id_str)
             is_available = is_available_str.lower() == 'true' if is_available_str else True
+            prep_minutes = int(prep_minutes_str) if prep_minutes_str else None
         except ValueError:
-            return {"error": "Invalid price or outlet_id format"}, 400
+            return {"error": "Invalid price, outlet_id or prep_minutes format"}, 400
 
         outlet = Outlet.query.get(outlet_id)
         if not outlet:
             return {"error": "Outlet not found"}, 404
 
-        # Handle image upload 
-        image_filename = "default-food.jpg"
-        if image_file and image_file.filename:
-            saved_filename = save_item_image(image_file, name)
-            if saved_filename:
-                image_filename = saved_filename
-            else:
-                return {"error": "Invalid image file format. Allowed: png, jpg, jpeg, gif, webp"}, 400
+        # Handle image upload; the item shows a placeholder until it is processed
+        image_filename = PLACEHOLDER_IMAGE
+        has_image = bool(image_file and image_file.filename)
+        if has_image and not valid_image_upload(image_file):
+            return {"error": "Invalid image file format. Allowed: png, jpg, jpeg, gif, webp"}, 400
 
 
         # Create new Item
@@ -132,7 +283,8 @@ class MenuListResource(Resource):
             description = description,
             category_name=category,
             is_available=is_available,
-            image=image_filename
+            image=image_filename,
+            prep_minutes=prep_minutes
         )
 
         db.session.add(new_item)
@@ -154,13 +306,21 @@ class MenuListResource(Resource):
         )
 
         db.session.add(menu_link)
+        db.session.flush()
+        sync_menu_search([menu_link.id])
+        record_menu_changes([menu_link.id], MenuChangeKind.added)
         db.session.commit()
+        invalidate_menus([outlet_id])
+        leaderboard.regroup()
+        job = save_item_image(image_file, new_item.id) if has_image else None
 
         return {
             "message": "Item created and added to menu",
             "item_id": new_item.id,
             "menu_id": menu_link.id,
-            "image_url": f"/uploads/{image_filename}"  
+            "image_url": f"/uploads/{image_filename}",
+            "images": image_variants(image_filename),
+            "image_job": job.to_dict() if job else None
         }, 201
 
 
@@ -180,7 +340,8 @@ class MenuResource(Resource):
             "image": menu.item.image if menu.item and menu.item.image and menu.item.image.strip() else "default-food.jpg",  
             "description" : menu.item.description if menu.item else None,
             "image_path": menu.item.image if menu.item and menu.item.image and menu.item.image.strip() else "default-food.jpg",
-            "price": menu.item.price
+            "price": menu.item.price,
+            "images": image_variants(menu.item.image) if menu.item else None
         }, 200
 
     def put(self, menu_id):
@@ -195,6 +356,7 @@ class MenuResource(Resource):
         price_str = request.form.get('price')
         category = request.form.get('category')
         is_available_str = request.form.get('is_available')
+        prep_minutes_str = request.form.get('prep_minutes')
         image_file = request.files.get('image')
         
         # Update item fields if provided
@@ -212,22 +374,36 @@ class MenuResource(Resource):
         
         if is_available_str:
             item.is_available = is_available_str.lower() == 'true'
+
+        if prep_minutes_str:
+            try:
+                item.prep_minutes = int(prep_minutes_str)
+            except ValueError:
+                return {"error": "Invalid prep_minutes format"}, 400
         
-        # Handle image upload if new image is provided
-        if image_file and image_file.filename:
-            saved_filename = save_item_image(image_file, item.name)
-            if saved_filename:
-                item.image = saved_filename
-            else:
-                return {"error": "Invalid image file format. Allowed: png, jpg, jpeg, gif, webp"}, 400
+        # Handle image upload if new image is provided; the current image
+        # stays until the new one has been processed
+        has_image = bool(image_file and image_file.filename)
+        if has_image and not valid_image_upload(image_file):
+            return {"error": "Invalid image file format. Allowed: png, jpg, jpeg, gif, webp"}, 400
         
+        # The item may be listed by other outlets too
+        menu_ids = menu_ids_for(item_id=item.id)
+        sync_menu_search(menu_ids)
+        record_menu_changes(menu_ids, MenuChangeKind.updated)
         db.session.commit()
+        invalidate_menus(item_outlet_ids(item.id))
+        # The category may have changed
+        leaderboard.regroup()
+        job = save_item_image(image_file, item.id) if has_image else None
         
         return {
             "message": "Item updated successfully",
             "item_id": item.id,
             "menu_id": menu.id,
-            "image": item.image
+            "image": item.image,
+            "images": image_variants(item.image),
+            "image_job": job.to_dict() if job else None
         }, 200
 
 
@@ -237,7 +413,159 @@ class MenuResource(Resource):
         """
         menu = MenuOutletItem.query.get_or_404(menu_id)
 
+        if ordered_menu_ids([menu.id]):
+            return {"error": "Menu item has orders and cannot be removed"}, 409
+
+        record_menu_changes([menu.id], MenuChangeKind.removed)
         db.session.delete(menu)
+        sync_menu_search([menu.id])
         db.session.commit()
+        invalidate_menus([menu.outlet_id])
+        leaderboard.regroup()
 
         return {"message": "Menu item removed"}, 204
+
+
+class MenuSearchResource(Resource):
+    def get(self):
+        """
+        Full-text search over dish name, description, category and outlet
+        Query: ?q= (words are prefix matched for typeahead), ?limit=
+        Results are ranked best first by BM25
+        """
+        q = request.args.get("q", "").strip()
+        if not q:
+            return {"error": "q is required"}, 400
+
+        limit = request.args.get("limit", DEFAULT_SEARCH_LIMIT, type=int)
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+        matches = search_menu(q, limit)
+        menu_items = (
+            MenuOutletItem.query
+            .options(joinedload(MenuOutletItem.outlet), joinedload(MenuOutletItem.item))
+            .filter(MenuOutletItem.id.in_([menu_id for menu_id, _ in matches]))
+            .all()
+        ) if matches else []
+        found = {menu.id: menu for menu in menu_items}
+
+        results = []
+        for menu_id, score in matches:
+            if menu_id in found:
+                # bm25 scores are negative, lower is better
+                results.append({**serialize_menu_item(found[menu_id]), "score": round(-score, 4)})
+
+        return {"query": q, "results": results}, 200
+
+
+class MenuChangesResource(Resource):
+    def get(self):
+        """
+        Menu entries added, updated, made unavailable or removed after a
+        menu version, for clients that keep a local copy of the menu
+        Query: ?since= (a version from an earlier response), ?outlet_id=, ?limit=
+        Without ?since= only the current version is returned. If reset is
+        true the changes are no longer kept and the menu must be reloaded.
+        """
+        outlet_id = request.args.get("outlet_id", type=int)
+        if "since" not in request.args:
+            return {"version": current_menu_version(outlet_id)}, 200
+
+        since = request.args.get("since", type=int)
+        if since is None or since < 0:
+            return {"error": "since must be a non-negative integer"}, 400
+
+        limit = request.args.get("limit", DEFAULT_CHANGES_LIMIT, type=int)
+        limit = max(1, min(limit, MAX_CHANGES_LIMIT))
+
+        changes = menu_changes_since(since, outlet_id, limit)
+        return {
+            "since": since,
+            "version": changes["version"],
+            "has_more": changes["has_more"],
+            "reset": changes["reset"],
+            "added": [serialize_menu_item(menu) for menu in changes["added"]],
+            "updated": [serialize_menu_item(menu) for menu in changes["updated"]],
+            "unavailable": [serialize_menu_item(menu) for menu in changes["unavailable"]],
+            "removed": [{
+                "id": change.menu_outlet_item_id,
+                "outlet_id": change.outlet_id,
+                "item_id": change.item_id
+            } for change in changes["removed"]]
+        }, 200
+
+
+def owned_outlet(outlet_id):
+    """Returns: (outlet, None) or (None, error response) for the current owner"""
+    owner = require_owner()
+    if not owner:
+        return None, ({"error": "Unauthorized"}, 401)
+
+    outlet = Outlet.query.get(outlet_id)
+    if not outlet:
+        return None, ({"error": "Outlet not found"}, 404)
+
+    if outlet.owner_id != owner.id:
+        return None, ({"error": "Unauthorized. Not registered owner."}, 403)
+
+    return outlet, None
+
+
+class MenuImportResource(Resource):
+    def post(self, outlet_id):
+        """
+        Bulk-add dishes to an outlet's menu
+        Body: multipart with file (CSV or JSON, ?format= or by extension)
+        and an optional images zip, or a JSON list / {"items": [...]}
+        Every row is validated first; any invalid row rejects the whole
+        import with errors per row
+        """
+        outlet, error = owned_outlet(outlet_id)
+        if error:
+            return error
+
+        try:
+            images_zip = None
+            if request.is_json:
+                rows = parse_menu(request.get_json(), "json")
+            else:
+                menu_file = request.files.get("file")
+                if not menu_file or not menu_file.filename:
+                    return {"error": "file is required"}, 400
+
+                fmt = request.args.get("format") or menu_file.filename.rsplit(".", 1)[-1].lower()
+                rows = parse_menu(menu_file.read(), fmt)
+
+                images = request.files.get("images")
+                if images and images.filename:
+                    images_zip = open_images_zip(images.stream)
+        except MenuImportError as e:
+            return {"error": str(e)}, 400
+
+        imported, errors = import_menu(outlet.id, rows, images_zip)
+        if errors:
+            return {"error": "Some rows are invalid; nothing was imported", "errors": errors}, 422
+
+        return {"imported": len(imported), "items": imported}, 201
+
+
+class MenuExportResource(Resource):
+    def get(self, outlet_id):
+        """
+        Stream an outlet's menu as CSV or JSON (?format=) in the import format
+        """
+        outlet, error = owned_outlet(outlet_id)
+        if error:
+            return error
+
+        fmt = request.args.get("format", "csv")
+        try:
+            chunks = export_menu(outlet.id, fmt)
+        except MenuImportError as e:
+            return {"error": str(e)}, 400
+
+        return Response(
+            stream_with_context(chunks),
+            mimetype="text/csv" if fmt == "csv" else "application/json",
+            headers={"Content-Disposition": f"attachment; filename=menu-{outlet.id}.{fmt}"}
+        )
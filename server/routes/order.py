@@ -1,18 +1,156 @@
+import json
 from flask_restful import Resource
-from flask import request
+from flask import request, Response, stream_with_context
 from datetime import datetime
-
-from models import db, Order, OrderStatus, Customer, MenuOutletItem, Owner, Outlet
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload, contains_eager, selectinload
+
+from models import (
+    db,
+    Order,
+    OrderLine,
+    OrderStatus,
+    Customer,
+    MenuOutletItem,
+    Owner,
+    Outlet,
+    TableBooking,
+    ArchivedOrder,
+    ArchivedOrderLine
+)
 from auth.permissions import require_owner
+from pagination import page_size, keyset_page
+from events import get_broker
+from idempotency import idempotent
+from kitchen import kitchen
+from rollups import record_order, remove_orders
+from export import export_orders
+from images import image_variants
+
+
+# Rows fetched per round trip when streaming orders
+STREAM_BATCH_SIZE = 500
+
+# Seconds between SSE keep-alive comments on an idle feed
+EVENT_KEEPALIVE_SECONDS = 15
+
+# Status changes an owner may make; completed and cancelled are final
+ALLOWED_TRANSITIONS = {
+    OrderStatus.pending: {OrderStatus.confirmed, OrderStatus.completed, OrderStatus.cancelled},
+    OrderStatus.confirmed: {OrderStatus.completed, OrderStatus.cancelled},
+    OrderStatus.completed: set(),
+    OrderStatus.cancelled: set(),
+}
+
+# Largest batch accepted by the bulk status endpoint
+BULK_STATUS_MAX_ORDERS = 500
+
+
+def order_query(model=Order):
+    """
+    Base query for orders with everything serialize_order touches eager loaded,
+    so listing N orders costs one SELECT instead of 4-5 per order.
+    menu_outlet_items and outlets are joined explicitly so callers can filter
+    on MenuOutletItem / Outlet columns without extra joins.
+    Pass model=ArchivedOrder to query the archive instead of live orders.
+    """
+    line_model = model.lines.property.mapper.class_
+    return (
+        model.query
+        .join(model.menu_outlet_item)
+        .join(MenuOutletItem.outlet)
+        .options(
+            contains_eager(model.menu_outlet_item).contains_eager(MenuOutletItem.outlet),
+            contains_eager(model.menu_outlet_item).joinedload(MenuOutletItem.item),
+            joinedload(model.customer),
+            joinedload(model.table_booking),
+            selectinload(model.lines)
+            .joinedload(line_model.menu_outlet_item)
+            .joinedload(MenuOutletItem.item),
+        )
+    )
+
+
+def order_history(build, include_archive=True):
+    """
+    Orders from the live and archive tables, oldest first.
+    build(model) returns the filtered query for one of the two tables.
+    """
+    orders = build(Order).all()
+    if include_archive:
+        orders = build(ArchivedOrder).all() + orders
+    return sorted(orders, key=lambda o: (o.created_at or datetime.min, o.id))
+
+
+def filter_orders(query, model=Order):
+    """
+    Apply ?status=pending,confirmed and ?from= / ?to= (ISO dates) filters
+    Raises ValueError on invalid values
+    """
+    status = request.args.get("status")
+    if status:
+        try:
+            statuses = [OrderStatus(s.strip()) for s in status.split(",")]
+        except ValueError:
+            raise ValueError("Invalid status")
+        query = query.filter(model.status.in_(statuses))
+
+    try:
+        date_from = request.args.get("from")
+        if date_from:
+            query = query.filter(model.created_at >= datetime.fromisoformat(date_from))
+
+        date_to = request.args.get("to")
+        if date_to:
+            query = query.filter(model.created_at < datetime.fromisoformat(date_to))
+    except ValueError:
+        raise ValueError("Invalid date, use ISO format")
+
+    return query
+
+
+def build_line(menu_outlet_item, quantity):
+    """Order line for a menu item, snapshotting the item's current price"""
+    unit_price = menu_outlet_item.item.price
+    return OrderLine(
+        menu_outlet_item=menu_outlet_item,
+        quantity=quantity,
+        unit_price=unit_price,
+        line_total=unit_price * quantity
+    )
+
+
+def ordered_menu_ids(menu_ids):
+    """
+    Menu entries among menu_ids that live or archived order lines still
+    reference. They cannot be deleted without breaking order history.
+    """
+    ordered = set()
+    for line_model in (OrderLine, ArchivedOrderLine):
+        ordered.update(db.session.scalars(
+            select(line_model.menu_outlet_item_id)
+            .where(line_model.menu_outlet_item_id.in_(menu_ids))
+            .distinct()
+        ))
+    return sorted(ordered)
 
 
 def serialize_order(order):
     
-    item = order.menu_outlet_item.item
     outlet = order.menu_outlet_item.outlet
 
-    item_price = order.menu_outlet_item.item.price
-    total_price = item_price * order.quantity
+    items = []
+    for line in order.lines:
+        item = line.menu_outlet_item.item
+        items.append({
+            "menu_outlet_item_id": line.menu_outlet_item_id,
+            "name": item.name,
+            "quantity": line.quantity,
+            "price": line.unit_price,
+            "line_total": line.line_total,
+            "image_path": item.image if item.image and item.image.strip() else 'default-food.jpg',
+            "images": image_variants(item.image)
+        })
 
     table_booking_data = None
     if order.table_booking:
@@ -39,19 +177,77 @@ def serialize_order(order):
         "outlet_id": outlet.id,
         "outlet_category": outlet.category_name,
         "customer_name": order.customer.name if order.customer else None,
-        "items": [
-            {
-                "name": item.name,
-                "quantity":order.quantity,
-                "price": item_price,
-                "image_path": item.image if item.image and item.image.strip() else 'default-food.jpg'
-            }
-        ],
-        "total": total_price,
+        "items": items,
+        "total": order.total,
         "table_booking": table_booking_data
     }
 
 
+def publish_order_event(order, event_type):
+    """
+    Push an order event ("created", "status_changed", "cancelled") to the
+    owner and outlet feeds. Call after commit so listeners never see
+    uncommitted orders.
+    """
+    outlet = order.menu_outlet_item.outlet
+    data = serialize_order(order)
+    broker = get_broker()
+    broker.publish(f"owner:{outlet.owner_id}", event_type, data)
+    broker.publish(f"outlet:{outlet.id}", event_type, data)
+
+
+def order_event_stream(channel):
+    """
+    Server-Sent Events response for an order feed channel.
+    Resumes after the Last-Event-ID header (or ?lastEventId=) when given.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    backlog, subscription = get_broker().subscribe(channel, last_event_id)
+
+    def format_event(event):
+        return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            for event in backlog:
+                yield format_event(event)
+            while True:
+                event = subscription.get(timeout=EVENT_KEEPALIVE_SECONDS)
+                yield format_event(event) if event else ": keep-alive\n\n"
+        finally:
+            subscription.close()
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def stream_orders(query):
+    """
+    Stream orders as NDJSON, one serialized order per line, fetching rows
+    in batches from a server-side cursor instead of loading them all
+    """
+    rows = (
+        query.order_by(Order.created_at, Order.id)
+        .execution_options(stream_results=True)
+        .yield_per(STREAM_BATCH_SIZE)
+    )
+
+    def generate():
+        for order in rows:
+            yield json.dumps(serialize_order(order)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 class OrderListResource(Resource):
     def get(self):
         # owner=require_owner()
@@ -59,9 +255,32 @@ class OrderListResource(Resource):
         # if not owner:
         #     return {"error":"Unauthorized"},401
 
-        orders = Order.query.all()
+        # ?stream=1 writes every order as NDJSON while it is fetched
+        if request.args.get("stream", "").lower() in ("1", "true"):
+            return stream_orders(order_query())
+
+        # ?limit= / ?cursor= switch to keyset pagination on (created_at, id)
+        if "limit" in request.args or "cursor" in request.args:
+            try:
+                orders, next_cursor = keyset_page(
+                    order_query(),
+                    Order.created_at,
+                    Order.id,
+                    request.args.get("cursor"),
+                    page_size(),
+                )
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            return {
+                "orders": [serialize_order(o) for o in orders],
+                "next_cursor": next_cursor
+            }, 200
+
+        orders = order_query().all()
         return [serialize_order(o) for o in orders], 200
 
+    @idempotent
     def post(self):
         data = request.get_json()
 
@@ -82,23 +301,29 @@ class OrderListResource(Resource):
         if not Customer.query.get(customer_id):
             return {"error": "Customer not found"}, 404
 
-        if not MenuOutletItem.query.get(menu_outlet_item_id):
+        menu_item = MenuOutletItem.query.get(menu_outlet_item_id)
+        if not menu_item:
             return {"error": "Menu outlet item not found"}, 404
 
+        # Load the queue before the new order is flushed, or the load would count it
+        kitchen.ensure_loaded()
+
+        line = build_line(menu_item, quantity)
         order = Order(
             customer_id=customer_id,
-            menu_outlet_item_id=menu_outlet_item_id,
+            menu_outlet_item=menu_item,
             quantity=quantity,
-            status=OrderStatus.pending
+            status=OrderStatus.pending,
+            total=line.line_total,
+            lines=[line]
         )
 
         db.session.add(order)
         db.session.flush()
+        order.estimated = kitchen.estimate(order)
 
 
         if table_number:
-            from models import TableBooking  
-        
             table_booking = TableBooking(
                 order_id=order.id,
                 table_number=table_number,
@@ -108,14 +333,116 @@ class OrderListResource(Resource):
             )
             db.session.add(table_booking)  
 
+        record_order(order)
         db.session.commit()
+        kitchen.sync(order)
+        publish_order_event(order, "created")
 
         return serialize_order(order), 201
 
 
+class CheckoutResource(Resource):
+    @idempotent
+    def post(self):
+        """
+        Place a whole cart in one transaction
+        Body: {"customer_id", "items": [{"menu_outlet_item_id", "quantity"}], "table_number"?}
+        Creates one order per outlet, each holding that outlet's lines
+        """
+        data = request.get_json()
+
+        if not data:
+            return {"error": "No input data provided"}, 400
+
+        customer_id = data.get("customer_id")
+        cart = data.get("items")
+        table_number = data.get("table_number")
+
+        if customer_id is None or not isinstance(cart, list) or not cart:
+            return {"error": "customer_id and a non-empty items list are required"}, 400
+
+        # Merge repeated dishes so each menu item becomes one line
+        quantities = {}
+        for entry in cart:
+            menu_outlet_item_id = entry.get("menu_outlet_item_id") if isinstance(entry, dict) else None
+            quantity = entry.get("quantity") if isinstance(entry, dict) else None
+
+            if menu_outlet_item_id is None or quantity is None:
+                return {"error": "Each item needs menu_outlet_item_id and quantity"}, 400
+
+            if not isinstance(menu_outlet_item_id, int) or isinstance(menu_outlet_item_id, bool):
+                return {"error": "menu_outlet_item_id must be an integer"}, 400
+
+            if not isinstance(quantity, int) or quantity <= 0:
+                return {"error": "quantity must be a positive integer"}, 400
+
+            quantities[menu_outlet_item_id] = quantities.get(menu_outlet_item_id, 0) + quantity
+
+        if not Customer.query.get(customer_id):
+            return {"error": "Customer not found"}, 404
+
+        # Validate every line with a single IN query
+        menu_items = (
+            MenuOutletItem.query
+            .options(joinedload(MenuOutletItem.item))
+            .filter(MenuOutletItem.id.in_(quantities.keys()))
+            .all()
+        )
+        found = {menu_item.id: menu_item for menu_item in menu_items}
+        missing = [i for i in quantities if i not in found]
+        if missing:
+            return {"error": "Menu outlet item not found", "menu_outlet_item_ids": missing}, 404
+
+        by_outlet = {}
+        for menu_outlet_item_id, quantity in quantities.items():
+            outlet_id = found[menu_outlet_item_id].outlet_id
+            by_outlet.setdefault(outlet_id, []).append(
+                build_line(found[menu_outlet_item_id], quantity)
+            )
+
+        # Load the queue before the new order is flushed, or the load would count it
+        kitchen.ensure_loaded()
+
+        orders = []
+        for lines in by_outlet.values():
+            order = Order(
+                customer_id=customer_id,
+                menu_outlet_item=lines[0].menu_outlet_item,
+                quantity=sum(line.quantity for line in lines),
+                status=OrderStatus.pending,
+                total=sum(line.line_total for line in lines),
+                lines=lines
+            )
+            if table_number:
+                order.table_booking = TableBooking(
+                    table_number=table_number,
+                    capacity=4,
+                    duration=None,
+                    created_at=datetime.utcnow()
+                )
+            db.session.add(order)
+            order.estimated = kitchen.estimate(order)
+            orders.append(order)
+
+        for order in orders:
+            record_order(order)
+
+        db.session.commit()
+        for order in orders:
+            kitchen.sync(order)
+
+        order_ids = [order.id for order in orders]
+        orders = order_query().filter(Order.id.in_(order_ids)).order_by(Order.id).all()
+        for order in orders:
+            publish_order_event(order, "created")
+        return {"orders": [serialize_order(o) for o in orders]}, 201
+
+
 class OrderResource(Resource):
     def get(self, order_id):
-        order = Order.query.get_or_404(order_id)
+        order = order_query().filter(Order.id == order_id).first()
+        if not order:
+            order = order_query(ArchivedOrder).filter(ArchivedOrder.id == order_id).first_or_404()
         return serialize_order(order), 200
 
     def put(self, order_id):
@@ -125,36 +452,164 @@ class OrderResource(Resource):
         if "quantity" in data:
             if not isinstance(data["quantity"], int) or data["quantity"] <= 0:
                 return {"error": "Invalid quantity"}, 400
-            order.quantity = data["quantity"]
-            # Recalculate total
-            item_price = order.menu_outlet_item.item.price
-            order.total = item_price * order.quantity
+            if len(order.lines) != 1:
+                return {"error": "quantity can only be changed on single-item orders"}, 400
 
         if "status" in data:
             try:
-                order.status = OrderStatus(data["status"])
+                status = OrderStatus(data["status"])
             except ValueError:
                 return {"error": "Invalid status"}, 400
+            # Same transitions as the bulk endpoint; completed and cancelled are final
+            if status != order.status and status not in ALLOWED_TRANSITIONS[order.status]:
+                return {"error": f"Cannot change status from {order.status.value} to {status.value}"}, 400
+
+        # Validated, so take the order out of the sales rollups and put it back as edited
+        affects_sales = "quantity" in data or "status" in data
+        if affects_sales:
+            record_order(order, -1)
+
+        if "quantity" in data:
+            line = order.lines[0]
+            line.quantity = data["quantity"]
+            # Recalculate total at the price the order was placed at
+            line.line_total = line.unit_price * line.quantity
+            order.quantity = line.quantity
+            order.total = line.line_total
+
+        previous_status = order.status
+        if "status" in data:
+            order.status = status
 
         if "estimated" in data:
             order.estimated = datetime.fromisoformat(data["estimated"])
 
+        if affects_sales:
+            record_order(order)
+
         db.session.commit()
+        kitchen.sync(order)
+
+        if order.status != previous_status:
+            publish_order_event(
+                order,
+                "cancelled" if order.status == OrderStatus.cancelled else "status_changed"
+            )
+
         return serialize_order(order), 200
 
     def delete(self, order_id):
         order = Order.query.get_or_404(order_id)
+        record_order(order, -1)
         db.session.delete(order)
         db.session.commit()
+        kitchen.remove(order_id)
         return {"message": "Order deleted"}, 204
 
 
+class BulkOrderStatusResource(Resource):
+    def patch(self):
+        """
+        Move many of the owner's orders to one status
+        Body: {"order_ids": [...], "status": "confirmed"}
+        Returns a result per id: updated, unchanged, not_found, forbidden,
+        invalid_transition, or conflict when the order changed status
+        meanwhile. Valid orders are updated with one UPDATE per current status.
+        """
+        owner = require_owner()
+
+        if not owner:
+            return {"error": "Unauthorized"}, 401
+
+        data = request.get_json()
+
+        if not data:
+            return {"error": "No input data provided"}, 400
+
+        order_ids = data.get("order_ids")
+        if not isinstance(order_ids, list) or not order_ids:
+            return {"error": "order_ids must be a non-empty list"}, 400
+
+        if not all(isinstance(i, int) for i in order_ids):
+            return {"error": "order_ids must be integers"}, 400
+
+        if len(order_ids) > BULK_STATUS_MAX_ORDERS:
+            return {"error": f"At most {BULK_STATUS_MAX_ORDERS} orders per request"}, 400
+
+        try:
+            target = OrderStatus(data.get("status"))
+        except ValueError:
+            return {"error": "Invalid status"}, 400
+
+        # Ownership and current status for every id in one query
+        rows = (
+            db.session.query(Order.id, Order.status, Outlet.owner_id)
+            .join(Order.menu_outlet_item)
+            .join(MenuOutletItem.outlet)
+            .filter(Order.id.in_(order_ids))
+            .all()
+        )
+        found = {order_id: (status, owner_id) for order_id, status, owner_id in rows}
+
+        results = {}
+        valid = {}
+        for order_id in dict.fromkeys(order_ids):
+            if order_id not in found:
+                results[order_id] = {"result": "not_found"}
+                continue
+
+            status, owner_id = found[order_id]
+            if owner_id != owner.id:
+                results[order_id] = {"result": "forbidden"}
+            elif status == target:
+                results[order_id] = {"result": "unchanged"}
+            elif target not in ALLOWED_TRANSITIONS[status]:
+                results[order_id] = {"result": "invalid_transition", "from": status.value}
+            else:
+                results[order_id] = {"result": "updated", "from": status.value}
+                valid.setdefault(status, []).append(order_id)
+
+        updated = []
+        for status, ids in valid.items():
+            # Only orders still in the status checked above, in case they changed since
+            changed = set(db.session.scalars(
+                update(Order)
+                .where(Order.id.in_(ids), Order.status == status)
+                .values(status=target)
+                .returning(Order.id)
+            ))
+            for order_id in ids:
+                if order_id not in changed:
+                    results[order_id]["result"] = "conflict"
+            updated += changed
+
+        if updated:
+            if target == OrderStatus.cancelled:
+                remove_orders(updated)
+            db.session.commit()
+
+            orders = order_query().filter(Order.id.in_(updated)).order_by(Order.id).all()
+            event_type = "cancelled" if target == OrderStatus.cancelled else "status_changed"
+            for order in orders:
+                kitchen.sync(order)
+                publish_order_event(order, event_type)
+
+        return {
+            "status": target.value,
+            "updated": len(updated),
+            "results": results
+        }, 200
+
+
 class CustomerOrderResource(Resource):
     def get(self, customer_id):
         if not Customer.query.get(customer_id):
             return {"error": "Customer not found"}, 404
         
-        orders = Order.query.filter_by(customer_id=customer_id).all()
+        # History spans live and archived orders
+        orders = order_history(
+            lambda model: order_query(model).filter(model.customer_id == customer_id)
+        )
         return [serialize_order(o) for o in orders], 200
 
 
@@ -163,22 +618,93 @@ class OwnerOrderResource(Resource):
         if not Owner.query.get(owner_id):
             return {"error": "Owner not found"}, 404
         
-        # Get all outlets for the owner
-        outlets = Outlet.query.filter_by(owner_id=owner_id).all()
-        outlet_ids = [outlet.id for outlet in outlets]
-        
-        if not outlet_ids:
-            return [], 200
-        
-        # Get all menu outlet items for these outlets
-        menu_items = MenuOutletItem.query.filter(MenuOutletItem.outlet_id.in_(outlet_ids)).all()
-        menu_item_ids = [item.id for item in menu_items]
-        
-        if not menu_item_ids:
-            return [], 200
-        
-        # Get all orders for these menu items
-        orders = Order.query.filter(Order.menu_outlet_item_id.in_(menu_item_ids)).all()
+        # The archive only holds completed/cancelled orders, so live views
+        # such as ?status=pending,confirmed never touch it
+        status = request.args.get("status")
+        include_archive = not status or any(
+            s.strip() in ("completed", "cancelled") for s in status.split(",")
+        )
+
+        # One joined query per store: orders -> menu_outlet_items -> outlets by owner
+        try:
+            orders = order_history(
+                lambda model: filter_orders(order_query(model).filter(Outlet.owner_id == owner_id), model),
+                include_archive
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         return [serialize_order(o) for o in orders], 200
 
 
+class OrderExportResource(Resource):
+    def get(self):
+        """
+        Gzipped export of the owner's order lines for accounting
+        Query: ?format=csv|ndjson, ?from= / ?to= (ISO dates), ?outlet_id=
+        Streams from a server-side cursor, so any date range is fine
+        """
+        owner = require_owner()
+
+        if not owner:
+            return {"error": "Unauthorized"}, 401
+
+        fmt = request.args.get("format", "csv")
+        try:
+            date_from = request.args.get("from")
+            date_to = request.args.get("to")
+            date_from = datetime.fromisoformat(date_from) if date_from else None
+            date_to = datetime.fromisoformat(date_to) if date_to else None
+        except ValueError:
+            return {"error": "Invalid date, use ISO format"}, 400
+
+        outlet_id = request.args.get("outlet_id", type=int)
+
+        try:
+            chunks = export_orders(
+                fmt,
+                date_from=date_from,
+                date_to=date_to,
+                owner_id=owner.id,
+                outlet_id=outlet_id
+            )
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
+        filename = f"orders.{fmt}.gz"
+        return Response(
+            stream_with_context(chunks),
+            mimetype="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
+
+class OwnerOrderEventsResource(Resource):
+    def get(self, owner_id):
+        # EventSource cannot send headers, so the owner's token may come as ?token=
+        owner = require_owner(allow_query_token=True)
+
+        if not owner:
+            return {"error": "Unauthorized"}, 401
+
+        if owner.id != owner_id:
+            return {"error": "Unauthorized. Not registered owner."}, 403
+
+        return order_event_stream(f"owner:{owner_id}")
+
+
+class OutletOrderEventsResource(Resource):
+    def get(self, outlet_id):
+        owner = require_owner(allow_query_token=True)
+
+        if not owner:
+            return {"error": "Unauthorized"}, 401
+
+        outlet = Outlet.query.get(outlet_id)
+        if not outlet:
+            return {"error": "Outlet not found"}, 404
+
+        if outlet.owner_id != owner.id:
+            return {"error": "Unauthorized. Not registered owner."}, 403
+
+        return order_event_stream(f"outlet:{outlet_id}")
@@ -1,53 +1,104 @@
 from flask import request
 from flask_restful import Resource
-from models import db, Outlet, Owner, MenuOutletItem, Item
+from models import db, Outlet, Owner, MenuOutletItem, MenuChangeKind, Item, Testimonial, OutletRating
 from auth.permissions import require_owner
-from werkzeug.utils import secure_filename
+from kitchen import kitchen
+from menu_cache import cached_json, invalidate_menus, outlet_scope, storefront_scope
+from leaderboard import leaderboard
+from search import sync_menu_search, menu_ids_for
+from menu_changes import record_menu_changes
+from routes.order import ordered_menu_ids
+from routes.menu import wants_filtered_menu, filtered_menu
+from routes.testimonial import serialize_testimonial
+from sqlalchemy.orm import joinedload, contains_eager
+from images import image_variants, is_stored_image
+from image_jobs import image_jobs
+from ratings import average_rating, rating_summary
+from favourites import favourites_marker
 import os
 
 # Configuration for file uploads
 UPLOAD_FOLDER = '../photos'  # Relative path to photos folder
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
+# Latest testimonials shown on an outlet's storefront
+STOREFRONT_TESTIMONIALS = 10
+
+# ?sort= for outlet listings; outlets without ratings come last either way
+OUTLET_SORTS = {
+    "rating": (average_rating.is_(None), average_rating, OutletRating.rating_count.desc(), Outlet.id),
+    "-rating": (average_rating.is_(None), average_rating.desc(), OutletRating.rating_count.desc(), Outlet.id),
+}
+
 def allowed_file(filename):
     """Check if file has an allowed extension"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def save_outlet_image(file, outlet_name):
+def outlets_with_ratings(*criteria):
+    """
+    Outlets with their rating totals loaded in the same query, ordered by ?sort=
+    Raises ValueError on an unknown sort
     """
-    Save outlet image with sanitized outlet name as filename
-    Returns: filename if successful, None if failed
+    query = (
+        Outlet.query
+        .outerjoin(Outlet.rating)
+        .options(contains_eager(Outlet.rating))
+        .filter(*criteria)
+    )
+
+    sort = request.args.get("sort")
+    if sort:
+        if sort not in OUTLET_SORTS:
+            raise ValueError(f"Invalid sort, use one of: {', '.join(OUTLET_SORTS)}")
+        query = query.order_by(*OUTLET_SORTS[sort])
+    return query.all()
+
+def save_outlet_image(file, outlet_id):
+    """
+    Write the upload to disk and queue resizing/variants in the background.
+    Call after commit so the worker can find the outlet.
+    Returns: the ImageJob, or None if the file type is not allowed
     """
     if file and allowed_file(file.filename):
-        # Get file extension
-        extension = file.filename.rsplit('.', 1)[1].lower()
-        
-        # Create filename from outlet name
-        safe_name = "".join(c if c.isalnum() else "_" for c in outlet_name)
-        filename = f"{safe_name}.{extension}"
-        
-        # Ensure upload folder exists
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        
-        # Save file
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        
-        return filename
+        return image_jobs.submit(file, "outlet", outlet_id)
     return None
 
+
+def remove_outlet_image(image_path):
+    """
+    Delete an outlet's image file. Content-hashed images may be shared
+    with other outlets or items, so only legacy files are removed.
+    """
+    if not image_path or image_path == 'default-outlet.jpg' or is_stored_image(image_path):
+        return
+
+    old_image_path = os.path.join(UPLOAD_FOLDER, image_path)
+    if os.path.exists(old_image_path):
+        try:
+            os.remove(old_image_path)
+        except Exception as e:
+            print(f"Error deleting old image: {e}")
+
 # View list of all outlets
 class ListOutlets(Resource):
 
     def get(self):
 
-        outlets = Outlet.query.all()
+        # ?sort=-rating lists the best rated outlets first
+        try:
+            outlets = outlets_with_ratings()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         outlet_list = [{
             "id": outlet.id,
             "name": outlet.name,
             "category_name": outlet.category_name,
             "owner_id": outlet.owner_id,
-            "image_path": outlet.image_path if outlet.image_path and outlet.image_path.strip() else 'default-food.jpg'
+            "image_path": outlet.image_path if outlet.image_path and outlet.image_path.strip() else 'default-food.jpg',
+            "images": image_variants(outlet.image_path),
+            "rating": rating_summary(outlet.rating),
+            "wait_minutes": kitchen.wait_minutes(outlet.id)
         } for outlet in outlets]
 
         return {"outlets": outlet_list}, 200
@@ -63,6 +114,7 @@ class ListOutlets(Resource):
         name = None
         category_name = None
         image_filename = "default-food.jpg"
+        image_file = None
 
         # Handle multipart/form-data (with or without image)
         if 'multipart/form-data' in content_type:
@@ -70,10 +122,9 @@ class ListOutlets(Resource):
             category_name = request.form.get('category_name')
             image_file = request.files.get('image')
 
-            if image_file and allowed_file(image_file.filename):
-                image_filename = save_outlet_image(image_file, name or "outlet")
-                if not image_filename:
-                    return {"message": "Invalid image file"}, 400
+            # Processed in the background; the default image shows until then
+            if image_file and image_file.filename and not allowed_file(image_file.filename):
+                return {"message": "Invalid image file"}, 400
 
         # Handle application/json (no image)
         elif 'application/json' in content_type:
@@ -102,13 +153,16 @@ class ListOutlets(Resource):
 
         db.session.add(outlet)
         db.session.commit()
+        job = save_outlet_image(image_file, outlet.id)
 
         return {
             "id": outlet.id,
             "name": outlet.name,
             "category_name": outlet.category_name,
             "owner_id": outlet.owner_id,
-            "image_path": outlet.image_path
+            "image_path": outlet.image_path,
+            "images": image_variants(outlet.image_path),
+            "image_job": job.to_dict() if job else None
         }, 201
 
 
@@ -126,7 +180,8 @@ class OutletResource(Resource):
             "name": outlet.name,
             "category_name": outlet.category_name,
             "owner_id": outlet.owner_id,
-            "image_path": outlet.image_path if outlet.image_path and outlet.image_path.strip() else 'default-outlet.jpg'
+            "image_path": outlet.image_path if outlet.image_path and outlet.image_path.strip() else 'default-outlet.jpg',
+            "images": image_variants(outlet.image_path)
         }, 200
     
 
@@ -146,26 +201,14 @@ class OutletResource(Resource):
             return {"message": "Unauthorized. Not registered owner."}, 403
 
         # Check if request contains files (multipart/form-data)
+        image_file = None
         if 'image' in request.files:
             # Get data from form
             name = request.form.get('name', outlet.name)
             category_name = request.form.get('category_name', outlet.category_name)
+
+            # Queued after commit; the current image stays until it is processed
             image_file = request.files['image']
-            
-            # Save new image and get filename
-            image_filename = save_outlet_image(image_file, name)
-            
-            if image_filename:
-                # Delete old image if it's not the default
-                if outlet.image_path and outlet.image_path != 'default-outlet.jpg':
-                    old_image_path = os.path.join(UPLOAD_FOLDER, outlet.image_path)
-                    if os.path.exists(old_image_path):
-                        try:
-                            os.remove(old_image_path)
-                        except Exception as e:
-                            print(f"Error deleting old image: {e}")
-                
-                outlet.image_path = image_filename
                 
         else:
             # Get data from JSON
@@ -179,14 +222,22 @@ class OutletResource(Resource):
 
         outlet.name = name
         outlet.category_name = category_name
+        # The outlet name is part of each of its dishes' search text and entries
+        menu_ids = menu_ids_for(outlet_id=outlet.id)
+        sync_menu_search(menu_ids)
+        record_menu_changes(menu_ids, MenuChangeKind.updated)
         db.session.commit()
+        invalidate_menus([outlet.id])
+        job = save_outlet_image(image_file, outlet.id)
 
         return {
             "id": outlet.id,
             "name": outlet.name,
             "category_name": outlet.category_name,
             "owner_id": outlet.owner_id,
-            "image_path": outlet.image_path if outlet.image_path else 'default-outlet.jpg'
+            "image_path": outlet.image_path if outlet.image_path else 'default-outlet.jpg',
+            "images": image_variants(outlet.image_path),
+            "image_job": job.to_dict() if job else None
         }, 200
         
     # Delete an outlet - Owner-only route
@@ -206,42 +257,130 @@ class OutletResource(Resource):
         # Check whether it is the right outlet owner
         if outlet.owner_id != owner.id:
             return {"message": "Unauthorized. Not registered owner."}, 403
+
+        menu_ids = menu_ids_for(outlet_id=outlet.id)
+        if ordered_menu_ids(menu_ids):
+            return {"message": "Outlet has orders and cannot be deleted"}, 409
         
         # Delete image file if it's not the default
-        if outlet.image_path and outlet.image_path != 'default-outlet.jpg':
-            image_path = os.path.join(UPLOAD_FOLDER, outlet.image_path)
-            if os.path.exists(image_path):
-                try:
-                    os.remove(image_path)
-                except Exception as e:
-                    print(f"Error deleting image: {e}")
+        remove_outlet_image(outlet.image_path)
         
+        record_menu_changes(menu_ids, MenuChangeKind.removed)
         db.session.delete(outlet)
+        sync_menu_search(menu_ids)
         db.session.commit()
+        invalidate_menus([outlet_id])
+        leaderboard.regroup()
 
         return {"message": f"Outlet {outlet.name} deleted successfully."}, 200
 
+def outlet_menu_entry(link):
+    return {
+        "id": link.id,  # MenuOutletItem ID needed for bookings
+        "item_id": link.item_id,
+        "item_name": link.item.name,
+        "price": link.item.price,
+        "image": link.item.image,
+        "images": image_variants(link.item.image)
+    }
+
+
 # View the menu of a specific outlet
 class OutletMenu(Resource):
 
     def get(self, outlet_id):
+        # Cached per outlet with an ETag; menu and outlet writes invalidate it.
+        # Logged-in customers also get isFavourite on each entry
+        return cached_json(outlet_scope(outlet_id), lambda: self.build(outlet_id), favourites_marker("menu"))
+
+    def build(self, outlet_id):
 
         outlet = Outlet.query.get(outlet_id)
         if not outlet:
             return {"message": "Outlet not found."}, 404
         
-        # MenuOutletItem entries for this outlet
-        menu_links = MenuOutletItem.query.filter_by(outlet_id=outlet.id).all()
-        menu = [{
-            "id": link.id,  # MenuOutletItem ID needed for bookings
-            "item_id": link.item_id,
-            "item_name": link.item.name,
-            "price": link.item.price,
-            "image": link.item.image
-        } for link in menu_links]
-
-        return {"outlet": outlet.name, "menu": menu}, 200
+        # Filters and ?sort= narrow the menu and add category facet counts
+        facets = None
+        if wants_filtered_menu():
+            try:
+                menu_links, facets = filtered_menu(
+                    MenuOutletItem.outlet_id == outlet.id,
+                    facets=("category",)
+                )
+            except ValueError as e:
+                return {"error": str(e)}, 400
+        else:
+            # MenuOutletItem entries for this outlet
+            menu_links = (
+                MenuOutletItem.query
+                .options(joinedload(MenuOutletItem.item))
+                .filter_by(outlet_id=outlet.id)
+                .all()
+            )
+        menu = [outlet_menu_entry(link) for link in menu_links]
+
+        # Pass as ?since= with ?outlet_id= to /api/menu/changes to keep this menu up to date
+        if facets is not None:
+            return {"outlet": outlet.name, "version": outlet.menu_version, "menu": menu, "facets": facets}, 200
+
+        return {"outlet": outlet.name, "version": outlet.menu_version, "menu": menu}, 200
     
+# Outlet page data: details, menu, rating summary and latest testimonials
+class OutletStorefront(Resource):
+
+    def get(self, outlet_id):
+        # Cached per outlet; menu, outlet and testimonial writes invalidate it
+        return cached_json(storefront_scope(outlet_id), lambda: self.build(outlet_id))
+
+    def build(self, outlet_id):
+        """
+        Three queries whatever the menu or testimonial count: outlet joined
+        with its rating totals, menu with items, latest testimonials
+        """
+        outlet = (
+            Outlet.query
+            .options(joinedload(Outlet.rating))
+            .filter_by(id=outlet_id)
+            .first()
+        )
+        if not outlet:
+            return {"message": "Outlet not found."}, 404
+
+        menu_links = (
+            MenuOutletItem.query
+            .options(joinedload(MenuOutletItem.item))
+            .filter_by(outlet_id=outlet.id)
+            .order_by(MenuOutletItem.id)
+            .all()
+        )
+
+        # testimonial.outlet resolves from the identity map, not a query
+        testimonials = (
+            Testimonial.query
+            .filter_by(outlet_id=outlet.id)
+            .order_by(Testimonial.created_at.desc(), Testimonial.id)
+            .limit(STOREFRONT_TESTIMONIALS)
+            .all()
+        )
+
+        return {
+            "outlet": {
+                "id": outlet.id,
+                "name": outlet.name,
+                "category_name": outlet.category_name,
+                "owner_id": outlet.owner_id,
+                "image_path": outlet.image_path if outlet.image_path and outlet.image_path.strip() else 'default-outlet.jpg',
+                "images": image_variants(outlet.image_path)
+            },
+            "menu": {
+                "version": outlet.menu_version,
+                "items": [outlet_menu_entry(link) for link in menu_links]
+            },
+            "rating": rating_summary(outlet.rating),
+            "testimonials": [serialize_testimonial(t) for t in testimonials]
+        }, 200
+
+
 class OwnerOutletsResource(Resource):
     """Get outlets for the currently authenticated owner"""
     
@@ -252,14 +391,19 @@ class OwnerOutletsResource(Resource):
             return {"message": "Unauthorized"}, 401
         
         # Get all outlets owned by this owner
-        outlets = Outlet.query.filter_by(owner_id=owner.id).all()
+        try:
+            outlets = outlets_with_ratings(Outlet.owner_id == owner.id)
+        except ValueError as e:
+            return {"error": str(e)}, 400
         
         outlet_list = [{
             "id": outlet.id,
             "name": outlet.name,
             "category_name": outlet.category_name,
             "owner_id": outlet.owner_id,
-            "image_path": outlet.image_path if outlet.image_path and outlet.image_path.strip() else 'default-food.jpg'
+            "image_path": outlet.image_path if outlet.image_path and outlet.image_path.strip() else 'default-food.jpg',
+            "images": image_variants(outlet.image_path),
+            "rating": rating_summary(outlet.rating)
         } for outlet in outlets]
         
         return {"outlets": outlet_list}, 200
\ No newline at end of file
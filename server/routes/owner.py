@@ -1,12 +1,20 @@
+from datetime import date, timedelta
 from flask_restful import Resource
 from flask import request
 from werkzeug.security import generate_password_hash, check_password_hash
-from models import db, Owner, Outlet
+from sqlalchemy import func
+from models import db, Owner, Outlet, Item, DailyItemSales, DailyOutletSales
 from auth.permissions import require_owner
+from images import image_variants
 from auth.jwt import generate_token
 import re
 
 
+# Top items in owner analytics unless ?top= asks for more
+DEFAULT_TOP_ITEMS = 5
+MAX_TOP_ITEMS = 50
+
+
 # Owner registration
 class OwnerSignUp(Resource):
 
@@ -153,5 +161,84 @@ class OwnerOutletResource(Resource):
             "name": outlet.name,
             "category_name": outlet.category_name,
             "owner_id": outlet.owner_id,
-            "image_path": outlet.image_path
-        } for outlet in outlets], 200
\ No newline at end of file
+            "image_path": outlet.image_path,
+            "images": image_variants(outlet.image_path)
+        } for outlet in outlets], 200
+
+
+class OwnerAnalyticsResource(Resource):
+    """
+    Revenue, order counts and top items for the owner's outlets, answered
+    from the daily rollup tables rather than the orders table.
+    Query: ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive, default last 30 days),
+    ?outlet_id=, ?top=N
+    """
+
+    def get(self):
+        owner = require_owner()
+
+        if not owner:
+            return {"message": "Unauthorized"}, 401
+
+        try:
+            date_to = date.fromisoformat(request.args["to"]) if request.args.get("to") else date.today()
+            date_from = date.fromisoformat(request.args["from"]) if request.args.get("from") else date_to - timedelta(days=29)
+        except ValueError:
+            return {"error": "Invalid date, use YYYY-MM-DD"}, 400
+
+        top = request.args.get("top", DEFAULT_TOP_ITEMS, type=int)
+        top = max(1, min(top, MAX_TOP_ITEMS))
+        outlet_id = request.args.get("outlet_id", type=int)
+
+        outlet_ids = [o.id for o in Outlet.query.filter_by(owner_id=owner.id).all()]
+        if outlet_id is not None:
+            if outlet_id not in outlet_ids:
+                return {"message": "Unauthorized. Not registered owner."}, 403
+            outlet_ids = [outlet_id]
+
+        daily = (
+            DailyOutletSales.query
+            .filter(
+                DailyOutletSales.outlet_id.in_(outlet_ids),
+                DailyOutletSales.day.between(date_from, date_to)
+            )
+            .order_by(DailyOutletSales.day, DailyOutletSales.outlet_id)
+            .all()
+        )
+
+        quantity = func.sum(DailyItemSales.quantity).label("quantity")
+        revenue = func.sum(DailyItemSales.revenue).label("revenue")
+        top_items = (
+            db.session.query(DailyItemSales.outlet_id, Item.id, Item.name, quantity, revenue)
+            .join(Item, Item.id == DailyItemSales.item_id)
+            .filter(
+                DailyItemSales.outlet_id.in_(outlet_ids),
+                DailyItemSales.day.between(date_from, date_to)
+            )
+            .group_by(DailyItemSales.outlet_id, Item.id, Item.name)
+            .order_by(revenue.desc())
+            .limit(top)
+            .all()
+        )
+
+        return {
+            "from": date_from.isoformat(),
+            "to": date_to.isoformat(),
+            "totals": {
+                "revenue": sum(d.revenue for d in daily),
+                "orders": sum(d.order_count for d in daily)
+            },
+            "daily": [{
+                "date": d.day.isoformat(),
+                "outlet_id": d.outlet_id,
+                "revenue": d.revenue,
+                "orders": d.order_count
+            } for d in daily],
+            "top_items": [{
+                "outlet_id": row.outlet_id,
+                "item_id": row.id,
+                "name": row.name,
+                "quantity": row.quantity,
+                "revenue": row.revenue
+            } for row in top_items]
+        }, 200
@@ -4,7 +4,11 @@ from flask import request
 from flask_restful import Resource
 
 from extensions import db
-from models import TableBooking, Order, Customer, MenuOutletItem, BookingStatus
+from models import TableBooking, Order, Customer, MenuOutletItem, BookingStatus, ArchivedTableBooking, ArchivedOrder
+from routes.order import publish_order_event, build_line
+from idempotency import idempotent
+from kitchen import kitchen
+from rollups import record_order
 
 
 class TableBookingListResource(Resource):
@@ -27,6 +31,7 @@ class TableBookingListResource(Resource):
         except Exception as e:
             return {'error': str(e)}, 500
 
+    @idempotent
     def post(self):
         """Create a new table booking with associated order"""
         try:
@@ -37,6 +42,9 @@ class TableBookingListResource(Resource):
                 if field not in data:
                     return {'error': f'Missing required field: {field}'}, 400
 
+            if not isinstance(data['quantity'], int) or data['quantity'] <= 0:
+                return {'error': 'quantity must be a positive integer'}, 400
+
             customer = Customer.query.get(data['customer_id'])
             if not customer:
                 return {'error': 'Customer not found'}, 404
@@ -55,11 +63,16 @@ class TableBookingListResource(Resource):
                 except:
                     booking_datetime = datetime.utcnow() + timedelta(hours=1)
 
+            # Load the queue before the new order is flushed, or the load would count it
+            kitchen.ensure_loaded()
+
+            line = build_line(menu_item, data['quantity'])
             order = Order(
-                menu_outlet_item_id=data['menu_outlet_item_id'],
+                menu_outlet_item=menu_item,
                 customer_id=data['customer_id'],
                 quantity=data['quantity'],
-                estimated=datetime.utcnow() + timedelta(minutes=30),
+                total=line.line_total,
+                lines=[line],
             )
             db.session.add(order)
             db.session.flush()
@@ -74,8 +87,14 @@ class TableBookingListResource(Resource):
                 special_requests=data.get('special_requests', '')
             )
 
+            # Ready when the kitchen gets to it, but not before the table is due
+            order.estimated = max(kitchen.estimate(order), booking.booking_date)
+
             db.session.add(booking)
+            record_order(order)
             db.session.commit()
+            kitchen.sync(order)
+            publish_order_event(order, 'created')
 
             return {
                 'message': 'Table booking created successfully',
@@ -138,6 +157,7 @@ class TableBookingResource(Resource):
             if 'special_requests' in data:
                 booking.special_requests = data['special_requests']
         
+            order_cancelled = False
             if 'status' in data:
                 try:
                     booking.status = BookingStatus(data['status'])
@@ -146,10 +166,18 @@ class TableBookingResource(Resource):
             
                 if booking.status == BookingStatus.cancelled and booking.order:
                     from models import OrderStatus
+                    order_cancelled = booking.order.status != OrderStatus.cancelled
+                    record_order(booking.order, -1)
                     booking.order.status = OrderStatus.cancelled
 
             db.session.commit()
 
+            if booking.order:
+                kitchen.sync(booking.order)
+
+            if order_cancelled:
+                publish_order_event(booking.order, 'cancelled')
+
             return {
                 'message': 'Booking updated successfully',
                 'booking': {
@@ -196,6 +224,19 @@ class AvailableTablesResource(Resource):
         except Exception as e:
             return {'error': str(e)}, 500
 
+def customer_bookings(customer_id):
+    """The customer's bookings from the live and archive tables, oldest first"""
+    bookings = []
+    for booking_model, order_model in ((TableBooking, Order), (ArchivedTableBooking, ArchivedOrder)):
+        bookings += (
+            booking_model.query
+            .join(booking_model.order)
+            .filter(order_model.customer_id == customer_id)
+            .all()
+        )
+    return sorted(bookings, key=lambda b: (b.created_at or datetime.min, b.id))
+
+
 class CustomerTableBookingsResource(Resource):
     """Get all bookings for a specific customer"""
     
@@ -204,15 +245,7 @@ class CustomerTableBookingsResource(Resource):
             # Import here if not at top
             from models import BookingStatus
             
-            # First get all orders for this customer
-            customer_orders = Order.query.filter_by(customer_id=customer_id).all()
-            order_ids = [order.id for order in customer_orders]
-            
-            if not order_ids:
-                return [], 200
-                
-            # Then get bookings for those orders
-            bookings = TableBooking.query.filter(TableBooking.order_id.in_(order_ids)).all()
+            bookings = customer_bookings(customer_id)
             
             return [
                 {
@@ -229,11 +262,12 @@ class CustomerTableBookingsResource(Resource):
                     'outlet_id': booking.order.menu_outlet_item.outlet.id if booking.order and booking.order.menu_outlet_item else None,
                     'items': [
                         {
-                            'name': booking.order.menu_outlet_item.item.name,
-                            'quantity': booking.order.quantity,
-                            'price': booking.order.menu_outlet_item.item.price
+                            'name': line.menu_outlet_item.item.name,
+                            'quantity': line.quantity,
+                            'price': line.unit_price
                         }
-                    ] if booking.order and booking.order.menu_outlet_item else []
+                        for line in booking.order.lines
+                    ] if booking.order else []
                 }
                 for booking in bookings
             ], 200
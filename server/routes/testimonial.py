@@ -2,37 +2,97 @@ from flask import request
 from flask_restful import Resource
 from models import db, Testimonial, Outlet
 from auth.permissions import require_owner
+from menu_cache import invalidate_storefronts
+from ratings import record_rating, STARS
+from pagination import page_size, keyset_page
+from sqlalchemy.orm import joinedload
 import uuid
 
 
+def serialize_testimonial(testimonial):
+    return {
+        "id": testimonial.id,
+        "outlet_id": testimonial.outlet_id,
+        "outlet_name": testimonial.outlet.name,
+        "customer_name": testimonial.customer_name,
+        "avatar": testimonial.avatar if testimonial.avatar and testimonial.avatar.strip() else 'default-avatar.jpg',
+        "rating": testimonial.rating,
+        "review_text": testimonial.review_text,
+        "created_at": testimonial.created_at.isoformat() if testimonial.created_at else None,
+        "updated_at": testimonial.updated_at.isoformat() if testimonial.updated_at else None
+    }
+
+def rating_filters():
+    """
+    SQL conditions for ?rating=4,5, ?min_rating= and ?max_rating=
+    Raises ValueError on invalid values
+    """
+    def stars(value):
+        try:
+            rating = int(value)
+        except ValueError:
+            rating = None
+        if rating not in STARS:
+            raise ValueError(f"Ratings must be whole numbers from {STARS[0]} to {STARS[-1]}")
+        return rating
+
+    filters = []
+    if request.args.get("rating"):
+        ratings = [stars(r) for r in request.args["rating"].split(",")]
+        filters.append(Testimonial.rating.in_(ratings))
+    if request.args.get("min_rating"):
+        filters.append(Testimonial.rating >= stars(request.args["min_rating"]))
+    if request.args.get("max_rating"):
+        filters.append(Testimonial.rating <= stars(request.args["max_rating"]))
+    return filters
+
+
 class TestimonialListResource(Resource):
     
     def get(self):
-        # Get query parameter for filtering by outlet
-        outlet_id = request.args.get('outletId')
-        
-        if outlet_id:
-            # Filter by outlet
-            testimonials = Testimonial.query.filter_by(outlet_id=outlet_id).all()
-        else:
-            # Get all testimonials
-            testimonials = Testimonial.query.all()
-        
-        testimonials_list = []
-        for testimonial in testimonials:
-            testimonials_list.append({
-                "id": testimonial.id,
-                "outlet_id": testimonial.outlet_id,
-                "outlet_name": testimonial.outlet.name,
-                "customer_name": testimonial.customer_name,
-                "avatar": testimonial.avatar if testimonial.avatar and testimonial.avatar.strip() else 'default-avatar.jpg',
-                "rating": testimonial.rating,
-                "review_text": testimonial.review_text,
-                "created_at": testimonial.created_at.isoformat() if testimonial.created_at else None,
-                "updated_at": testimonial.updated_at.isoformat() if testimonial.updated_at else None
-            })
-        
-        return {"testimonials": testimonials_list, "count": len(testimonials_list)}, 200
+        """
+        Testimonials newest first, optionally for one outlet (?outletId=)
+        and filtered by ?rating=, ?min_rating=, ?max_rating=
+        ?limit= / ?cursor= switch to pages with next_cursor; without them
+        every testimonial is returned
+        """
+        try:
+            query = (
+                Testimonial.query
+                .options(joinedload(Testimonial.outlet, innerjoin=True))
+                .filter(*rating_filters())
+            )
+
+            # Get query parameter for filtering by outlet
+            outlet_id = request.args.get('outletId', type=int)
+            if outlet_id:
+                query = query.filter(Testimonial.outlet_id == outlet_id)
+
+            paginated = "limit" in request.args or "cursor" in request.args
+            if paginated:
+                testimonials, next_cursor = keyset_page(
+                    query,
+                    Testimonial.created_at,
+                    Testimonial.id,
+                    request.args.get("cursor"),
+                    page_size(),
+                    descending=True
+                )
+            else:
+                testimonials = query.order_by(Testimonial.created_at.desc(), Testimonial.id.desc()).all()
+        except ValueError as e:
+            return {"error": str(e)}, 400
+        
+        testimonials_list = [serialize_testimonial(testimonial) for testimonial in testimonials]
+
+        if not paginated:
+            return {"testimonials": testimonials_list, "count": len(testimonials_list)}, 200
+
+        return {
+            "testimonials": testimonials_list,
+            "count": len(testimonials_list),
+            "next_cursor": next_cursor
+        }, 200
     
     def post(self):
         data = request.get_json()
@@ -69,7 +129,9 @@ class TestimonialListResource(Resource):
         )
         
         db.session.add(testimonial)
+        record_rating(outlet.id, new=rating)
         db.session.commit()
+        invalidate_storefronts([testimonial.outlet_id])
         
         return {
             "id": testimonial.id,
@@ -128,12 +190,14 @@ class TestimonialResource(Resource):
             rating = data["rating"]
             if not isinstance(rating, int) or rating < 1 or rating > 5:
                 return {"error": "Rating must be between 1 and 5"}, 400
+            record_rating(testimonial.outlet_id, old=testimonial.rating, new=rating)
             testimonial.rating = rating
         
         if "review_text" in data:
             testimonial.review_text = data["review_text"]
         
         db.session.commit()
+        invalidate_storefronts([testimonial.outlet_id])
         
         return {
             "id": testimonial.id,
@@ -158,7 +222,9 @@ class TestimonialResource(Resource):
         if not testimonial:
             return {"message": "Testimonial not found"}, 404
         
+        record_rating(testimonial.outlet_id, old=testimonial.rating)
         db.session.delete(testimonial)
         db.session.commit()
+        invalidate_storefronts([testimonial.outlet_id])
         
         return {"message": f"Testimonial from {testimonial.customer_name} deleted successfully"}, 200
\ No newline at end of file
@@ -0,0 +1,141 @@
+import re
+
+from sqlalchemy import bindparam, event, select, text
+
+from extensions import db
+from models import MenuOutletItem
+
+
+# FTS5 index of menu entries; rowid is menu_outlet_items.id
+SEARCH_TABLE = "menu_search"
+
+# bm25 weights for name, description, category_name, outlet_name
+SEARCH_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+
+# Shorter words are matched whole; a one-letter prefix matches most rows
+MIN_PREFIX_LENGTH = 2
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    name,
+    description,
+    category_name,
+    outlet_name,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+
+# Text for each indexed menu entry, filtered by the caller
+INDEXED_ROWS = """
+SELECT menu_outlet_items.id, items.name, coalesce(items.description, ''),
+       coalesce(items.category_name, ''), outlets.name
+FROM menu_outlet_items
+JOIN items ON items.id = menu_outlet_items.item_id
+JOIN outlets ON outlets.id = menu_outlet_items.outlet_id
+"""
+
+
+def create_search_table(connection):
+    connection.execute(text(CREATE_SEARCH_TABLE))
+
+
+# The index is not a mapped table, so create_all/drop_all handle it here
+event.listen(
+    db.metadata, "after_create",
+    lambda target, connection, **kw: create_search_table(connection)
+)
+event.listen(
+    db.metadata, "before_drop",
+    lambda target, connection, **kw: connection.execute(text(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+)
+
+
+def menu_ids_for(item_id=None, outlet_id=None):
+    """menu_outlet_items ids whose indexed text depends on an item or outlet"""
+    query = select(MenuOutletItem.id)
+    if item_id is not None:
+        query = query.where(MenuOutletItem.item_id == item_id)
+    if outlet_id is not None:
+        query = query.where(MenuOutletItem.outlet_id == outlet_id)
+    return db.session.scalars(query).all()
+
+
+def sync_menu_search(menu_ids):
+    """
+    Re-index the given menu entries inside the caller's transaction.
+    Entries that no longer exist are just removed, so deletes collect the
+    ids first and call this after deleting.
+    """
+    menu_ids = list(menu_ids)
+    if not menu_ids:
+        return
+
+    db.session.flush()
+    params = {"ids": menu_ids}
+    db.session.execute(
+        text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)),
+        params
+    )
+    db.session.execute(
+        text(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, category_name, outlet_name) "
+            f"{INDEXED_ROWS} WHERE menu_outlet_items.id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)),
+        params
+    )
+
+
+def rebuild_menu_search():
+    """
+    Recreate the whole index from the menu tables
+    Returns: number of indexed menu entries
+    """
+    create_search_table(db.session.connection())
+    db.session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    result = db.session.execute(
+        text(f"INSERT INTO {SEARCH_TABLE} (rowid, name, description, category_name, outlet_name) {INDEXED_ROWS}")
+    )
+    db.session.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
+    db.session.commit()
+    return result.rowcount
+
+
+def match_expression(q):
+    """
+    FTS5 query for free text: every word is quoted (so operators and
+    punctuation are literal) and prefix matched for typeahead
+    """
+    words = re.findall(r"\w+", q, flags=re.UNICODE)
+    # A lone letter still being typed after other words would only narrow
+    # the results to nothing; wait for the next keystroke instead
+    if len(words) > 1 and len(words[-1]) < MIN_PREFIX_LENGTH:
+        words = words[:-1]
+    return " ".join(
+        f'"{word}"*' if len(word) >= MIN_PREFIX_LENGTH else f'"{word}"'
+        for word in words
+    )
+
+
+def search_menu(q, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Best BM25 matches for q
+    Returns: list of (menu_outlet_item_id, score), best first
+    """
+    expression = match_expression(q)
+    if not expression:
+        return []
+
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, bm25({SEARCH_TABLE}, {weights}) AS score "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :expression "
+            f"ORDER BY score LIMIT :limit"
+        ),
+        {"expression": expression, "limit": limit}
+    )
+    return [(row.rowid, row.score) for row in rows]
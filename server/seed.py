@@ -11,6 +11,10 @@ if __name__ == "__main__":
     from app import app
     from extensions import db
     from models import Owner, Customer, Outlet, Item, MenuOutletItem, Order, TableBooking, OrderStatus, Testimonial, CustomerFavourite
+    from routes.order import build_line
+    from rollups import rebuild_daily_sales
+    from search import rebuild_menu_search
+    from ratings import rebuild_outlet_ratings
     
 
     with app.app_context():
@@ -278,7 +282,8 @@ if __name__ == "__main__":
             quantity=2,
             status=OrderStatus.completed,
             created_at=now - timedelta(hours=2),
-            estimated=now - timedelta(hours=1, minutes=45)
+            estimated=now - timedelta(hours=1, minutes=45),
+            lines=[build_line(menu_items[0], 2)]
         )
         
         # Order 2: Sarah ordering Tacos
@@ -288,7 +293,8 @@ if __name__ == "__main__":
             quantity=1,
             status=OrderStatus.pending,
             created_at=now - timedelta(minutes=15),
-            estimated=now + timedelta(minutes=30)
+            estimated=now + timedelta(minutes=30),
+            lines=[build_line(menu_items[5], 1)]
         )
         
         # Order 3: Amit ordering Fried Rice
@@ -298,7 +304,8 @@ if __name__ == "__main__":
             quantity=3,
             status=OrderStatus.pending,
             created_at=now - timedelta(minutes=5),
-            estimated=now + timedelta(minutes=25)
+            estimated=now + timedelta(minutes=25),
+            lines=[build_line(menu_items[10], 3)]
         )
         
         # Order 4: John ordering Biryani
@@ -308,9 +315,13 @@ if __name__ == "__main__":
             quantity=1,
             status=OrderStatus.completed,
             created_at=now - timedelta(days=1),
-            estimated=now - timedelta(days=1, minutes=-45)
+            estimated=now - timedelta(days=1, minutes=-45),
+            lines=[build_line(menu_items[1], 1)]
         )
         
+        for order in (order1, order2, order3, order4):
+            order.total = sum(line.line_total for line in order.lines)
+
         db.session.add_all([order1, order2, order3, order4])
         db.session.commit()
         
@@ -337,6 +348,11 @@ if __name__ == "__main__":
         db.session.add_all([booking1, booking2])
         db.session.commit()
 
+        # Sales rollups for the seeded orders
+        print("Building daily sales rollups...")
+        rebuild_daily_sales()
+        rebuild_menu_search()
+
         # Create sample testimonials
         print("Creating testimonials...")
         
@@ -435,6 +451,7 @@ if __name__ == "__main__":
         
         db.session.add_all(testimonials)
         db.session.commit()
+        rebuild_outlet_ratings()
         
         
         print("\n✅ Database seeded successfully!")
@@ -0,0 +1,119 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+# Modules import each other by top-level name, as when run from server/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from auth.jwt import generate_token
+from extensions import db
+from favourites import FavouriteCache, set_favourite_cache
+from idempotency import IdempotencyStore, set_store
+from kitchen import kitchen
+from leaderboard import leaderboard
+from menu_cache import get_menu_cache
+from models import Owner, Customer, Outlet, Item, MenuOutletItem, Order, OrderStatus, TableBooking
+from routes.order import build_line
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+    })
+
+    with app.app_context():
+        db.create_all()
+
+        # Per-process state left over from other tests
+        kitchen.loaded = False
+        leaderboard.loaded = False
+        get_menu_cache().clear()
+        set_favourite_cache(FavouriteCache())
+        set_store(IdempotencyStore())
+
+        yield app
+
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_selects(app):
+    """Returns: a function running fn() and giving the number of SELECTs it issued"""
+    def count(fn):
+        selects = []
+
+        def listener(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                selects.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+        return len(selects)
+
+    return count
+
+
+def auth_header(user, role):
+    return {"Authorization": f"Bearer {generate_token(user.id, role)}"}
+
+
+def make_owner(name="Owner", email="owner@example.com"):
+    owner = Owner(name=name, email=email, password_hashed="x")
+    db.session.add(owner)
+    db.session.commit()
+    return owner
+
+
+def make_customer(name="Customer", email="customer@example.com"):
+    customer = Customer(name=name, email=email, password_hashed="x")
+    db.session.add(customer)
+    db.session.commit()
+    return customer
+
+
+def make_outlet(owner, name="Outlet"):
+    outlet = Outlet(name=name, category_name="Test", owner_id=owner.id)
+    db.session.add(outlet)
+    db.session.commit()
+    return outlet
+
+
+def make_menu_item(outlet, name="Dish", price=100, prep_minutes=10, category_name="Test", is_available=True):
+    item = Item(name=name, price=price, category_name=category_name, prep_minutes=prep_minutes, is_available=is_available)
+    menu_item = MenuOutletItem(outlet=outlet, item=item)
+    db.session.add(menu_item)
+    db.session.commit()
+    return menu_item
+
+
+def make_order(customer, menu_item, quantity=1, status=OrderStatus.pending, created_at=None, table_number=None):
+    line = build_line(menu_item, quantity)
+    order = Order(
+        customer_id=customer.id,
+        menu_outlet_item=menu_item,
+        quantity=quantity,
+        status=status,
+        total=line.line_total,
+        lines=[line],
+        created_at=created_at or datetime.utcnow()
+    )
+    if table_number:
+        order.table_booking = TableBooking(table_number=table_number, capacity=4, created_at=order.created_at)
+    db.session.add(order)
+    db.session.commit()
+    return order
@@ -0,0 +1,45 @@
+from sqlalchemy import event
+
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item, make_order
+from extensions import db
+from models import DailyOutletSales, Order, OrderStatus
+from rollups import rebuild_daily_sales
+
+
+def outlet_orders():
+    db.session.expire_all()
+    return sum(row.order_count for row in DailyOutletSales.query.all())
+
+
+def test_bulk_cancel_skips_orders_changed_meanwhile(app, client):
+    owner = make_owner()
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(owner))
+    first, second = make_order(customer, menu_item), make_order(customer, menu_item)
+    order_ids = [first.id, second.id]
+    rebuild_daily_sales()
+    assert outlet_orders() == 2
+
+    # Another request cancels the second order between the status check and the UPDATE
+    def cancel_second(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE ORDERS") and order_ids[1] in parameters:
+            cursor.execute("UPDATE orders SET status = 'cancelled' WHERE id = ?", (order_ids[1],))
+
+    event.listen(db.engine, "before_cursor_execute", cancel_second)
+    try:
+        response = client.patch(
+            "/api/orders/bulk-status",
+            json={"order_ids": order_ids, "status": "cancelled"},
+            headers=auth_header(owner, "owner")
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", cancel_second)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == 1
+    assert body["results"][str(order_ids[0])]["result"] == "updated"
+    assert body["results"][str(order_ids[1])]["result"] == "conflict"
+    # Only the order this request cancelled leaves the rollups
+    assert outlet_orders() == 1
+    assert Order.query.get(order_ids[0]).status == OrderStatus.cancelled
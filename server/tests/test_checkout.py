@@ -0,0 +1,86 @@
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item
+from models import Order, OrderLine
+
+
+def checkout(client, customer, items):
+    return client.post("/api/orders/checkout", json={"customer_id": customer.id, "items": items})
+
+
+def test_checkout_creates_one_order_per_outlet(client):
+    owner = make_owner()
+    customer = make_customer()
+    first_outlet, second_outlet = make_outlet(owner, "First"), make_outlet(owner, "Second")
+    pilau = make_menu_item(first_outlet, "Pilau", price=300)
+    chapati = make_menu_item(first_outlet, "Chapati", price=50)
+    tea = make_menu_item(second_outlet, "Tea", price=80)
+
+    response = checkout(client, customer, [
+        {"menu_outlet_item_id": pilau.id, "quantity": 1},
+        {"menu_outlet_item_id": chapati.id, "quantity": 2},
+        {"menu_outlet_item_id": tea.id, "quantity": 1},
+        # Repeated dishes merge into one line
+        {"menu_outlet_item_id": chapati.id, "quantity": 1},
+    ])
+
+    assert response.status_code == 201
+    orders = response.get_json()["orders"]
+    assert [o["outlet_name"] for o in orders] == ["First", "Second"]
+    assert [(i["name"], i["quantity"]) for i in orders[0]["items"]] == [("Pilau", 1), ("Chapati", 3)]
+    assert orders[0]["quantity"] == 4
+    assert orders[0]["total"] == 300 + 3 * 50
+    assert orders[1]["total"] == 80
+
+
+def test_checkout_rejects_invalid_items(client):
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(make_owner()))
+
+    for items in (
+        [{"menu_outlet_item_id": [menu_item.id], "quantity": 1}],
+        [{"menu_outlet_item_id": str(menu_item.id), "quantity": 1}],
+        [{"menu_outlet_item_id": menu_item.id, "quantity": 0}],
+        [{"menu_outlet_item_id": menu_item.id}],
+        [],
+    ):
+        assert checkout(client, customer, items).status_code == 400
+
+
+def test_checkout_writes_nothing_when_an_item_is_missing(client):
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(make_owner()))
+
+    response = checkout(client, customer, [
+        {"menu_outlet_item_id": menu_item.id, "quantity": 1},
+        {"menu_outlet_item_id": 999, "quantity": 1},
+    ])
+
+    assert response.status_code == 404
+    assert response.get_json()["menu_outlet_item_ids"] == [999]
+    assert Order.query.count() == 0
+    assert OrderLine.query.count() == 0
+
+
+def test_ordered_menu_entries_cannot_be_deleted(client):
+    owner = make_owner()
+    outlet = make_outlet(owner)
+    pilau = make_menu_item(outlet, "Pilau")
+    chapati = make_menu_item(outlet, "Chapati")
+    unordered = make_menu_item(outlet, "Ugali")
+    chapati_id, chapati_item_id, outlet_id = chapati.id, chapati.item_id, outlet.id
+
+    response = checkout(client, make_customer(), [
+        {"menu_outlet_item_id": pilau.id, "quantity": 1},
+        {"menu_outlet_item_id": chapati.id, "quantity": 1},
+    ])
+    assert response.status_code == 201
+
+    # Chapati is only a second line of the order, not its menu_outlet_item
+    headers = auth_header(owner, "owner")
+    assert client.delete(f"/api/menu/{chapati_id}").status_code == 409
+    assert client.delete(f"/items/{chapati_item_id}", headers=headers).status_code == 409
+    assert client.delete(f"/api/outlets/{outlet_id}", headers=headers).status_code == 409
+    assert client.delete(f"/api/menu/{unordered.id}").status_code in (200, 204)
+
+    response = client.get("/api/orders")
+    assert response.status_code == 200
+    assert [i["name"] for i in response.get_json()[0]["items"]] == ["Pilau", "Chapati"]
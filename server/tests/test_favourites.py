@@ -0,0 +1,70 @@
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item
+from favourites import favourite_item_ids, get_favourite_cache
+
+
+def toggle(client, item_id, headers):
+    response = client.post(f"/api/items/{item_id}/favourite", headers=headers)
+    assert response.status_code in (200, 201)
+    return response.get_json()["favourited"]
+
+
+def marked(client, url, headers=None):
+    response = client.get(url, headers=headers or {})
+    assert response.status_code == 200
+    body = response.get_json()
+    entries = body["items"] if isinstance(body, dict) else body
+    return {entry.get("item_id", entry.get("id")): entry.get("isFavourite") for entry in entries}
+
+
+def test_listings_mark_the_customers_favourites(client):
+    owner = make_owner()
+    outlet = make_outlet(owner)
+    liked, other = make_menu_item(outlet, "Liked").item_id, make_menu_item(outlet, "Other").item_id
+    customer = auth_header(make_customer(), "customer")
+    someone_else = auth_header(make_customer("Someone", "someone@example.com"), "customer")
+
+    assert toggle(client, liked, customer) is True
+
+    assert marked(client, "/items", customer) == {liked: True, other: False}
+    assert marked(client, "/api/menu", customer) == {liked: True, other: False}
+    assert marked(client, "/api/menu?category=Test", customer) == {liked: True, other: False}
+    assert marked(client, "/api/menu", someone_else) == {liked: False, other: False}
+    assert marked(client, "/items", auth_header(owner, "owner")) == {liked: False, other: False}
+    assert marked(client, "/api/menu") == {liked: None, other: None}
+
+
+def test_toggling_refreshes_the_marks(client):
+    outlet = make_outlet(make_owner())
+    item_id = make_menu_item(outlet).item_id
+    customer = auth_header(make_customer(), "customer")
+
+    assert marked(client, "/api/menu", customer) == {item_id: False}
+    assert toggle(client, item_id, customer) is True
+    assert marked(client, "/api/menu", customer) == {item_id: True}
+    assert marked(client, "/items", customer) == {item_id: True}
+    assert toggle(client, item_id, customer) is False
+    assert marked(client, "/api/menu", customer) == {item_id: False}
+    assert marked(client, "/items", customer) == {item_id: False}
+
+
+def test_favourite_ids_are_loaded_once_per_customer(client, count_selects):
+    outlet = make_outlet(make_owner())
+    item_id = make_menu_item(outlet).item_id
+    customer = make_customer()
+    customer_id = customer.id
+    toggle(client, item_id, auth_header(customer, "customer"))
+
+    assert count_selects(lambda: favourite_item_ids(customer_id)) == 1
+    assert count_selects(lambda: favourite_item_ids(customer_id)) == 0
+    assert favourite_item_ids(customer_id) == {item_id}
+
+    get_favourite_cache().invalidate(customer_id)
+    assert count_selects(lambda: favourite_item_ids(customer_id)) == 1
+
+
+def test_a_set_loaded_during_a_toggle_is_not_stored():
+    cache = get_favourite_cache()
+    generation = cache.generation(1)
+    cache.invalidate(1)
+    cache.put(1, generation, frozenset({7}))
+    assert cache.get(1) is None
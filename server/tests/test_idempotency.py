@@ -0,0 +1,50 @@
+from conftest import make_owner, make_customer, make_outlet, make_menu_item
+from models import Order
+
+
+def place_order(client, body, key):
+    return client.post("/api/orders", json=body, headers={"Idempotency-Key": key})
+
+
+def test_repeated_key_replays_the_first_response(client):
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    body = {"customer_id": customer.id, "menu_outlet_item_id": menu_item.id, "quantity": 1}
+
+    first = place_order(client, body, "abc")
+    replay = place_order(client, body, "abc")
+
+    assert first.status_code == replay.status_code == 201
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert replay.get_json() == first.get_json()
+    assert Order.query.count() == 1
+
+    assert place_order(client, body, "def").status_code == 201
+    assert Order.query.count() == 2
+
+
+def test_reused_key_with_another_body_is_rejected(client):
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    body = {"customer_id": customer.id, "menu_outlet_item_id": menu_item.id, "quantity": 1}
+
+    assert place_order(client, body, "abc").status_code == 201
+    response = place_order(client, {**body, "quantity": 2}, "abc")
+
+    assert response.status_code == 422
+    assert Order.query.count() == 1
+
+
+def test_client_errors_are_replayed_and_requests_without_key_are_not(client):
+    customer = make_customer()
+    body = {"customer_id": customer.id, "menu_outlet_item_id": 999, "quantity": 1}
+
+    assert place_order(client, body, "abc").status_code == 404
+    assert place_order(client, body, "abc").headers["Idempotent-Replayed"] == "true"
+
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    body = {**body, "menu_outlet_item_id": menu_item.id}
+    client.post("/api/orders", json=body)
+    client.post("/api/orders", json=body)
+    assert Order.query.count() == 2
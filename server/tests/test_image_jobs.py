@@ -0,0 +1,64 @@
+import io
+import time
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+import image_jobs as image_jobs_module
+from conftest import make_owner, make_outlet, make_menu_item
+from extensions import db
+from image_jobs import image_jobs
+from images import process_image
+from models import Item
+
+
+@pytest.fixture
+def folders(tmp_path, monkeypatch):
+    photos = tmp_path / "photos"
+    monkeypatch.setattr(image_jobs_module, "INCOMING_FOLDER", str(tmp_path / "incoming"))
+    monkeypatch.setattr(image_jobs_module, "process_image", lambda data: process_image(data, photos))
+    return tmp_path
+
+
+def upload(data):
+    return FileStorage(io.BytesIO(data), filename="dish.png")
+
+
+def wait(job):
+    deadline = time.monotonic() + 10
+    while job.status in ("pending", "processing") and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return job
+
+
+def test_upload_is_processed_off_the_request_and_attached(client, folders):
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    item_id = menu_item.item_id
+    buffer = io.BytesIO()
+    Image.new("RGB", (100, 100), "green").save(buffer, "PNG")
+
+    job = wait(image_jobs.submit(upload(buffer.getvalue()), "item", item_id))
+
+    assert job.status == "done"
+    assert list((folders / "incoming").iterdir()) == []
+    db.session.expire_all()
+    assert db.session.get(Item, item_id).image == job.image
+
+    body = client.get(f"/api/images/jobs/{job.id}").get_json()
+    assert body["status"] == "done"
+    assert body["images"]["thumbnail"]["webp"].endswith("-thumbnail.webp")
+    assert client.get("/api/menu").get_json()[0]["image"] == job.image
+
+
+def test_invalid_upload_fails_without_touching_the_row(client, folders):
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    item_id = menu_item.item_id
+
+    job = wait(image_jobs.submit(upload(b"not an image"), "item", item_id))
+
+    assert job.status == "failed"
+    assert job.error == "Not a valid image"
+    db.session.expire_all()
+    assert db.session.get(Item, item_id).image is None
+    assert client.get("/api/images/jobs/unknown").status_code == 404
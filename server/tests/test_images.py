@@ -0,0 +1,59 @@
+import io
+import os
+
+from PIL import Image
+
+import images
+from images import process_image, image_variants, stored_name, content_key
+
+
+def encode(image, fmt="PNG", **options):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def test_upload_is_stored_as_resized_variants(tmp_path):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    data = encode(Image.new("RGB", (2000, 1000), "red"), "JPEG", exif=exif)
+
+    name = process_image(data, tmp_path)
+
+    key = content_key(data)
+    assert name == stored_name(key) == f"{key}-full.jpg"
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        f"{key}-{variant}.{ext}" for variant in ("thumbnail", "card", "full") for ext in ("jpg", "webp")
+    )
+    with Image.open(tmp_path / f"{key}-full.jpg") as full:
+        assert full.size == (1280, 640)
+        assert not full.getexif()
+    with Image.open(tmp_path / f"{key}-thumbnail.webp") as thumbnail:
+        assert thumbnail.size == (160, 80)
+
+    assert image_variants(name)["card"] == {
+        "webp": f"/uploads/{key}-card.webp",
+        "jpeg": f"/uploads/{key}-card.jpg",
+    }
+    assert image_variants("legacy.png") is None
+
+
+def test_identical_uploads_are_stored_once(tmp_path):
+    data = encode(Image.new("RGBA", (50, 50), (0, 0, 255, 128)))
+
+    name = process_image(data, tmp_path)
+    modified = os.path.getmtime(tmp_path / name)
+    assert process_image(data, tmp_path) == name
+    assert os.path.getmtime(tmp_path / name) == modified
+    assert len(os.listdir(tmp_path)) == 6
+
+    with Image.open(tmp_path / name) as full:
+        assert full.mode == "RGB"
+
+
+def test_unusable_uploads_are_refused(tmp_path, monkeypatch):
+    assert process_image(b"not an image", tmp_path) is None
+
+    monkeypatch.setattr(images, "MAX_IMAGE_PIXELS", 100)
+    assert process_image(encode(Image.new("RGB", (20, 20))), tmp_path) is None
+    assert os.listdir(tmp_path) == []
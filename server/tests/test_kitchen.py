@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from conftest import make_owner, make_customer, make_outlet, make_menu_item, make_order
+from kitchen import kitchen
+
+
+def outlet_wait(client, outlet):
+    response = client.get("/api/outlets")
+    assert response.status_code == 200
+    return next(o["wait_minutes"] for o in response.get_json()["outlets"] if o["id"] == outlet.id)
+
+
+def test_quantity_edit_updates_wait(client):
+    outlet = make_outlet(make_owner())
+    order = make_order(make_customer(), make_menu_item(outlet, prep_minutes=10), quantity=1)
+    assert outlet_wait(client, outlet) == 5
+
+    response = client.put(f"/api/orders/{order.id}", json={"quantity": 10})
+    assert response.status_code == 200
+    assert outlet_wait(client, outlet) == 50
+
+    # Same as rebuilding the queue from the database
+    kitchen.load()
+    assert outlet_wait(client, outlet) == 50
+
+    client.put(f"/api/orders/{order.id}", json={"status": "completed"})
+    assert outlet_wait(client, outlet) == 0
+
+
+def test_first_estimate_after_restart_counts_the_order_once(client):
+    menu_item = make_menu_item(make_outlet(make_owner()), prep_minutes=10)
+    customer = make_customer()
+    make_order(customer, menu_item, quantity=2)
+    # A fresh process: the queue loads on the next request
+    kitchen.loaded = False
+
+    response = client.post(
+        "/api/orders",
+        json={"customer_id": customer.id, "menu_outlet_item_id": menu_item.id, "quantity": 4}
+    )
+    assert response.status_code == 201
+    order = response.get_json()
+
+    # 20 queued + 40 new minutes over two stations
+    created_at = datetime.fromisoformat(order["created_at"])
+    estimated = datetime.fromisoformat(order["estimated"])
+    assert round((estimated - created_at).total_seconds() / 60) == 30
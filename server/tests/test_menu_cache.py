@@ -0,0 +1,49 @@
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item
+
+
+def test_menu_is_served_with_an_etag_and_revalidated(client, count_selects):
+    owner = make_owner()
+    menu_item = make_menu_item(make_outlet(owner), price=100)
+    item_id = menu_item.item_id
+
+    first = client.get("/api/menu")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    assert "Authorization" in first.headers["Vary"]
+    etag = first.headers["ETag"]
+
+    # Cached: no queries, and a matching If-None-Match gets an empty 304
+    assert count_selects(lambda: client.get("/api/menu")) == 0
+    response = client.get("/api/menu", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # Query-string variants are cached apart
+    filtered = client.get("/api/menu?category=Test")
+    assert filtered.headers["ETag"] != etag
+    assert filtered.get_json()["count"] == 1
+
+    response = client.put(f"/items/{item_id}", json={"price": 120}, headers=auth_header(owner, "owner"))
+    assert response.status_code == 200
+
+    response = client.get("/api/menu", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()[0]["price"] == 120
+
+
+def test_personalised_menu_has_its_own_etag(client):
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    customer = make_customer()
+    headers = auth_header(customer, "customer")
+
+    anonymous = client.get("/api/menu")
+    before = client.get("/api/menu", headers=headers)
+    assert before.headers["ETag"] != anonymous.headers["ETag"]
+    assert before.get_json()[0]["isFavourite"] is False
+
+    client.post(f"/api/items/{menu_item.item_id}/favourite", headers=headers)
+
+    after = client.get("/api/menu", headers={**headers, "If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.get_json()[0]["isFavourite"] is True
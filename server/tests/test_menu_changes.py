@@ -0,0 +1,65 @@
+from conftest import auth_header, make_owner, make_outlet
+from extensions import db
+from models import Outlet
+from menu_changes import purge_menu_changes
+
+
+def changes(client, query):
+    response = client.get(f"/api/menu/changes?{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def names(entries):
+    return sorted(e["item_name"] for e in entries)
+
+
+def test_deltas_collapse_to_one_change_per_entry(client):
+    owner = make_owner()
+    outlet_id = make_outlet(owner).id
+    headers = auth_header(owner, "owner")
+
+    imported = client.post(f"/api/outlets/{outlet_id}/menu/import", headers=headers, json=[
+        {"name": name, "price": 100} for name in ("Pilau", "Chapati", "Ugali", "Tea")
+    ]).get_json()["items"]
+    menu_ids = {i["name"]: i["menu_id"] for i in imported}
+
+    body = changes(client, "since=0")
+    assert names(body["added"]) == ["Chapati", "Pilau", "Tea", "Ugali"]
+    synced = body["version"]
+    assert changes(client, f"outlet_id={outlet_id}") == {"version": synced}
+    assert db.session.get(Outlet, outlet_id).menu_version == synced
+
+    client.put(f"/items/{imported[0]['item_id']}", json={"price": 120}, headers=headers)
+    client.put(f"/api/menu/{menu_ids['Ugali']}", data={"is_available": "false"})
+    client.delete(f"/api/menu/{menu_ids['Chapati']}")
+    client.put(f"/api/menu/{menu_ids['Tea']}", data={"price": "90"})
+    client.put(f"/api/menu/{menu_ids['Tea']}", data={"price": "95"})
+
+    body = changes(client, f"since={synced}&outlet_id={outlet_id}")
+    assert body["added"] == []
+    assert names(body["updated"]) == ["Pilau", "Tea"]
+    assert names(body["unavailable"]) == ["Ugali"]
+    assert [r["id"] for r in body["removed"]] == [menu_ids["Chapati"]]
+
+    # Pages follow version order
+    first = changes(client, f"since={synced}&limit=2")
+    assert first["has_more"] is True
+    rest = changes(client, f"since={first['version']}")
+    assert rest["has_more"] is False
+    assert rest["version"] == body["version"]
+
+
+def test_unknown_or_purged_versions_ask_for_a_reload(client):
+    owner = make_owner()
+    outlet_id = make_outlet(owner).id
+    headers = auth_header(owner, "owner")
+    for name in ("Pilau", "Chapati", "Ugali"):
+        client.post(f"/api/outlets/{outlet_id}/menu/import", headers=headers, json=[{"name": name, "price": 1}])
+
+    assert changes(client, "since=99")["reset"] is True
+    assert client.get("/api/menu/changes?since=-1").status_code == 400
+
+    purge_menu_changes(retention_days=-1)
+    assert changes(client, "since=0")["reset"] is True
+    assert changes(client, "since=2")["reset"] is False
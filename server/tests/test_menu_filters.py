@@ -0,0 +1,39 @@
+from conftest import make_owner, make_outlet, make_menu_item
+
+
+def menu(client, query):
+    response = client.get(f"/api/menu?{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_filters_sort_and_facets(client):
+    owner = make_owner()
+    grill, cafe = make_outlet(owner, "Grill"), make_outlet(owner, "Cafe")
+    make_menu_item(grill, "Burger", price=500, category_name="Mains")
+    make_menu_item(grill, "Fries", price=200, category_name="Sides")
+    make_menu_item(cafe, "Salad", price=300, category_name="Mains", is_available=False)
+    make_menu_item(cafe, "Mystery", price=100, category_name=None)
+
+    body = menu(client, "category=Mains&sort=-price")
+    assert [i["item_name"] for i in body["items"]] == ["Burger", "Salad"]
+    assert body["count"] == 2
+    # Each facet ignores its own filter, so other categories still show counts
+    assert {f["value"]: f["count"] for f in body["facets"]["category"]} == {"Mains": 2, "Sides": 1, "Uncategorized": 1}
+    assert {f["name"]: f["count"] for f in body["facets"]["outlet"]} == {"Grill": 1, "Cafe": 1}
+
+    body = menu(client, "min_price=150&max_price=400&sort=price")
+    assert [i["item_name"] for i in body["items"]] == ["Fries", "Salad"]
+
+    body = menu(client, f"is_available=true&outlet_id={cafe.id}")
+    assert [i["item_name"] for i in body["items"]] == ["Mystery"]
+
+    body = menu(client, "category=Uncategorized")
+    assert [i["category"] for i in body["items"]] == ["Uncategorized"]
+
+
+def test_invalid_filters_are_rejected(client):
+    make_menu_item(make_outlet(make_owner()))
+
+    for query in ("min_price=cheap", "is_available=maybe", "outlet_id=x", "sort=rating"):
+        assert client.get(f"/api/menu?{query}").status_code == 400
@@ -0,0 +1,37 @@
+from conftest import auth_header, make_owner, make_outlet, make_menu_item
+from search import match_expression, rebuild_menu_search
+
+
+def search(client, q):
+    response = client.get("/api/menu/search", query_string={"q": q})
+    assert response.status_code == 200
+    return [r["item_name"] for r in response.get_json()["results"]]
+
+
+def test_match_expression_quotes_and_prefixes_words():
+    assert match_expression("chick tik") == '"chick"* "tik"*'
+    assert match_expression('pilau" OR (beef') == '"pilau"* "OR"* "beef"*'
+    # A trailing single letter is still being typed
+    assert match_expression("chicken t") == '"chicken"*'
+    assert match_expression("c") == '"c"'
+    assert match_expression("?!") == ""
+
+
+def test_search_ranks_name_matches_first_and_follows_writes(client):
+    owner = make_owner()
+    grill = make_outlet(owner, "Chicken Grill")
+    make_menu_item(grill, "Beef Burger")
+    tikka = make_menu_item(make_outlet(owner, "Spice Hub"), "Chicken Tikka")
+    rebuild_menu_search()
+
+    # The dish named chicken outranks the one at an outlet named chicken
+    assert search(client, "chick") == ["Chicken Tikka", "Beef Burger"]
+    # Quotes and brackets are not FTS syntax errors
+    assert search(client, 'tikka" (') == ["Chicken Tikka"]
+    assert search(client, "sushi") == []
+    assert client.get("/api/menu/search").status_code == 400
+
+    response = client.put(f"/items/{tikka.item_id}", json={"name": "Paneer Tikka"}, headers=auth_header(owner, "owner"))
+    assert response.status_code == 200
+    assert search(client, "paneer") == ["Paneer Tikka"]
+    assert search(client, "chick") == ["Beef Burger"]
@@ -0,0 +1,77 @@
+import csv
+import io
+
+from conftest import auth_header, make_owner, make_outlet, make_menu_item
+from models import Item, MenuOutletItem
+
+CSV_MENU = """name,price,description,category,is_available,prep_minutes,image
+Pilau,300,Spiced rice,Mains,true,20,
+Chapati,50,,Sides,no,,
+"""
+
+
+def import_menu(client, owner, outlet_id, **kwargs):
+    return client.post(f"/api/outlets/{outlet_id}/menu/import", headers=auth_header(owner, "owner"), **kwargs)
+
+
+def test_csv_import_round_trips_through_export(client):
+    owner = make_owner()
+    source, target = make_outlet(owner, "Source"), make_outlet(owner, "Target")
+    source_id, target_id = source.id, target.id
+
+    response = import_menu(
+        client, owner, source_id,
+        data={"file": (io.BytesIO(CSV_MENU.encode()), "menu.csv")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 201
+    assert [i["name"] for i in response.get_json()["items"]] == ["Pilau", "Chapati"]
+
+    chapati = Item.query.filter_by(name="Chapati").one()
+    assert (chapati.price, chapati.category_name, chapati.is_available, chapati.prep_minutes) == (50, "Sides", False, 10)
+
+    response = client.get(f"/api/outlets/{source_id}/menu/export", headers=auth_header(owner, "owner"))
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [(r["name"], r["price"], r["is_available"]) for r in rows] == [("Pilau", "300", "True"), ("Chapati", "50", "False")]
+
+    response = client.get(f"/api/outlets/{source_id}/menu/export?format=json", headers=auth_header(owner, "owner"))
+    response = import_menu(client, owner, target_id, json=response.get_json())
+    assert response.status_code == 201
+    assert MenuOutletItem.query.filter_by(outlet_id=target_id).count() == 2
+
+
+def test_invalid_rows_reject_the_whole_import(client):
+    owner = make_owner()
+    outlet = make_outlet(owner)
+    make_menu_item(outlet, "Pilau")
+
+    response = import_menu(client, owner, outlet.id, json=[
+        {"name": "Ugali", "price": 80},
+        {"name": "pilau", "price": 300},
+        {"name": "", "price": "cheap", "prep_minutes": 0},
+        {"name": "Ugali", "price": 90},
+    ])
+
+    assert response.status_code == 422
+    errors = {e["row"]: e["errors"] for e in response.get_json()["errors"]}
+    assert errors[2] == ["an item with this name is already on the menu"]
+    assert errors[3] == ["name is required", "price must be a number", "prep_minutes must be positive"]
+    assert errors[4] == ["duplicate name in this import"]
+    assert 1 not in errors
+    assert Item.query.count() == 1
+
+
+def test_import_requires_the_outlet_owner_and_a_readable_file(client):
+    owner, other = make_owner(), make_owner("Other", "other@example.com")
+    outlet_id = make_outlet(owner).id
+
+    assert import_menu(client, other, outlet_id, json=[{"name": "Tea", "price": 1}]).status_code == 403
+    assert import_menu(client, owner, outlet_id, json=[]).status_code == 400
+    response = import_menu(
+        client, owner, outlet_id,
+        data={"file": (io.BytesIO(b"name,price\n"), "menu.xml")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 400
@@ -0,0 +1,18 @@
+from conftest import auth_header, make_owner, make_outlet
+from auth.jwt import generate_token
+
+
+def test_order_feeds_require_the_owner(client):
+    owner = make_owner()
+    other = make_owner("Other", "other@example.com")
+    outlet = make_outlet(owner)
+
+    for url in (f"/api/orders/owner/{owner.id}/events", f"/api/orders/outlet/{outlet.id}/events"):
+        assert client.get(url).status_code == 401
+        assert client.get(url, headers=auth_header(other, "owner")).status_code == 403
+
+        # EventSource passes the token in the query string
+        response = client.get(f"{url}?token={generate_token(owner.id, 'owner')}", buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        response.close()
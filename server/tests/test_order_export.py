@@ -0,0 +1,60 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item, make_order
+from archive import archive_orders
+from models import OrderStatus
+
+
+def export(client, owner, query=""):
+    return client.get(f"/api/orders/export{query}", headers=auth_header(owner, "owner"))
+
+
+def test_export_streams_gzipped_lines_of_the_owners_orders(client):
+    owner, other = make_owner(), make_owner("Other", "other@example.com")
+    customer = make_customer()
+    outlet = make_outlet(owner)
+    pilau = make_menu_item(outlet, "Pilau", price=300)
+    chapati = make_menu_item(outlet, "Chapati", price=50)
+    make_order(customer, make_menu_item(make_outlet(other, "Other outlet"), "Tea"))
+
+    response = client.post("/api/orders/checkout", json={"customer_id": customer.id, "items": [
+        {"menu_outlet_item_id": pilau.id, "quantity": 1},
+        {"menu_outlet_item_id": chapati.id, "quantity": 2},
+    ]})
+    checkout_id = response.get_json()["orders"][0]["id"]
+    old = make_order(customer, pilau, status=OrderStatus.completed, created_at=datetime.utcnow() - timedelta(days=60))
+    old_id = old.id
+    archive_orders()
+
+    response = export(client, owner)
+    assert response.status_code == 200
+    assert response.mimetype == "application/gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.data).decode())))
+
+    # Oldest first, archived orders included, one row per line
+    assert [(int(r["order_id"]), r["item_name"]) for r in rows] == [
+        (old_id, "Pilau"),
+        (checkout_id, "Pilau"),
+        (checkout_id, "Chapati"),
+    ]
+    assert rows[2]["quantity"] == "2"
+    assert rows[2]["line_total"] == "100"
+    assert rows[2]["order_total"] == "400"
+    assert rows[2]["customer_name"] == "Customer"
+
+    response = export(client, owner, f"?format=ndjson&from={datetime.utcnow().date()}")
+    rows = [json.loads(line) for line in gzip.decompress(response.data).decode().splitlines()]
+    assert [r["order_id"] for r in rows] == [checkout_id, checkout_id]
+    assert rows[0]["status"] == "pending"
+
+
+def test_export_requires_an_owner_and_valid_parameters(client):
+    owner = make_owner()
+
+    assert client.get("/api/orders/export").status_code == 401
+    assert export(client, owner, "?format=xml").status_code == 400
+    assert export(client, owner, "?from=yesterday").status_code == 400
@@ -0,0 +1,53 @@
+from conftest import make_owner, make_customer, make_outlet, make_menu_item, make_order
+
+
+ORDER_LISTINGS = (
+    "/api/orders",
+    "/api/orders/customer/{customer_id}",
+    "/api/orders/owner/{owner_id}",
+)
+
+
+def add_orders(customers, menu_items, count):
+    """Orders spread over customers and outlets, every other one with a table booking"""
+    for i in range(count):
+        make_order(
+            customers[i % len(customers)],
+            menu_items[i % len(menu_items)],
+            quantity=i % 3 + 1,
+            table_number=i + 1 if i % 2 else None
+        )
+
+
+def listing_selects(client, count_selects, owner, customer):
+    counts = {}
+    for url in ORDER_LISTINGS:
+        url = url.format(customer_id=customer.id, owner_id=owner.id)
+
+        def fetch():
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.get_json()
+
+        counts[url] = count_selects(fetch)
+    return counts
+
+
+def add_customers_and_outlets(owner, start, count):
+    customers = [make_customer(f"Customer {i}", f"customer{i}@example.com") for i in range(start, start + count)]
+    menu_items = [make_menu_item(make_outlet(owner, f"Outlet {i}"), f"Dish {i}") for i in range(start, start + count)]
+    return customers, menu_items
+
+
+def test_order_listing_selects_do_not_grow_with_orders(client, count_selects):
+    owner = make_owner()
+    customers, menu_items = add_customers_and_outlets(owner, 0, 2)
+    add_orders(customers, menu_items, 4)
+    small = listing_selects(client, count_selects, owner, customers[0])
+
+    # More orders, and more distinct customers, outlets and dishes to lazy load
+    more_customers, more_menu_items = add_customers_and_outlets(owner, 2, 10)
+    add_orders([customers[0]] + more_customers, menu_items + more_menu_items, 40)
+    large = listing_selects(client, count_selects, owner, customers[0])
+
+    assert large == small
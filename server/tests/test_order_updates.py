@@ -0,0 +1,38 @@
+from conftest import make_owner, make_customer, make_outlet, make_menu_item, make_order
+from extensions import db
+from models import DailyItemSales, OrderStatus
+from rollups import rebuild_daily_sales
+
+
+def sold_quantity():
+    db.session.expire_all()
+    return sum(row.quantity for row in DailyItemSales.query.all())
+
+
+def test_rejected_edit_leaves_rollups_alone(client):
+    order = make_order(make_customer(), make_menu_item(make_outlet(make_owner())), quantity=2, status=OrderStatus.completed)
+    rebuild_daily_sales()
+    assert sold_quantity() == 2
+
+    response = client.put(f"/api/orders/{order.id}", json={"quantity": 5, "status": "bogus"})
+    assert response.status_code == 400
+    assert sold_quantity() == 2
+
+    response = client.put(f"/api/orders/{order.id}", json={"quantity": 5})
+    assert response.status_code == 200
+    assert sold_quantity() == 5
+
+
+def test_status_follows_allowed_transitions(client):
+    order = make_order(make_customer(), make_menu_item(make_outlet(make_owner())), status=OrderStatus.completed)
+    rebuild_daily_sales()
+
+    response = client.put(f"/api/orders/{order.id}", json={"status": "pending"})
+    assert response.status_code == 400
+    assert sold_quantity() == 1
+
+    assert client.put(f"/api/orders/{order.id}", json={"status": "completed"}).status_code == 200
+
+    order = make_order(make_customer("Other", "other@example.com"), order.menu_outlet_item)
+    assert client.put(f"/api/orders/{order.id}", json={"status": "confirmed"}).status_code == 200
+    assert client.put(f"/api/orders/{order.id}", json={"status": "pending"}).status_code == 400
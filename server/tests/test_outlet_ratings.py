@@ -0,0 +1,55 @@
+from conftest import make_owner, make_outlet
+from extensions import db
+from ratings import rebuild_outlet_ratings
+
+
+def outlet_ratings(client, query=""):
+    response = client.get(f"/api/outlets{query}")
+    assert response.status_code == 200
+    return {o["name"]: o["rating"] for o in response.get_json()["outlets"]}
+
+
+def review(client, outlet_id, rating):
+    response = client.post("/api/testimonials", json={
+        "outlet_id": outlet_id, "customer_name": "Customer", "rating": rating, "review_text": "Nice"
+    })
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+
+def test_rating_totals_follow_testimonial_writes(client):
+    outlet_id = make_outlet(make_owner(), "Grill").id
+
+    five = review(client, outlet_id, 5)
+    review(client, outlet_id, 3)
+    client.patch(f"/api/testimonials/{five}", json={"rating": 4})
+    low = review(client, outlet_id, 1)
+    client.delete(f"/api/testimonials/{low}")
+
+    rating = outlet_ratings(client)["Grill"]
+    assert rating == {
+        "count": 2,
+        "average": 3.5,
+        "histogram": {"1": 0, "2": 0, "3": 1, "4": 1, "5": 0},
+    }
+
+    # Same as recounting from the testimonials
+    rebuild_outlet_ratings()
+    db.session.expire_all()
+    assert outlet_ratings(client)["Grill"] == rating
+
+
+def test_outlets_sort_by_average_rating_with_unrated_last(client):
+    owner = make_owner()
+    good, poor, _ = (make_outlet(owner, name).id for name in ("Good", "Poor", "Unrated"))
+    review(client, good, 5)
+    review(client, poor, 2)
+
+    assert list(outlet_ratings(client, "?sort=-rating")) == ["Good", "Poor", "Unrated"]
+    assert list(outlet_ratings(client, "?sort=rating")) == ["Poor", "Good", "Unrated"]
+    assert outlet_ratings(client)["Unrated"] == {
+        "count": 0,
+        "average": None,
+        "histogram": {str(s): 0 for s in range(1, 6)},
+    }
+    assert client.get("/api/outlets?sort=best").status_code == 400
@@ -0,0 +1,17 @@
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item, make_order
+from models import OrderStatus
+from rollups import rebuild_daily_sales
+
+
+def test_top_is_clamped(client):
+    owner = make_owner()
+    outlet = make_outlet(owner)
+    customer = make_customer()
+    for name in ("Soup", "Salad"):
+        make_order(customer, make_menu_item(outlet, name), status=OrderStatus.completed)
+    rebuild_daily_sales()
+
+    for top, expected in (("-1", 1), ("0", 1), ("1000", 2)):
+        response = client.get(f"/api/owner/analytics?top={top}", headers=auth_header(owner, "owner"))
+        assert response.status_code == 200
+        assert len(response.get_json()["top_items"]) == expected
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from conftest import make_owner, make_customer, make_outlet, make_menu_item, make_order
+from extensions import db
+from models import OrderStatus
+
+
+def owner_orders(client, owner, query=""):
+    return client.get(f"/api/orders/owner/{owner.id}{query}")
+
+
+def test_owner_orders_are_filtered_by_owner_status_and_date(client):
+    owner, other = make_owner(), make_owner("Other", "other@example.com")
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(owner))
+    other_menu_item = make_menu_item(make_outlet(other, "Other outlet"), "Other dish")
+
+    pending = make_order(customer, menu_item, created_at=datetime(2026, 3, 1))
+    completed = make_order(customer, menu_item, status=OrderStatus.completed, created_at=datetime(2026, 3, 5))
+    make_order(customer, other_menu_item, created_at=datetime(2026, 3, 2))
+
+    response = owner_orders(client, owner)
+    assert response.status_code == 200
+    assert [o["id"] for o in response.get_json()] == [pending.id, completed.id]
+
+    response = owner_orders(client, owner, "?status=pending,confirmed")
+    assert [o["id"] for o in response.get_json()] == [pending.id]
+
+    response = owner_orders(client, owner, "?from=2026-03-02&to=2026-03-06")
+    assert [o["id"] for o in response.get_json()] == [completed.id]
+
+    assert owner_orders(client, owner, "?status=bogus").status_code == 400
+    assert owner_orders(client, owner, "?from=yesterday").status_code == 400
+    assert client.get("/api/orders/owner/999").status_code == 404
+
+
+def test_owner_orders_search_orders_by_index(client):
+    owner = make_owner()
+    make_order(make_customer(), make_menu_item(make_outlet(owner)))
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        if "FROM orders" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", capture)
+    try:
+        assert owner_orders(client, owner, "?status=pending").status_code == 200
+    finally:
+        event.remove(db.engine, "before_cursor_execute", capture)
+
+    statement, parameters = statements[0]
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    details = [row[-1] for row in plan]
+    # Which index depends on table statistics; never a full scan
+    assert any(d.startswith("SEARCH orders USING INDEX ix_orders_") for d in details), details
+    assert not any(d.startswith("SCAN orders") for d in details), details
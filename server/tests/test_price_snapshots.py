@@ -0,0 +1,29 @@
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item
+
+
+def test_orders_keep_the_price_they_were_placed_at(client):
+    owner = make_owner()
+    menu_item = make_menu_item(make_outlet(owner), price=100)
+    item_id = menu_item.item_id
+
+    response = client.post(
+        "/api/orders",
+        json={"customer_id": make_customer().id, "menu_outlet_item_id": menu_item.id, "quantity": 2}
+    )
+    assert response.status_code == 201
+    order = response.get_json()
+    assert order["total"] == 200
+    assert order["items"][0]["price"] == 100
+    assert order["items"][0]["line_total"] == 200
+
+    response = client.put(f"/items/{item_id}", json={"price": 150}, headers=auth_header(owner, "owner"))
+    assert response.status_code == 200
+
+    order = client.get(f"/api/orders/{order['id']}").get_json()
+    assert order["total"] == 200
+    assert order["items"][0]["price"] == 100
+
+    # Quantity edits are repriced at the snapshot, not the new price
+    order = client.put(f"/api/orders/{order['id']}", json={"quantity": 3}).get_json()
+    assert order["total"] == 300
+    assert order["items"][0]["line_total"] == 300
@@ -0,0 +1,29 @@
+from conftest import make_owner, make_outlet, make_menu_item
+from extensions import db
+from models import Outlet, Testimonial
+from routes.outlet import OutletStorefront
+
+
+def add_testimonials(outlet_id, count):
+    for i in range(count):
+        db.session.add(Testimonial(outlet_id=outlet_id, customer_name=f"Customer {i}", rating=i % 5 + 1, review_text="Good"))
+    db.session.commit()
+
+
+def build_selects(count_selects, outlet_id):
+    db.session.expunge_all()
+    return count_selects(lambda: OutletStorefront().build(outlet_id))
+
+
+def test_storefront_build_is_three_queries(app, count_selects):
+    outlet = make_outlet(make_owner())
+    outlet_id = outlet.id
+    make_menu_item(outlet, "Dish 0")
+    add_testimonials(outlet_id, 1)
+    assert build_selects(count_selects, outlet_id) == 3
+
+    outlet = db.session.get(Outlet, outlet_id)
+    for i in range(1, 20):
+        make_menu_item(outlet, f"Dish {i}")
+    add_testimonials(outlet_id, 20)
+    assert build_selects(count_selects, outlet_id) == 3
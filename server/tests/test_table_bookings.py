@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from conftest import make_owner, make_customer, make_outlet, make_menu_item, make_order
+from archive import archive_orders
+from models import DailyOutletSales, Order, OrderStatus
+
+
+def test_customer_bookings_include_archived(client):
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    old = make_order(
+        customer, menu_item,
+        status=OrderStatus.completed,
+        created_at=datetime.utcnow() - timedelta(days=60),
+        table_number=3
+    )
+    live = make_order(customer, menu_item, table_number=4)
+    order_ids = [old.id, live.id]
+
+    assert archive_orders() == 1
+
+    response = client.get(f"/api/customer/{customer.id}/table-bookings")
+    assert response.status_code == 200
+    bookings = response.get_json()
+    assert [b["order_id"] for b in bookings] == order_ids
+    assert bookings[0]["table_number"] == 3
+    assert bookings[0]["items"][0]["quantity"] == 1
+
+
+def test_booking_quantity_must_be_a_positive_integer(client):
+    customer = make_customer()
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    body = {"customer_id": customer.id, "menu_outlet_item_id": menu_item.id, "table_number": 2, "capacity": 4}
+
+    for quantity in ("2", -5, 0, 1.5):
+        response = client.post("/api/table-bookings", json={**body, "quantity": quantity})
+        assert response.status_code == 400
+
+    assert Order.query.count() == 0
+    assert DailyOutletSales.query.count() == 0
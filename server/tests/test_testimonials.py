@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from conftest import make_owner, make_outlet
+from extensions import db
+from models import Testimonial
+
+
+def add_testimonials(outlet_id, ratings):
+    start = datetime(2026, 1, 1)
+    for i, rating in enumerate(ratings):
+        db.session.add(Testimonial(
+            id=f"t{i:03}", outlet_id=outlet_id, customer_name=f"Customer {i}",
+            rating=rating, review_text="Good", created_at=start + timedelta(hours=i)
+        ))
+    db.session.commit()
+
+
+def listing(client, query=""):
+    response = client.get(f"/api/testimonials{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_unpaginated_listing_returns_every_testimonial(client):
+    add_testimonials(make_outlet(make_owner()).id, [5] * 60)
+
+    body = listing(client)
+    assert body["count"] == 60
+    assert "next_cursor" not in body
+    assert body["testimonials"][0]["id"] == "t059"
+
+
+def test_pages_follow_the_cursor_newest_first(client):
+    owner = make_owner()
+    outlet_id = make_outlet(owner).id
+    make_outlet(owner, "Other")
+    add_testimonials(outlet_id, [1, 2, 3, 4, 5])
+
+    first = listing(client, "?limit=2")
+    assert [t["id"] for t in first["testimonials"]] == ["t004", "t003"]
+    second = listing(client, f"?limit=2&cursor={first['next_cursor']}")
+    assert [t["id"] for t in second["testimonials"]] == ["t002", "t001"]
+    last = listing(client, f"?limit=2&cursor={second['next_cursor']}")
+    assert [t["id"] for t in last["testimonials"]] == ["t000"]
+    assert last["next_cursor"] is None
+
+    assert [t["rating"] for t in listing(client, "?min_rating=4")["testimonials"]] == [5, 4]
+    assert [t["rating"] for t in listing(client, "?rating=1,3&max_rating=2")["testimonials"]] == [1]
+    assert listing(client, f"?outletId={outlet_id + 1}")["count"] == 0
+
+
+def test_invalid_filters_are_rejected(client):
+    for query in ("?min_rating=9", "?max_rating=0", "?rating=4,6", "?rating=good", "?limit=0", "?cursor=nope"):
+        assert client.get(f"/api/testimonials{query}").status_code == 400
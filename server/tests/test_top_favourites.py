@@ -0,0 +1,36 @@
+from conftest import auth_header, make_owner, make_customer, make_outlet, make_menu_item
+from leaderboard import leaderboard
+
+
+def outlet_top(client, outlet_id):
+    response = client.get(f"/api/items/top_favourites?outlet_id={outlet_id}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_outlet_ranking_follows_menu_removal(client):
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    menu_id, outlet_id, item_id = menu_item.id, menu_item.outlet_id, menu_item.item_id
+
+    response = client.post(f"/api/items/{item_id}/favourite", headers=auth_header(make_customer(), "customer"))
+    assert response.status_code in (200, 201)
+    assert len(outlet_top(client, outlet_id)) == 1
+
+    assert client.delete(f"/api/menu/{menu_id}").status_code in (200, 204)
+    assert outlet_top(client, outlet_id) == []
+
+
+def test_first_toggle_on_a_cold_leaderboard_is_counted_once(client):
+    menu_item = make_menu_item(make_outlet(make_owner()))
+    outlet_id, item_id = menu_item.outlet_id, menu_item.item_id
+    customer = auth_header(make_customer(), "customer")
+
+    assert not leaderboard.loaded
+    client.post(f"/api/items/{item_id}/favourite", headers=customer)
+    assert [entry["favourite_count"] for entry in outlet_top(client, outlet_id)] == [1]
+    trending = client.get("/api/items/top_favourites?ranking=trending").get_json()
+    assert [entry["favourite_count"] for entry in trending] == [1]
+
+    client.post(f"/api/items/{item_id}/favourite", headers=customer)
+    assert outlet_top(client, outlet_id) == []
+    assert client.get("/api/items/top_favourites?ranking=trending").get_json() == []
@@ -0,0 +1,58 @@
+import pytest
+
+import uploads
+
+KEY = "0123456789abcdef0123"
+IMMUTABLE = f"{KEY}-card.webp"
+
+
+@pytest.fixture
+def photos(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "PHOTOS_FOLDER", str(tmp_path))
+    (tmp_path / IMMUTABLE).write_bytes(b"0123456789")
+    (tmp_path / "legacy.jpg").write_bytes(b"legacy bytes")
+    return tmp_path
+
+
+def test_content_hashed_uploads_are_immutable(client, photos):
+    response = client.get(f"/uploads/{IMMUTABLE}")
+
+    assert response.status_code == 200
+    assert response.data == b"0123456789"
+    assert response.mimetype == "image/webp"
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+    assert response.cache_control.immutable
+
+    response = client.get(f"/uploads/{IMMUTABLE}", headers={"Range": "bytes=2-4"})
+    assert response.status_code == 206
+    assert response.data == b"234"
+
+
+def test_other_uploads_are_revalidated(client, photos):
+    response = client.get("/uploads/legacy.jpg")
+
+    assert response.status_code == 200
+    assert response.cache_control.no_cache
+    assert response.cache_control.max_age is None
+    assert not response.cache_control.immutable
+
+    response = client.get("/uploads/legacy.jpg", headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+
+
+def test_missing_and_outside_files_are_not_served(client, photos):
+    assert client.get("/uploads/missing.jpg").status_code == 404
+    (photos.parent / "secret.txt").write_bytes(b"secret")
+    assert client.get("/uploads/..%2Fsecret.txt").status_code == 404
+
+
+def test_proxy_offload_sends_only_headers(app, client, photos):
+    app.config["UPLOADS_ACCEL_REDIRECT"] = "/protected-photos/"
+
+    response = client.get(f"/uploads/{IMMUTABLE}")
+    assert response.headers["X-Accel-Redirect"] == f"/protected-photos/{IMMUTABLE}"
+    assert response.data == b""
+    assert response.cache_control.public
+    assert response.cache_control.immutable
+
+    assert client.get("/uploads/missing.jpg").status_code == 404
@@ -0,0 +1,55 @@
+import mimetypes
+import os
+
+from flask import abort, current_app, send_from_directory
+from werkzeug.security import safe_join
+
+from images import PHOTOS_FOLDER, UPLOADS_URL, is_stored_image
+
+
+# Content-hashed names never change content, so browsers and CDNs may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def serve_upload(filename):
+    """
+    Serve a photo from the uploads folder.
+    Content-hashed variants are immutable with far-future caching; older
+    names can be overwritten in place, so they are revalidated with their
+    ETag on every use. Conditional GET and Range requests are handled by
+    send_file.
+    Set UPLOADS_ACCEL_REDIRECT to an internal nginx location to hand the
+    bytes to the proxy, or Flask's USE_X_SENDFILE for Apache/lighttpd.
+    """
+    folder = os.path.abspath(PHOTOS_FOLDER)
+    immutable = is_stored_image(filename)
+    max_age = IMMUTABLE_MAX_AGE if immutable else None
+
+    accel_prefix = current_app.config.get("UPLOADS_ACCEL_REDIRECT")
+    if accel_prefix:
+        path = safe_join(folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+
+        response = current_app.response_class()
+        response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{filename}"
+        response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        if immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+        else:
+            response.cache_control.no_cache = True
+    else:
+        response = send_from_directory(folder, filename, max_age=max_age or 0)
+        if not immutable:
+            response.cache_control.no_cache = True
+            response.cache_control.max_age = None
+
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+def register_uploads(app):
+    """Route /uploads/<filename> to serve_upload instead of Flask's static handler"""
+    app.add_url_rule(f"{UPLOADS_URL}/<path:filename>", "uploads", serve_upload)